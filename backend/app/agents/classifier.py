@@ -1,6 +1,6 @@
 from uagents import Agent, Context, Model
-import requests
-import os
+from app.utils.llm_cache import cached_chat_completion
+from app.utils.llm_client import SMALL_MODEL, chat_completion
 
 class Message(Model):
     query: str
@@ -52,36 +52,12 @@ async def classify_query(ctx: Context, sender: str, msg: Message):
     output: other
     """
     
-    url = "https://api.hyperbolic.xyz/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer " + os.getenv("HYPERBOLIC_API_KEY")
-    }
-    data = {
-        "messages": [
-            {
-                "role": "system",
-                "content": system_message
-            },
-            {
-                "role": "user",
-                "content": query
-            }
-        ],
-        "model": "meta-llama/Meta-Llama-3.1-8B-Instruct",
-        "max_tokens": 2048,
-        "temperature": 0.7,
-        "top_p": 0.9
-    }
-    
-    response = requests.post(url, headers=headers, json=data)
-    ctx.logger.info(response)
-    classification = response.json()['choices'][0]['message']['content']
+    classification = await chat_completion(system_message, query, model=SMALL_MODEL)
     ctx.logger.info(f"Classification result: {classification}")
 
 
 
-def classify_query_func(query: str):
+async def classify_query_func(query: str):
     system_message = """
     Based on the input, determine if the user is looking for a company or an individual.
     You must only output “company” or "individual" with no additional text so this can be passed in as a parameter. This is critical.
@@ -105,27 +81,4 @@ def classify_query_func(query: str):
 
     """
     
-    url = "https://api.hyperbolic.xyz/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer " + os.getenv("HYPERBOLIC_API_KEY")
-    }
-    data = {
-        "messages": [
-            {
-                "role": "system",
-                "content": system_message
-            },
-            {
-                "role": "user",
-                "content": query
-            }
-        ],
-        "model": "meta-llama/Meta-Llama-3.1-8B-Instruct",
-        "max_tokens": 2048,
-        "temperature": 0.7,
-        "top_p": 0.9
-    }
-    
-    response = requests.post(url, headers=headers, json=data)
-    return response.json()['choices'][0]['message']['content']
+    return await cached_chat_completion(system_message, query, model=SMALL_MODEL)
@@ -1,6 +1,6 @@
 from uagents import Agent, Context, Model
-import requests
-import os
+from app.utils.llm_cache import cached_chat_completion
+from app.utils.llm_client import LARGE_MODEL, SMALL_MODEL, chat_completion
 
 
 class Message(Model):
@@ -33,31 +33,7 @@ async def handle_company_query(ctx: Context, sender: str, msg: Message):
     return_address = msg.return_address
     message_id = msg.message_id
 
-    url = "https://api.hyperbolic.xyz/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer " + os.getenv("HYPERBOLIC_API_KEY")
-    }
-    data = {
-        "messages": [
-            {
-                "role": "system",
-                "content": system_message
-            },
-            {
-                "role": "user",
-                "content": query
-            }
-        ],
-        "model": "meta-llama/Meta-Llama-3-70B-Instruct",
-        "max_tokens": 2048,
-        "temperature": 0.7,
-        "top_p": 0.9
-    } 
-
-    response = requests.post(url, headers=headers, json=data)
-    ctx.logger.info(response)
-    optimized_query = response.json()['choices'][0]['message']['content']
+    optimized_query = await chat_completion(system_message, query, model=LARGE_MODEL)
     await ctx.send(
         return_address,
         Message(query=optimized_query, message_id=message_id)
@@ -65,7 +41,7 @@ async def handle_company_query(ctx: Context, sender: str, msg: Message):
     ctx.logger.info(f"optimized query: {optimized_query}")
 
 
-def handle_company_query_func(query: str):
+async def handle_company_query_func(query: str):
     system_message = """
     Given a user query, your role is to optimize it to query into a vector database of embeddings. 
     The user is looking for companies in a specific area, so you should use keywords that will best optimize for querying over a company's description (includes company name, industries, specialities, etc.). 
@@ -78,28 +54,4 @@ def handle_company_query_func(query: str):
     Simply output the optimized query without any additional text so your response can be directly used to query into the vector database.
     """
 
-    url = "https://api.hyperbolic.xyz/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer " + os.getenv("HYPERBOLIC_API_KEY")
-    }
-    data = {
-        "messages": [
-            {
-                "role": "system",
-                "content": system_message
-            },
-            {
-                "role": "user",
-                "content": query
-            }
-        ],
-        "model": "meta-llama/Meta-Llama-3.1-8B-Instruct",
-        "max_tokens": 2048,
-        "temperature": 0.7,
-        "top_p": 0.9
-    } 
-
-    response = requests.post(url, headers=headers, json=data)
-    print(response)
-    return response.json()['choices'][0]['message']['content']
+    return await cached_chat_completion(system_message, query, model=SMALL_MODEL)
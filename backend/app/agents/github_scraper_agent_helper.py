@@ -1,7 +1,7 @@
 from typing import Optional, Set
 from app.utils.github_scraper import GithubScraper
 from app.schemas import GithubUser as GithubUserSchema, Repository as RepositorySchema
-from app.db.github_user_functions import get_github_user_by_username, update_github_user, create_github_user
+from app.db.github_user_functions import get_github_user_by_username, get_many_github_users_by_username, update_github_user, create_github_user
 from app.db.repository_functions import add_user_to_repository, get_repository_by_path, create_repository, update_repository
 from sqlalchemy.orm import Session
 
@@ -53,6 +53,9 @@ def get_github_user_2_degree_network(username: str, token: Optional[str], db: Se
 
                     contributors_url = f"https://api.github.com/repos/{repo_path}/contributors"
                     contributors = github_scraper.get_contributors(contributors_url)
+                    existing_contributors = get_many_github_users_by_username(
+                        [list(contributor.keys())[0] for contributor in contributors], db
+                    )
 
                     for contributor in contributors:
                         contributor_username = list(contributor.keys())[0]
@@ -62,7 +65,7 @@ def get_github_user_2_degree_network(username: str, token: Optional[str], db: Se
                             continue
 
                         processed_users.add(contributor_username)
-                        db_contributor = get_github_user_by_username(contributor_username, db)
+                        db_contributor = existing_contributors.get(contributor_username)
                         contributor_schema = GithubUserSchema(
                             username=contributor_username,
                             profile_picture=contributor_info["profile_picture"],
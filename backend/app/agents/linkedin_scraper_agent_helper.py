@@ -2,7 +2,7 @@ import re
 from typing import Optional, Set, Tuple
 from app.utils.linkedin_scraper import LinkedInScraper
 from app.schemas import LinkedinUser as LinkedinUserSchema, LinkedinOrganization as LinkedinOrganizationSchema
-from app.db.linkedin_user_functions import get_linkedin_user_by_username, update_linkedin_user, create_linkedin_user
+from app.db.linkedin_user_functions import get_linkedin_user_by_username, get_many_linkedin_users_by_username, update_linkedin_user, create_linkedin_user
 from app.db.linkedin_organization_functions import add_user_to_organization, get_linkedin_organization_by_id, create_linkedin_organization, update_linkedin_organization
 from sqlalchemy.orm import Session
 from datetime import datetime
@@ -67,6 +67,9 @@ def get_linkedin_user_2_degree_network(email: str, username: str, password: str,
                     processed_users.add(username)
                     print(f"added user {username} to organization: {db_organization.name}")
                     company_people = linkedin_scraper.scrape_company_people(company_info['url'])
+                    existing_people = get_many_linkedin_users_by_username(
+                        [list(person.keys())[0] for person in company_people], db
+                    )
 
                     for person in company_people:
                         person_username = list(person.keys())[0]
@@ -88,7 +91,7 @@ def get_linkedin_user_2_degree_network(email: str, username: str, password: str,
                                 external_websites=None
                             )
 
-                            db_person = get_linkedin_user_by_username(person_username, db)
+                            db_person = existing_people.get(person_username)
                             if not db_person:
                                 db_person = create_linkedin_user(person_schema, db)
                             else:
@@ -0,0 +1,142 @@
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+from app.chromadb import get_embedding_function
+from app.chromadb.internal_api import embed_queries
+from app.core.config import settings
+from app.db.search_query_label_functions import get_search_query_labels
+from app.db.session import SessionLocal
+from app.utils.enums import SearchType
+from app.utils.llm_cache import normalize_query
+
+
+LABELLED_EXAMPLES = [
+    ("companies in biotech", SearchType.COMPANY),
+    ("ai startups", SearchType.COMPANY),
+    ("startups working on ai interpretability", SearchType.COMPANY),
+    ("companies working on bioml", SearchType.COMPANY),
+    ("fintech companies in new york", SearchType.COMPANY),
+    ("who is working at google", SearchType.COMPANY),
+    ("robotics startups", SearchType.COMPANY),
+    ("climate tech companies", SearchType.COMPANY),
+    ("someone who is good at low level programming", SearchType.INDIVIDUAL),
+    ("people working on ai interpretability", SearchType.INDIVIDUAL),
+    ("engineers experienced with distributed systems", SearchType.INDIVIDUAL),
+    ("someone who knows rust and webassembly", SearchType.INDIVIDUAL),
+    ("a designer with figma experience", SearchType.INDIVIDUAL),
+    ("people who built compilers", SearchType.INDIVIDUAL),
+    ("machine learning researcher for computer vision", SearchType.INDIVIDUAL),
+    ("frontend developer who knows react", SearchType.INDIVIDUAL),
+]
+
+
+class NearestCentroidClassifier:
+    """
+    Company vs individual search classifier over query embeddings. Each class centroid is
+    the normalized sum of its example embeddings; confidence is the cosine similarity margin
+    between the closest and second closest centroid.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._sums: Dict[SearchType, np.ndarray] = {}
+        self._centroids: Dict[SearchType, np.ndarray] = {}
+        # Logged queries, kept so a repeated query replaces its example like its DB row does
+        self._learned: Dict[str, Tuple[SearchType, np.ndarray]] = {}
+
+    def _add(self, embedding: np.ndarray, label: SearchType) -> None:
+        self._sums[label] = self._sums[label] + embedding if label in self._sums else embedding
+
+    def _update_centroids(self) -> None:
+        # Swap in a new dict so predict never sees a partly updated set
+        self._centroids = {
+            label: total / (np.linalg.norm(total) or 1.0) for label, total in self._sums.items()
+        }
+
+    def add_examples(self, embeddings: Iterable[np.ndarray], labels: Iterable[SearchType]) -> None:
+        with self._lock:
+            for embedding, label in zip(embeddings, labels):
+                self._add(np.asarray(embedding, dtype=np.float32), label)
+            self._update_centroids()
+
+    def knows(self, query: str, label: SearchType) -> bool:
+        learned = self._learned.get(query)
+        return learned is not None and learned[0] == label
+
+    def learn(self, query: str, embedding: np.ndarray, label: SearchType) -> None:
+        """
+        Set the label of a logged query, replacing the example it had before.
+        """
+        with self._lock:
+            previous = self._learned.get(query)
+            if previous is not None:
+                if previous[0] == label:
+                    return
+                self._sums[previous[0]] = self._sums[previous[0]] - previous[1]
+            embedding = np.asarray(embedding, dtype=np.float32)
+            self._learned[query] = (label, embedding)
+            self._add(embedding, label)
+            self._update_centroids()
+
+    def predict(self, embedding: np.ndarray) -> Tuple[Optional[SearchType], float]:
+        centroids = self._centroids
+        if len(centroids) < 2:
+            return None, 0.0
+        embedding = np.asarray(embedding, dtype=np.float32)
+        embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        scores = sorted(((float(centroid @ embedding), label) for label, centroid in centroids.items()), reverse=True)
+        return scores[0][1], scores[0][0] - scores[1][0]
+
+
+_classifier: Optional[NearestCentroidClassifier] = None
+_classifier_lock = Lock()
+
+
+def get_local_classifier() -> NearestCentroidClassifier:
+    """
+    Train the process-wide classifier from LABELLED_EXAMPLES and the logged LLM
+    decisions. Called once at startup so searches never pay for training. Embeds and
+    queries synchronously; call from the threadpool.
+    """
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                db = SessionLocal()
+                try:
+                    logged = [(query, SearchType(search_type)) for query, search_type in get_search_query_labels(db)]
+                finally:
+                    db.close()
+                examples = LABELLED_EXAMPLES + logged
+                embeddings = get_embedding_function()([query for query, _ in examples])
+                classifier = NearestCentroidClassifier()
+                classifier.add_examples(embeddings[:len(LABELLED_EXAMPLES)], [label for _, label in LABELLED_EXAMPLES])
+                for (query, label), embedding in zip(logged, embeddings[len(LABELLED_EXAMPLES):]):
+                    classifier.learn(query, embedding, label)
+                _classifier = classifier
+    return _classifier
+
+
+def classify_query_locally(query: str) -> Optional[SearchType]:
+    """
+    Classify a search query without the LLM, or return None if not confident enough.
+    The query embedding goes through the shared query cache, so learning the label
+    afterwards does not embed the query again.
+    """
+    embedding = embed_queries([normalize_query(query)])[0]
+    label, confidence = get_local_classifier().predict(embedding)
+    if confidence < settings.LOCAL_CLASSIFIER_MIN_MARGIN:
+        return None
+    return label
+
+
+def learn_query_label(query: str, search_type: SearchType) -> None:
+    """
+    Fold an LLM decision into the running classifier. Queries it already has with this
+    label are skipped, so the live model matches what a restart rebuilds from the DB.
+    """
+    query = normalize_query(query)
+    classifier = get_local_classifier()
+    if classifier.knows(query, search_type):
+        return
+    classifier.learn(query, embed_queries([query])[0], search_type)
@@ -0,0 +1,35 @@
+from typing import Optional
+from pydantic import ValidationError
+from app.schemas.search import QueryPlan
+from app.utils.llm_cache import cached_chat_completion
+from app.utils.llm_client import LLMError, SMALL_MODEL
+
+
+async def plan_query_func(query: str) -> Optional[QueryPlan]:
+    """
+    Classify and optimize a search query in one LLM call. Returns None if the reply is not
+    a valid plan, so the caller can fall back to the separate classifier and optimizers.
+    """
+    system_message = """
+    Plan a vector database search for the user's query. Reply with only a JSON object:
+    {"search_type": "company" or "individual", "company_query": "...", "people_query": "..."}
+
+    search_type is "company" if the user wants companies (a company name, "company", "startup"), otherwise "individual".
+    company_query: keywords to match company descriptions (name, industry, specialties).
+    people_query: keywords to match GitHub repositories and company descriptions for the skill asked for; null for company searches.
+
+    Example: {"search_type": "company", "company_query": "biotech protein ai modeling therapeutics", "people_query": null}
+    """
+    try:
+        reply = await cached_chat_completion(system_message, query, model=SMALL_MODEL, max_tokens=120)
+    except LLMError as e:
+        print(f"Query planner request failed: {e}")
+        return None
+
+    # Models sometimes wrap JSON in a markdown fence
+    reply = reply.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+    try:
+        return QueryPlan.model_validate_json(reply)
+    except ValidationError as e:
+        print(f"Query planner returned an invalid plan: {reply!r} ({e.error_count()} errors)")
+        return None
@@ -1,12 +1,15 @@
 from app.db.github_user_functions import update_github_user
 from app.agents.github_scraper_agent_helper import get_github_user_2_degree_network
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models import User, GithubUser
 from app.schemas import GithubUserCreate, GithubUser as GithubUserSchema, Repository as RepositorySchema
-from app.db.user_functions import get_current_user
-from app.db.repository_functions import get_all_repositories
+from app.db.user_functions import get_current_user, get_current_user_async
+from app.db.graph_change_functions import record_account_owner_change, record_graph_change
+from app.utils.enums import GraphChangeAction, GraphNodeType
+from app.db.repository_functions import get_all_repositories_async
 from app.agents.scraper_agents import GithubRequest
 from uagents.query import query
 import json
@@ -41,7 +44,9 @@ async def create_github_user(
 
     if existing_github_user:
         # update user id association
+        record_account_owner_change(GraphNodeType.GITHUB_USER, existing_github_user.username, existing_github_user.user_id, current_user.id, db)
         existing_github_user.user_id = current_user.id
+        record_graph_change(GraphChangeAction.UPDATED, GraphNodeType.GITHUB_USER, existing_github_user.username, db)
         existing_github_user.token = github_user.token
         db.commit()
         db.refresh(existing_github_user)
@@ -53,6 +58,8 @@ async def create_github_user(
             user_id=current_user.id
         )
         db.add(new_github_user)
+        record_graph_change(GraphChangeAction.ADDED, GraphNodeType.GITHUB_USER, new_github_user.username, db)
+        record_account_owner_change(GraphNodeType.GITHUB_USER, new_github_user.username, None, current_user.id, db)
         db.commit()
         db.refresh(new_github_user)
 
@@ -67,6 +74,8 @@ async def create_github_user(
         #     raise HTTPException(status_code=500, detail="Agent processing failed")
     except Exception as e:
         db.delete(new_github_user)
+        record_graph_change(GraphChangeAction.REMOVED, GraphNodeType.GITHUB_USER, new_github_user.username, db)
+        record_account_owner_change(GraphNodeType.GITHUB_USER, new_github_user.username, current_user.id, None, db)
         db.commit()
         raise HTTPException(status_code=500, detail=f"Error calling agent: {str(e)}")
 
@@ -122,11 +131,11 @@ async def update_github_user_info(
 
 @router.get("/repositories", response_model=List[RepositorySchema])
 async def get_all_repos(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all repositories stored in the database.
     """
-    repositories = get_all_repositories(db)
+    repositories = await get_all_repositories_async(db)
     return repositories
\ No newline at end of file
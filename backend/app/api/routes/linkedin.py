@@ -1,12 +1,16 @@
 from app.agents.linkedin_scraper_agent_helper import get_linkedin_user_2_degree_network
-from app.db.linkedin_user_functions import get_user_organization_associations, update_linkedin_user
+from app.db.linkedin_organization_functions import get_linkedin_organizations_async
+from app.db.linkedin_user_functions import get_linkedin_users_async, update_linkedin_user
 from app.schemas.linkedin_user import LinkedinOrganizationContribution
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models import User, LinkedinUser, LinkedinOrganization
+from app.db.session import get_async_db, get_db
+from app.models import User, LinkedinUser
 from app.schemas import LinkedinUserCreate, LinkedinUser as LinkedinUserSchema, LinkedinOrganization as LinkedinOrganizationSchema
 from app.db.user_functions import get_current_user
+from app.db.graph_change_functions import record_account_owner_change, record_graph_change
+from app.utils.enums import GraphChangeAction, GraphNodeType
 from app.agents.scraper_agents import LinkedinRequest
 from uagents.query import query
 import json
@@ -46,7 +50,9 @@ async def create_linkedin_user(
     encrypted_password = fernet.encrypt(linkedin_user.password.encode())
     if existing_linkedin_user:
         # update user id association
+        record_account_owner_change(GraphNodeType.LINKEDIN_USER, existing_linkedin_user.username, existing_linkedin_user.user_id, current_user.id, db)
         existing_linkedin_user.user_id = current_user.id
+        record_graph_change(GraphChangeAction.UPDATED, GraphNodeType.LINKEDIN_USER, existing_linkedin_user.username, db)
         existing_linkedin_user.password = encrypted_password
         db.commit()
         db.refresh(existing_linkedin_user)
@@ -59,6 +65,8 @@ async def create_linkedin_user(
             user_id=current_user.id
         )
         db.add(new_linkedin_user)
+        record_graph_change(GraphChangeAction.ADDED, GraphNodeType.LINKEDIN_USER, new_linkedin_user.username, db)
+        record_account_owner_change(GraphNodeType.LINKEDIN_USER, new_linkedin_user.username, None, current_user.id, db)
         db.commit()
         db.refresh(new_linkedin_user)
 
@@ -76,6 +84,8 @@ async def create_linkedin_user(
         #     raise HTTPException(status_code=500, detail="Agent processing failed")
     except Exception as e:
         db.delete(new_linkedin_user)
+        record_graph_change(GraphChangeAction.REMOVED, GraphNodeType.LINKEDIN_USER, new_linkedin_user.username, db)
+        record_account_owner_change(GraphNodeType.LINKEDIN_USER, new_linkedin_user.username, current_user.id, None, db)
         db.commit()
         raise HTTPException(status_code=500, detail=f"Error calling agent: {str(e)}")
 
@@ -138,7 +148,7 @@ async def sync_linkedin_user(
 async def get_all_linkedin_organizations(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all LinkedIn organizations.
@@ -146,19 +156,19 @@ async def get_all_linkedin_organizations(
     This endpoint returns a list of all LinkedIn organizations in the database.
     It supports pagination through skip and limit parameters.
     """
-    organizations = db.query(LinkedinOrganization).offset(skip).limit(limit).all()
+    organizations = await get_linkedin_organizations_async(skip, limit, db)
     
     if not organizations:
         raise HTTPException(status_code=404, detail="No LinkedIn organizations found")
     
-    return [LinkedinOrganizationSchema.from_orm(org) for org in organizations]
+    return organizations
 
 
 @router.get("/users", response_model=List[LinkedinUserSchema])
 async def get_all_linkedin_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve all LinkedIn users.
@@ -166,16 +176,9 @@ async def get_all_linkedin_users(
     This endpoint returns a list of all LinkedIn users in the database.
     It supports pagination through skip and limit parameters.
     """
-    users = db.query(LinkedinUser).offset(skip).limit(limit).all()
+    users = await get_linkedin_users_async(skip, limit, db)
     
     if not users:
         raise HTTPException(status_code=404, detail="No LinkedIn users found")
     
-    result = []
-    for user in users:
-        organizations = [org for org, _ in get_user_organization_associations(db, username=user.username)]
-        user_dict = LinkedinUserSchema.from_orm(user).dict()
-        user_dict['organizations'] = organizations
-        result.append(LinkedinUserSchema(**user_dict))
-    
-    return result
\ No newline at end of file
+    return users
\ No newline at end of file
@@ -7,12 +7,13 @@ from app.models import User
 from typing import Dict, List
 from app.utils.github_scraper import GithubScraper
 from app.schemas.message import GeneralMessageSchema
-import requests
-import os
+from app.utils.llm_cache import normalize_query
+from app.utils.llm_client import LARGE_MODEL, chat_completion
+from app.utils.single_flight import SingleFlight
 
 router = APIRouter(prefix="/network", tags=["network"])
 
-def check_for_hallucination(message: str, connection_info: str, common_link: str) -> bool:
+async def check_for_hallucination(message: str, connection_info: str, common_link: str) -> bool:
     system_message = """
     You are an AI tasked with detecting hallucinations in generated messages. 
     Analyze the given message and determine if it contains any information not present in or not inferable from the provided connection information or common link.
@@ -21,32 +22,25 @@ def check_for_hallucination(message: str, connection_info: str, common_link: str
 
     user_message = f"Message: {message}\nConnection Info: {connection_info}\nCommon Link: {common_link}"
 
-    url = "https://api.hyperbolic.xyz/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer " + os.getenv("HYPERBOLIC_API_KEY")
-    }
-    data = {
-        "messages": [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message}
-        ],
-        "model": "meta-llama/Meta-Llama-3-70B-Instruct",
-        "max_tokens": 10,
-        "temperature": 0.1
-    }
-
-    response = requests.post(url, headers=headers, json=data)
-    result = response.json()['choices'][0]['message']['content'].strip().upper()
-    
-    return result == "HALLUCINATION"
+    result = await chat_completion(system_message, user_message, model=LARGE_MODEL, max_tokens=10, temperature=0.1, top_p=None)
+    return result.strip().upper() == "HALLUCINATION"
+
+
+# Concurrent identical drafts share one set of LLM calls
+_message_flights = SingleFlight()
+
 
 @router.get("/message", response_model=GeneralMessageSchema)
 async def draft_message(
     query: str,
     connection_info: str,
     common_with_connection:str
-): 
+):
+    key = tuple(normalize_query(value) for value in (query, connection_info, common_with_connection))
+    return await _message_flights.do(key, lambda: _draft_message(query, connection_info, common_with_connection))
+
+
+async def _draft_message(query: str, connection_info: str, common_with_connection: str) -> str:
     system_message = """
     Given what kind of person the user is looking for (user query), your job is to craft a personalized message to a specific person based on a common link with that person.
 
@@ -59,36 +53,12 @@ async def draft_message(
 
     user_message = f"user query: {query}, connection's information: {connection_info}, common link with connection: {common_with_connection}"
 
-    url = "https://api.hyperbolic.xyz/v1/chat/completions"
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": "Bearer " + os.getenv("HYPERBOLIC_API_KEY")
-    }
-    data = {
-        "messages": [
-            {
-                "role": "system",
-                "content": system_message
-            },
-            {
-                "role": "user",
-                "content": user_message
-            }
-        ],
-        "model": "meta-llama/Meta-Llama-3-70B-Instruct",
-        "max_tokens": 2048,
-        "temperature": 0.7,
-        "top_p": 0.9
-    } 
-
     for attempt in range(3):
-        response = requests.post(url, headers=headers, json=data)
-        message = response.json()['choices'][0]['message']['content']
-        
-        if not check_for_hallucination(message, connection_info, common_with_connection):
+        message = await chat_completion(system_message, user_message, model=LARGE_MODEL)
+
+        if not await check_for_hallucination(message, connection_info, common_with_connection):
             return message
-        
+
         print(f"Hallucination detected, attempt {attempt + 1}/{3}")
 
-    response = requests.post(url, headers=headers, json=data)
-    return response.json()['choices'][0]['message']['content']
\ No newline at end of file
+    return await chat_completion(system_message, user_message, model=LARGE_MODEL)
@@ -1,26 +1,331 @@
-from app.db.linkedin_user_functions import get_linkedin_user_by_username, get_user_organization_associations
-from app.db.github_user_functions import get_github_user_by_username, get_github_users_by_repository
-from app.db.repository_functions import get_all_repositories, get_repositories_by_github_user, get_repository_by_path
-from app.db.linkedin_organization_functions import get_linkedin_organization_by_id
-from app.db.user_functions import get_current_user, get_user_by_id
-from app.models.linkedin_organization import LinkedinOrganization
-from app.schemas.linkedin_organization import LinkedinOrganization as LinkedinOrganizationSchema
-from fastapi import APIRouter, Depends, HTTPException
+from app.db.graph_change_functions import get_graph_changes_async, get_graph_version_async
+from app.db.loader import AsyncLoader, Loader, get_async_loader
+from app.db.network_functions import (
+    get_group_member_usernames_async,
+    get_groups_with_members_async,
+    get_network_memberships_async,
+    get_reachable_network,
+    get_reachable_network_async,
+    get_registered_user_ids_async,
+)
+from app.db.public_network_functions import (
+    get_public_network_revision,
+    get_public_network_snapshot,
+    has_public_organizations,
+    iter_public_network,
+)
+from app.db.user_functions import get_current_user, get_current_user_async, get_user_by_id, get_user_by_id_async
+from app.graph import get_connection_scorer, get_graph_index
+from app.graph.identity import IdentityIndex
+from app.graph.paths import IntroductionPathFinder
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.models import User
-from typing import Dict, List
-from app.utils.github_scraper import GithubScraper
+from app.db.session import SessionLocal, get_async_db, get_db, run_with_sync_session
+from app.graph.scoring import ConnectionScorer
+from app.models import User, GithubUser, LinkedinUser
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from collections import defaultdict
+from itertools import combinations
+import json
+from app.utils.enums import GraphChangeAction, GraphNodeType
 
 router = APIRouter(prefix="/network", tags=["network"])
 
-@router.get("")
-async def get_user_network(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    return await get_user_network(current_user.id, db)
+# Same fan-out cap that get_user_organization_associations applies per user and per organization
+MAX_GROUP_MEMBERS = 250
+# Hops on the user <-> organization/repository graph; 2 reaches people sharing a group with you
+DEFAULT_NETWORK_DEPTH = 2
+MAX_NETWORK_DEPTH = 4
+# Beyond this many log entries a delta is no cheaper than a full reload
+MAX_NETWORK_CHANGES = 5000
+
+def stream_ndjson(records: Callable[[Session], Iterator[Tuple[str, dict]]], headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """
+    Stream (type, data) records as newline-delimited JSON, one {"type", "data"} object per line.
+    The generator runs after the request's own session has been closed, so it gets a fresh one.
+    """
+    def generate():
+        db = SessionLocal()
+        try:
+            for kind, record in records(db):
+                yield json.dumps({"type": kind, "data": record}, default=str) + "\n"
+        finally:
+            db.close()
+    return StreamingResponse(generate(), media_type="application/x-ndjson", headers=headers)
 
+@router.get("")
+async def get_user_network(
+    response: Response,
+    depth: int = Query(DEFAULT_NETWORK_DEPTH, ge=1, le=MAX_NETWORK_DEPTH),
+    stream: Optional[str] = Query(None, pattern="^ndjson$"),
+    view: Optional[str] = Query(None, pattern="^clustered$"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    The current user's network. With stream=ndjson, groups and then nodes are sent as
+    newline-delimited JSON while they are built instead of as one document. With
+    view=clustered, only group super-nodes and the links between them are returned;
+    expand a group with /network/group/{group_type}/{group_id}.
+
+    The X-Graph-Version header is the graph version the response is at least as new as;
+    pass it to /network/changes to fetch later edits.
+    """
+    # Read before building, so edits racing the build are replayed by the next delta
+    headers = {"X-Graph-Version": str(await get_graph_version_async(db))}
+    if stream:
+        user_id = current_user.id
+        return stream_ndjson(lambda stream_db: iter_user_network(user_id, stream_db, depth), headers=headers)
+    response.headers.update(headers)
+    if view:
+        return await get_clustered_network(current_user.id, db, depth)
+    return await build_user_network_async(current_user.id, db, depth)
+
+GROUP_NODE_TYPES = (GraphNodeType.LINKEDIN_ORGANIZATION, GraphNodeType.GITHUB_REPOSITORY)
+
+def _net_action(first: GraphChangeAction, last: GraphChangeAction) -> Optional[GraphChangeAction]:
+    if last == GraphChangeAction.REMOVED:
+        return None if first == GraphChangeAction.ADDED else GraphChangeAction.REMOVED
+    if first == GraphChangeAction.ADDED:
+        return GraphChangeAction.ADDED
+    return GraphChangeAction.UPDATED
+
+def _reachability_may_have_changed(
+    node_actions: Dict[Tuple[GraphNodeType, str], List[GraphChangeAction]],
+    link_actions: Dict[Tuple[GraphNodeType, str, GraphNodeType, str], List[GraphChangeAction]],
+    reachable: Dict[GraphNodeType, Dict[str, int]],
+    depth: int,
+) -> bool:
+    """
+    Whether the nodes within `depth` hops, or their hop counts, may differ from before the
+    changes. A changed membership only matters if the traversal can cross it, i.e. one of
+    its ends is reached in fewer than `depth` hops now; any path that used a removed link
+    reaches its near end just as fast without it. Identity links cost no hops, so either
+    end being reached is enough. A removed node may have been reached before, so it
+    always counts.
+    """
+    for (node_type, node_id, target_type, target_id), (first, last) in link_actions.items():
+        # Updated memberships existed before and after, so they move nobody
+        if _net_action(first, last) in (None, GraphChangeAction.UPDATED):
+            continue
+        if target_type in GROUP_NODE_TYPES:
+            if reachable[node_type].get(node_id, depth) < depth or reachable[target_type].get(target_id, depth) < depth:
+                return True
+        elif node_id in reachable[node_type] or target_id in reachable[target_type]:
+            return True
+    return any(_net_action(first, last) == GraphChangeAction.REMOVED for first, last in node_actions.values())
+
+@router.get("/changes")
+async def get_network_changes(
+    since: int = Query(..., ge=0),
+    depth: int = Query(DEFAULT_NETWORK_DEPTH, ge=1, le=MAX_NETWORK_DEPTH),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Nodes (users, organizations, repositories) and links (memberships) in the current user's
+    network that were added, updated or removed after graph version `since`. When too much
+    has changed, or the changes may have moved people into or out of the network, returns
+    reset=true and the client should reload the full network.
+    """
+    changes = await get_graph_changes_async(since, MAX_NETWORK_CHANGES + 1, db)
+    if len(changes) > MAX_NETWORK_CHANGES:
+        return {"version": await get_graph_version_async(db), "since": since, "reset": True}
+    version = changes[-1].version if changes else max(since, await get_graph_version_async(db))
+
+    # Net effect per node / link: (first action, last action)
+    node_actions: Dict[Tuple[GraphNodeType, str], List[GraphChangeAction]] = {}
+    link_actions: Dict[Tuple[GraphNodeType, str, GraphNodeType, str], List[GraphChangeAction]] = {}
+    for change in changes:
+        action = GraphChangeAction(change.action)
+        if change.target_id is None:
+            key = (GraphNodeType(change.node_type), change.node_id)
+            actions = node_actions
+        else:
+            key = (GraphNodeType(change.node_type), change.node_id, GraphNodeType(change.target_type), change.target_id)
+            actions = link_actions
+        actions.setdefault(key, [action, action])[1] = action
+
+    # Only report what lies in this user's network. The delta assumes the network reached
+    # at `since` is the one reached now; when an edit may have changed that, reload instead.
+    reachable = await get_reachable_network_async(current_user.id, depth, db)
+    if _reachability_may_have_changed(node_actions, link_actions, reachable, depth):
+        return {"version": version, "since": since, "reset": True}
+
+    links = {action: [] for action in (GraphChangeAction.ADDED, GraphChangeAction.UPDATED, GraphChangeAction.REMOVED)}
+    linked_groups = set()
+    for (user_type, username, group_type, group_id), (first, last) in link_actions.items():
+        action = _net_action(first, last)
+        if action is None or group_type not in GROUP_NODE_TYPES or username not in reachable[user_type]:
+            continue
+        linked_groups.add((group_type, group_id, action))
+        links[action].append({"source_type": user_type.value, "source": username, "target_type": group_type.value, "target": group_id})
+
+    changed_groups: Dict[GraphNodeType, List[str]] = defaultdict(list)
+    for node_type, node_id in node_actions:
+        if node_type in GROUP_NODE_TYPES:
+            changed_groups[node_type].append(node_id)
+    groups_in_network = {(group_type, group_id) for group_type, group_id, _ in linked_groups}
+    for group_type, group_ids in changed_groups.items():
+        user_type = GraphNodeType.LINKEDIN_USER if group_type == GraphNodeType.LINKEDIN_ORGANIZATION else GraphNodeType.GITHUB_USER
+        for group_id in await get_groups_with_members_async(group_type, group_ids, reachable[user_type], db):
+            groups_in_network.add((group_type, group_id))
+
+    changed_nodes = {}
+    for (node_type, node_id), (first, last) in node_actions.items():
+        action = _net_action(first, last)
+        if action is None:
+            continue
+        if node_id in reachable[node_type] or (node_type, node_id) in groups_in_network:
+            changed_nodes[(node_type, node_id)] = action
+    # Send the group behind every new link, so clients can place the link without a reload
+    for group_type, group_id, action in linked_groups:
+        if action == GraphChangeAction.ADDED:
+            changed_nodes.setdefault((group_type, group_id), GraphChangeAction.ADDED)
+
+    def ids_of(node_type):
+        return [node_id for changed_type, node_id in changed_nodes if changed_type == node_type]
+
+    loader = AsyncLoader(db)
+    linkedin_orders, github_orders = reachable[GraphNodeType.LINKEDIN_USER], reachable[GraphNodeType.GITHUB_USER]
+    linkedin_users = await loader.linkedin_users(ids_of(GraphNodeType.LINKEDIN_USER))
+    github_users = await loader.github_users(ids_of(GraphNodeType.GITHUB_USER))
+    organizations = await loader.linkedin_organizations(ids_of(GraphNodeType.LINKEDIN_ORGANIZATION))
+    repositories = await loader.repositories(ids_of(GraphNodeType.GITHUB_REPOSITORY))
+    payloads = {
+        GraphNodeType.LINKEDIN_USER: {
+            username: user_node(account, True, linkedin_orders.get(username), None)
+            for username, account in linkedin_users.items()
+        },
+        GraphNodeType.GITHUB_USER: {
+            username: user_node(account, False, github_orders.get(username), None)
+            for username, account in github_users.items()
+        },
+        GraphNodeType.LINKEDIN_ORGANIZATION: {linkedin_id: organization_group(org) for linkedin_id, org in organizations.items()},
+        GraphNodeType.GITHUB_REPOSITORY: {path: repository_group(repo) for path, repo in repositories.items()},
+    }
+
+    nodes = {action: [] for action in (GraphChangeAction.ADDED, GraphChangeAction.UPDATED, GraphChangeAction.REMOVED)}
+    for (node_type, node_id), action in changed_nodes.items():
+        node = {"type": node_type.value, "id": node_id}
+        data = payloads[node_type].get(node_id)
+        if action != GraphChangeAction.REMOVED:
+            if data is None:
+                action = GraphChangeAction.REMOVED
+            else:
+                node["data"] = data
+        nodes[action].append(node)
+
+    return {
+        "version": version,
+        "since": since,
+        "reset": False,
+        "nodes": {action.value: entries for action, entries in nodes.items()},
+        "links": {action.value: entries for action, entries in links.items()},
+    }
+
+# Sync on purpose: the public network is read in batches and the graph index holds a
+# process-wide lock while it loads, so these routes run in the threadpool rather than on
+# the event loop.
 @router.get("/public")
-async def get_public_network(db: Session = Depends(get_db)):
-    return await get_public_network(db)
+def get_public_network(
+    request: Request,
+    response: Response,
+    stream: Optional[str] = Query(None, pattern="^ndjson$"),
+    db: Session = Depends(get_db)
+):
+    revision = get_public_network_revision(db)
+    etag = f'"public-network-{revision}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if not has_public_organizations(db):
+        raise HTTPException(status_code=404, detail="No LinkedIn organizations found")
+
+    if stream:
+        return stream_ndjson(iter_public_network, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return get_public_network_snapshot(db)
+
+@router.get("/path")
+def get_introduction_paths(
+    target: str,
+    platform: Optional[GraphNodeType] = None,
+    k: int = Query(3, ge=1, le=20),
+    max_depth: int = Query(6, ge=1, le=10),
+    max_fanout: int = Query(MAX_GROUP_MEMBERS, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Find up to k shortest introduction paths from the current user to a LinkedIn or GitHub
+    user, through shared organizations and repositories. `platform` restricts the target to
+    linkedin_user or github_user; by default both are tried.
+    """
+    if platform not in (None, GraphNodeType.LINKEDIN_USER, GraphNodeType.GITHUB_USER):
+        raise HTTPException(status_code=400, detail="platform must be linkedin_user or github_user")
+
+    account_links = (
+        db.query(LinkedinUser.username, GithubUser.username)
+        .join(GithubUser, LinkedinUser.user_id == GithubUser.user_id)
+        .all()
+    )
+    path_finder = IntroductionPathFinder(get_graph_index(db), account_links, max_fanout=max_fanout)
+
+    sources = [
+        path_finder.node(node_type, account.username)
+        for node_type, account in (
+            (GraphNodeType.LINKEDIN_USER, current_user.linkedin_user),
+            (GraphNodeType.GITHUB_USER, current_user.github_user),
+        ) if account
+    ]
+    sources = [node for node in sources if node is not None]
+    if not sources:
+        raise HTTPException(status_code=400, detail="Connect a LinkedIn or GitHub account to find introductions")
+
+    targets = [
+        path_finder.node(node_type, target)
+        for node_type in (GraphNodeType.LINKEDIN_USER, GraphNodeType.GITHUB_USER)
+        if platform in (None, node_type)
+    ]
+    targets = [node for node in targets if node is not None]
+    if not targets:
+        raise HTTPException(status_code=404, detail="Target user not found")
+
+    paths = [
+        [path_finder.describe(node) for node in path]
+        for path in path_finder.find(sources, targets, max_depth=max_depth, k=k)
+    ]
+
+    # Attach display names in bulk
+    loader = Loader(db)
+    keys_by_type: Dict[GraphNodeType, set] = {}
+    for path in paths:
+        for node_type, key in path:
+            keys_by_type.setdefault(node_type, set()).add(key)
+    names = {}
+    for node_type, load in (
+        (GraphNodeType.LINKEDIN_USER, loader.linkedin_users),
+        (GraphNodeType.GITHUB_USER, loader.github_users),
+        (GraphNodeType.LINKEDIN_ORGANIZATION, loader.linkedin_organizations),
+    ):
+        for key, entity in load(keys_by_type.get(node_type, ())).items():
+            names[(node_type, key)] = entity.name
+
+    return {
+        "target": target,
+        "length": len(paths[0]) - 1 if paths else None,
+        "paths": [
+            [
+                {"type": node_type, "id": key, "name": names.get((node_type, key), key.split('/')[-1])}
+                for node_type, key in path
+            ]
+            for path in paths
+        ],
+    }
 
 def get_associated_github_user(user_id: int, db: Session):
     user = get_user_by_id(user_id, db)
@@ -30,231 +335,335 @@ def get_associated_linkedin_user(user_id: int, db: Session):
     user = get_user_by_id(user_id, db)
     return user.linkedin_user if user else None
 
-async def get_user_network(user_id: int, db: Session) -> Dict[str, List]:
+def organization_group(org) -> dict:
+    return {
+        "id": org.linkedin_id,
+        "name": org.name,
+        "description": org.description,
+        "logo": org.logo,
+        "link": org.website,
+        "industry": org.industry,
+        "company_size": org.company_size,
+        "headquarters": org.headquarters,
+        "specialties": org.specialties,
+        "is_linkedin": True
+    }
+
+def repository_group(repo) -> dict:
+    return {
+        "id": repo.path,
+        "name": repo.path.split('/')[-1],
+        "description": repo.description,
+        "is_linkedin": False,
+        "stars": repo.stars,
+        "link": f"https://github.com/{repo.path}"
+    }
+
+def user_node(account, is_linkedin: bool, connection_order: Optional[int], group_id: Optional[str]) -> dict:
+    return {
+        "is_linkedin": is_linkedin,
+        "username": account.username,
+        "individual_name": account.name,
+        "header": account.header,
+        "email": account.email,
+        "profile_picture": account.profile_picture,
+        "link": f"https://{'www.linkedin.com/in' if is_linkedin else 'github.com'}/{account.username}/",
+        "connection_order": connection_order,
+        "group_id": group_id
+    }
+
+class UserNetwork(NamedTuple):
+    reachable: Dict[GraphNodeType, Dict[str, int]]
+    linkedin_users: Dict[str, object]
+    github_users: Dict[str, object]
+    organizations: Dict[str, object]
+    repositories: Dict[str, object]
+
+def _network_group_ids(linkedin_users: Dict[str, object], github_users: Dict[str, object]) -> Tuple[List[str], List[str]]:
+    organization_ids = [
+        org.linkedin_id for linkedin_user in linkedin_users.values()
+        for org in linkedin_user.organizations[:MAX_GROUP_MEMBERS]
+    ]
+    repository_paths = [
+        repo.path for github_user in github_users.values()
+        for repo in github_user.repositories[:MAX_GROUP_MEMBERS]
+    ]
+    return organization_ids, repository_paths
+
+def load_user_network(user_id: int, db: Session, depth: int) -> UserNetwork:
+    """
+    Find everything within `depth` hops in one SQL round trip, then hydrate it in bulk.
+    """
+    reachable = get_reachable_network(user_id, depth, db)
+    loader = Loader(db)
+    linkedin_users = loader.linkedin_users(reachable[GraphNodeType.LINKEDIN_USER])
+    github_users = loader.github_users(reachable[GraphNodeType.GITHUB_USER])
+    organization_ids, repository_paths = _network_group_ids(linkedin_users, github_users)
+    return UserNetwork(
+        reachable, linkedin_users, github_users,
+        loader.linkedin_organizations(organization_ids), loader.repositories(repository_paths)
+    )
+
+async def load_user_network_async(user_id: int, db: AsyncSession, depth: int) -> UserNetwork:
+    reachable = await get_reachable_network_async(user_id, depth, db)
+    loader = AsyncLoader(db)
+    linkedin_users = await loader.linkedin_users(reachable[GraphNodeType.LINKEDIN_USER])
+    github_users = await loader.github_users(reachable[GraphNodeType.GITHUB_USER])
+    organization_ids, repository_paths = _network_group_ids(linkedin_users, github_users)
+    return UserNetwork(
+        reachable, linkedin_users, github_users,
+        await loader.linkedin_organizations(organization_ids), await loader.repositories(repository_paths)
+    )
+
+def iter_user_network(user_id: int, db: Session, depth: int = DEFAULT_NETWORK_DEPTH) -> Iterator[Tuple[str, dict]]:
     user = get_user_by_id(user_id, db)
     if not user:
-        return {"nodes": [], "groups": []}
-
-    nodes = []
-    groups = []
+        return
+    yield from iter_network_records(user, load_user_network(user_id, db, depth), get_connection_scorer(db))
+
+def iter_network_records(user: User, network: UserNetwork, scorer: ConnectionScorer) -> Iterator[Tuple[str, dict]]:
+    """
+    Build the user's network as a stream of ("group", group) records followed by ("node", node)
+    records. Only compact (platform, username, group) tuples are kept for the whole graph;
+    group and node payloads are produced one at a time.
+    """
+    reachable, linkedin_users, github_users, organizations, repositories = network
+    linkedin_orders = reachable[GraphNodeType.LINKEDIN_USER]
+    github_orders = reachable[GraphNodeType.GITHUB_USER]
+
+    identity = IdentityIndex()
+    identity.link_registered_accounts(linkedin_users.values(), github_users.values())
+
+    # One node per (account, group) membership; a node's id is its position in the plan
+    plan: List[Tuple[bool, str, str, int]] = []
     processed_users = set()
-    github_scraper = GithubScraper()
-
-    def create_node(user, is_linkedin, connection_order, group_id):
-        node = {
-            "id": len(nodes),
-            "is_linkedin": is_linkedin,
-            "username": user.username,
-            "individual_name": user.name,
-            "header": user.header,
-            "email": user.email,
-            "profile_picture": user.profile_picture,
-            "link": f"https://{'www.linkedin.com/in' if is_linkedin else 'github.com'}/{user.username}/",
-            "connection_order": connection_order,
-            "corresponding_user_nodes": [],
-            "group_id": group_id
-        }
-        nodes.append(node)
-        return node
 
-    def process_linkedin_user(linkedin_user, connection_order=0):
-        if linkedin_user.username in processed_users:
-            return None
+    def process_linkedin_user(username, connection_order=0):
+        if (True, username) in processed_users:
+            return
 
-        processed_users.add(linkedin_user.username)
-        user_nodes = []
+        processed_users.add((True, username))
 
         # Process organizations
-        for org_contribution, _ in get_user_organization_associations(db, username=linkedin_user.username):
-            org = get_linkedin_organization_by_id(org_contribution.linkedin_id, db)
-            if org:
-                node = create_node(linkedin_user, True, connection_order, org.linkedin_id)
-                user_nodes.append(node)
-                if org.linkedin_id not in [g["id"] for g in groups]:
-                    groups.append({
-                        "id": org.linkedin_id,
-                        "name": org.name,
-                        "description": org.description,
-                        "logo": org.logo,
-                        "link": org.website,
-                        "industry": org.industry,
-                        "company_size": org.company_size,
-                        "headquarters": org.headquarters,
-                        "specialties": org.specialties,
-                        "is_linkedin": True
-                    })
-
-        for node in user_nodes:
-            node["corresponding_user_nodes"] = list(set([
-                other_node["id"] for other_node in nodes + user_nodes
-                if other_node["username"] == node["username"] and
-                (other_node["is_linkedin"] != node["is_linkedin"] or other_node["group_id"] != node["group_id"])
-            ]))
+        for org_contribution in linkedin_users[username].organizations[:MAX_GROUP_MEMBERS]:
+            if org_contribution.linkedin_id in organizations:
+                plan.append((True, username, org_contribution.linkedin_id, connection_order))
 
         # Check for corresponding GitHub user
-        github_user = get_associated_github_user(linkedin_user.user_id, db)
-        if github_user:
-            github_nodes = process_github_user(github_user, connection_order)
-            if github_nodes:
-                for linkedin_node in user_nodes:
-                    for github_node in github_nodes:
-                        if github_node["id"] not in linkedin_node["corresponding_user_nodes"]:
-                            linkedin_node["corresponding_user_nodes"].append(github_node["id"])
-                        if linkedin_node["id"] not in github_node["corresponding_user_nodes"]:
-                            github_node["corresponding_user_nodes"].append(linkedin_node["id"])
-
-        nodes.extend(user_nodes)
-        return user_nodes
-
-    def process_github_user(github_user, connection_order=0):
-        if github_user.username in processed_users:
-            return None
-
-        processed_users.add(github_user.username)
-        user_nodes = []
-
-        # Process repositories
-        for repo in get_repositories_by_github_user(github_user.username, db):
-            node = create_node(github_user, False, connection_order, repo.path)
-            user_nodes.append(node)
-            if repo.path not in [g["id"] for g in groups]:
-                groups.append({
-                    "id": repo.path,
-                    "name": repo.path.split('/')[-1],
-                    "description": repo.description,
-                    "is_linkedin": False,
-                    "stars": repo.stars,
-                    "link": f"https://github.com/{repo.path}"
-                })
-
-        for node in user_nodes:
-            node["corresponding_user_nodes"] = list(set([
-                other_node["id"] for other_node in nodes + user_nodes
-                if other_node["username"] == node["username"] and
-                (other_node["is_linkedin"] != node["is_linkedin"] or other_node["group_id"] != node["group_id"])
-            ]))
-
-        linkedin_user = get_associated_linkedin_user(github_user.user_id, db)
-        if linkedin_user:
-            linkedin_nodes = process_linkedin_user(linkedin_user, connection_order)
-            if linkedin_nodes:
-                for github_node in user_nodes:
-                    for linkedin_node in linkedin_nodes:
-                        if github_node["id"] not in linkedin_node["corresponding_user_nodes"]:
-                            linkedin_node["corresponding_user_nodes"].append(github_node["id"])
-                        if linkedin_node["id"] not in github_node["corresponding_user_nodes"]:
-                            github_node["corresponding_user_nodes"].append(linkedin_node["id"])
-
-        nodes.extend(user_nodes)
-        return user_nodes
-
-    # Process the main user and their direct associations
-    linkedin_user = get_associated_linkedin_user(user_id, db)
-    github_user = get_associated_github_user(user_id, db)
-
-    if linkedin_user:
-        process_linkedin_user(linkedin_user)
-    if github_user:
-        process_github_user(github_user)
-
-    # Process second-degree connections
-    first_degree_nodes = [node for node in nodes if node["connection_order"] == 0]
-    for node in first_degree_nodes:
-        if node["is_linkedin"]:
-            linkedin_user = get_linkedin_user_by_username(node["username"], db)
-            for org_contribution, _ in get_user_organization_associations(db, username=linkedin_user.username):
-                for _, user_contribution in get_user_organization_associations(db, organization_id=org_contribution.linkedin_id):
-                    other_user = get_linkedin_user_by_username(user_contribution.username, db)
-                    if other_user:
-                        nodes.extend(process_linkedin_user(other_user, 2) or [])
-        else:
-            github_user = get_github_user_by_username(node["username"], db)
-            for repo in get_repositories_by_github_user(github_user.username, db):
-                for other_user in get_github_users_by_repository(repo.path, db):
-                    nodes.extend(process_github_user(other_user, 2) or [])
-
-    return {"nodes": nodes, "groups": groups}
+        github_username = identity.linked_account(username, is_linkedin=True)
+        if github_username in github_users:
+            process_github_user(github_username, connection_order)
 
-
-async def get_public_network(db: Session) -> Dict[str, List]:
-    nodes = []
-    links = []
-    processed_groups = set()
-
-    def process_linkedin_organization(org_id):
-        if org_id in processed_groups:
+    def process_github_user(username, connection_order=0):
+        if (False, username) in processed_users:
             return
 
-        processed_groups.add(org_id)
-        org = get_linkedin_organization_by_id(org_id, db)
-        if not org:
-            return
+        processed_users.add((False, username))
 
-        node = {
-            "id": org_id,
-            "type": "linkedin_organization",
-            "name": org.name,
-            "description": org.description,
-            "industry": org.industry,
-            "company_size": org.company_size,
-            "user_count": len(org.linkedin_users)
-        }
-        nodes.append(node)
-
-        # Process connections to other organizations
-        for user_contribution in org.linkedin_users:
-            user_orgs = get_user_organization_associations(db, username=user_contribution.username)
-            for other_org, _ in user_orgs:
-                if other_org.linkedin_id != org_id:
-                    links.append({
-                        "source": org_id,
-                        "target": other_org.linkedin_id,
-                        "type": "shared_user"
-                    })
-                    process_linkedin_organization(other_org.linkedin_id)
-
-    def process_github_repository(repo_path):
-        if repo_path in processed_groups:
-            return
+        # Process repositories
+        for repo_contribution in github_users[username].repositories[:MAX_GROUP_MEMBERS]:
+            if repo_contribution.path in repositories:
+                plan.append((False, username, repo_contribution.path, connection_order))
+
+        linkedin_username = identity.linked_account(username, is_linkedin=False)
+        if linkedin_username in linkedin_users:
+            process_linkedin_user(linkedin_username, connection_order)
+
+    # Process the main user and their direct associations, then everyone else reached, nearest first
+    reached = [(order, 0, username) for username, order in linkedin_orders.items() if username in linkedin_users]
+    reached += [(order, 1, username) for username, order in github_orders.items() if username in github_users]
+    for connection_order, platform, username in sorted(reached):
+        if platform == 0:
+            process_linkedin_user(username, connection_order)
+        else:
+            process_github_user(username, connection_order)
 
-        processed_groups.add(repo_path)
-        repo = get_repository_by_path(repo_path, db)
-        if not repo:
-            return
+    for node_id, (is_linkedin, username, _, _) in enumerate(plan):
+        identity.add_node(node_id, username, is_linkedin)
 
-        node = {
-            "id": repo_path,
-            "type": "github_repository",
-            "name": repo_path.split('/')[-1],
-            "description": repo.description,
-            "stars": repo.stars,
-            "contributor_count": len(repo.github_users)
+    for is_linkedin, _, group_id, _ in plan:
+        if not identity.add_group(group_id):
+            continue
+        if is_linkedin:
+            yield "group", organization_group(organizations[group_id])
+        else:
+            yield "group", repository_group(repositories[group_id])
+
+    scores = scorer.score_accounts(
+        processed_users,
+        linkedin_seed=user.linkedin_user.username if user.linkedin_user else None,
+        github_seed=user.github_user.username if user.github_user else None,
+    )
+
+    for node_id, (is_linkedin, username, group_id, connection_order) in enumerate(plan):
+        account = linkedin_users[username] if is_linkedin else github_users[username]
+        yield "node", {
+            "id": node_id,
+            **user_node(account, is_linkedin, connection_order, group_id),
+            "corresponding_user_nodes": identity.corresponding_user_nodes(node_id, username, is_linkedin),
+            **scores[(is_linkedin, username)],
         }
-        nodes.append(node)
-
-        # Process connections to other repositories
-        for user_contribution in repo.github_users:
-            user_repos = get_repositories_by_github_user(user_contribution.username, db)
-            for other_repo in user_repos:
-                if other_repo.path != repo_path:
-                    links.append({
-                        "source": repo_path,
-                        "target": other_repo.path,
-                        "type": "shared_contributor"
-                    })
-                    process_github_repository(other_repo.path)
-
-    # Start processing from all LinkedIn organizations
-    linkedin_organizations = db.query(LinkedinOrganization).offset(0).limit(300).all()
-    
-    if not linkedin_organizations:
-        raise HTTPException(status_code=404, detail="No LinkedIn organizations found")
-    
-    linkedin_organizations = [LinkedinOrganizationSchema.from_orm(org) for org in linkedin_organizations]
-    for org in linkedin_organizations:
-        process_linkedin_organization(org.linkedin_id)
 
-    for repo in get_all_repositories(db):
-        process_github_repository(repo.path)
+async def build_user_network_async(user_id: int, db: AsyncSession, depth: int = DEFAULT_NETWORK_DEPTH) -> Dict[str, List]:
+    network = {"nodes": [], "groups": []}
+    user = await get_user_by_id_async(user_id, db)
+    if not user:
+        return network
+    loaded = await load_user_network_async(user_id, db, depth)
+    scorer = await run_with_sync_session(get_connection_scorer)
+    for kind, record in iter_network_records(user, loaded, scorer):
+        network[f"{kind}s"].append(record)
+    return network
+
+async def get_clustered_network(user_id: int, db: AsyncSession, depth: int = DEFAULT_NETWORK_DEPTH) -> Dict[str, List]:
+    """
+    Collapsed view of the user's network: one super-node per organization/repository of the
+    reached users with its member count (within the network), and links between groups
+    weighted by the number of people they share.
+    Individual users are not loaded; expand a group to get its members.
+    """
+    reachable = await get_reachable_network_async(user_id, depth, db)
+    memberships = await get_network_memberships_async(reachable, db)
+    registered_user_ids = await get_registered_user_ids_async(
+        reachable[GraphNodeType.LINKEDIN_USER], reachable[GraphNodeType.GITHUB_USER], db
+    )
+
+    # Group memberships per person, merging LinkedIn and GitHub accounts of the same registered user
+    person_groups: Dict[tuple, List[Tuple[GraphNodeType, str]]] = defaultdict(list)
+    member_counts: Dict[Tuple[GraphNodeType, str], int] = defaultdict(int)
+    connection_orders: Dict[Tuple[GraphNodeType, str], int] = {}
+    for group_type, user_type in (
+        (GraphNodeType.LINKEDIN_ORGANIZATION, GraphNodeType.LINKEDIN_USER),
+        (GraphNodeType.GITHUB_REPOSITORY, GraphNodeType.GITHUB_USER),
+    ):
+        is_linkedin = group_type == GraphNodeType.LINKEDIN_ORGANIZATION
+        account_groups: Dict[str, List[str]] = defaultdict(list)
+        for username, group_id in memberships[group_type]:
+            account_groups[username].append(group_id)
+        for username, group_ids in account_groups.items():
+            person = registered_user_ids.get((is_linkedin, username), (is_linkedin, username))
+            order = reachable[user_type][username]
+            for group_id in sorted(group_ids)[:MAX_GROUP_MEMBERS]:
+                key = (group_type, group_id)
+                person_groups[person].append(key)
+                member_counts[key] += 1
+                connection_orders[key] = min(connection_orders.get(key, order), order)
+
+    link_weights: Dict[tuple, int] = defaultdict(int)
+    for groups in person_groups.values():
+        for a, b in combinations(sorted(groups), 2):
+            link_weights[(a, b)] += 1
+
+    loader = AsyncLoader(db)
+    organizations = await loader.linkedin_organizations(
+        group_id for group_type, group_id in member_counts if group_type == GraphNodeType.LINKEDIN_ORGANIZATION
+    )
+    repositories = await loader.repositories(
+        group_id for group_type, group_id in member_counts if group_type == GraphNodeType.GITHUB_REPOSITORY
+    )
 
-    return {"nodes": nodes, "links": links}
\ No newline at end of file
+    groups = []
+    for (group_type, group_id), member_count in member_counts.items():
+        if group_type == GraphNodeType.LINKEDIN_ORGANIZATION:
+            group = organization_group(organizations[group_id]) if group_id in organizations else None
+        else:
+            group = repository_group(repositories[group_id]) if group_id in repositories else None
+        if group:
+            group["type"] = group_type.value
+            group["member_count"] = member_count
+            group["connection_order"] = connection_orders[(group_type, group_id)]
+            groups.append(group)
+    groups.sort(key=lambda group: (group["connection_order"], -group["member_count"], group["id"]))
+
+    links = [
+        {"source": a[1], "target": b[1], "source_type": a[0].value, "target_type": b[0].value, "weight": weight}
+        for (a, b), weight in link_weights.items()
+    ]
+    return {"groups": groups, "links": links}
+
+async def get_group_members(
+    group_type: GraphNodeType,
+    group_id: str,
+    loader: AsyncLoader,
+    orders: Optional[Dict[GraphNodeType, Dict[str, int]]],
+    offset: int,
+    limit: int,
+) -> Tuple[List[str], dict, List[dict]]:
+    """
+    Return (member usernames, group, member nodes for one page) for an organization or
+    repository. With `orders` (a reachable network), only reached members are listed,
+    nearest first.
+    """
+    is_linkedin = group_type == GraphNodeType.LINKEDIN_ORGANIZATION
+    if is_linkedin:
+        groups = await loader.linkedin_organizations([group_id])
+    else:
+        groups = await loader.repositories([group_id])
+    if group_id not in groups:
+        raise HTTPException(status_code=404, detail="Group not found")
+    group = organization_group(groups[group_id]) if is_linkedin else repository_group(groups[group_id])
+
+    usernames = await get_group_member_usernames_async(group_type, group_id, loader.db)
+    user_orders = None
+    if orders is not None:
+        user_orders = orders[GraphNodeType.LINKEDIN_USER if is_linkedin else GraphNodeType.GITHUB_USER]
+        usernames = sorted((username for username in usernames if username in user_orders), key=lambda u: (user_orders[u], u))
+    else:
+        usernames.sort()
+
+    page = usernames[offset:offset + limit]
+    accounts = await (loader.linkedin_users(page) if is_linkedin else loader.github_users(page))
+    nodes = [
+        user_node(accounts[username], is_linkedin, user_orders[username] if user_orders else None, group_id)
+        for username in page if username in accounts
+    ]
+    return usernames, group, nodes
+
+@router.get("/group/{group_type}/{group_id:path}")
+async def expand_network_group(
+    group_type: GraphNodeType,
+    group_id: str,
+    depth: int = Query(DEFAULT_NETWORK_DEPTH, ge=1, le=MAX_NETWORK_DEPTH),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(MAX_GROUP_MEMBERS, ge=1, le=1000),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Members of one organization or repository from the clustered network, with connection
+    strength relative to the current user.
+    """
+    if group_type not in (GraphNodeType.LINKEDIN_ORGANIZATION, GraphNodeType.GITHUB_REPOSITORY):
+        raise HTTPException(status_code=400, detail="Only organizations and repositories can be expanded")
+    reachable = await get_reachable_network_async(current_user.id, depth, db)
+    usernames, group, nodes = await get_group_members(group_type, group_id, AsyncLoader(db), reachable, offset, limit)
+    if not usernames:
+        raise HTTPException(status_code=404, detail="Group is not in your network")
+
+    # Normalize over every reached member so strengths do not depend on the page
+    is_linkedin = group_type == GraphNodeType.LINKEDIN_ORGANIZATION
+    scorer = await run_with_sync_session(get_connection_scorer)
+    scores = scorer.score_accounts(
+        ((is_linkedin, username) for username in usernames),
+        linkedin_seed=current_user.linkedin_user.username if current_user.linkedin_user else None,
+        github_seed=current_user.github_user.username if current_user.github_user else None,
+    )
+    for node in nodes:
+        node.update(scores[(is_linkedin, node["username"])])
+    return {"group": group, "member_count": len(usernames), "nodes": nodes}
+
+@router.get("/public/group/{group_type}/{group_id:path}")
+async def expand_public_network_group(
+    group_type: GraphNodeType,
+    group_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(MAX_GROUP_MEMBERS, ge=1, le=1000),
+    loader: AsyncLoader = Depends(get_async_loader)
+):
+    """
+    Members of one organization or repository from the public network, a page at a time.
+    """
+    if group_type not in (GraphNodeType.LINKEDIN_ORGANIZATION, GraphNodeType.GITHUB_REPOSITORY):
+        raise HTTPException(status_code=400, detail="Only organizations and repositories can be expanded")
+    usernames, group, nodes = await get_group_members(group_type, group_id, loader, None, offset, limit)
+    return {"group": group, "member_count": len(usernames), "nodes": nodes}
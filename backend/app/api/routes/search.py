@@ -1,94 +1,219 @@
-
+import asyncio
+from typing import Optional
 from fastapi import APIRouter
-from app.chromadb import get_chroma_collection
+from starlette.concurrency import run_in_threadpool
+from app.chromadb import get_chroma_count
 from app.agents.classifier import classify_query_func
 from app.agents.company_query_optimizer import handle_company_query_func
 from app.agents.other_query_optimizer import handle_other_query_func
-from app.chromadb.dataclass import ChromaResult
-from app.chromadb.internal_api import query_from_chroma
-from app.db.linkedin_organization_functions import get_linkedin_organization_by_id
-from app.models.linkedin_organization import LinkedinOrganization
-from app.models.linkedin_user import LinkedinUser
-from app.models.repository import Repository
-from fastapi import Depends
-from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.agents.local_classifier import classify_query_locally, learn_query_label
+from app.agents.query_planner import plan_query_func
+from app.core.config import settings
+from app.chromadb.chunking import CHUNKED_COLLECTIONS, collapse_chunk_hits
+from app.chromadb.internal_api import query_chroma_batch
+from app.schemas.linkedin_organization import LinkedinOrganization as LinkedinOrganizationSchema
+from app.schemas.linkedin_user import LinkedinUser as LinkedinUserSchema
+from app.schemas.repository import Repository as RepositorySchema
+from fastapi import Depends, Query
+from app.db.loader import AsyncLoader, get_async_loader
 from app.schemas.search import GeneralQuerySchema, LinkedinQuerySchema
-from app.utils.enums import ChromaCollections
-from app.db.repository_functions import get_repository_by_path
-from app.db.linkedin_user_functions import get_users_by_organization
+from app.utils.enums import ChromaCollections, SearchType
+from app.utils.llm_cache import normalize_query
+from app.db.linkedin_organization_functions import get_organization_search_hits_async
+from app.db.search_query_label_functions import record_search_query_label_async
+from app.db.session import AsyncSessionLocal
+from app.utils.single_flight import SingleFlight
+from app.search import get_lexical_index
+from app.search.fusion import reciprocal_rank_fusion
 
 
 router = APIRouter(prefix="/search", tags=["search"])
 
+# Members returned per organization hit
+MAX_SEARCH_MEMBERS = 250
+# Chunks fetched per wanted result, since several chunks of one README often match
+CHUNK_OVERFETCH = 4
+
+
+# Concurrent identical searches share one planning stage and one lookup per index
+_search_flights = SingleFlight()
+
+
+async def _query_chroma_ids(searches: list[tuple[ChromaCollections, str]], n_results: int = 5) -> list[list[str]]:
+    """
+    Vector lookups for (collection, optimized query) pairs, each query embedded once and
+    run as one batch in the threadpool. Chunked collections are over-fetched and
+    collapsed to parent ids by their best chunk.
+    """
+    chroma_queries = [
+        (collection, optimized_query, n_results * CHUNK_OVERFETCH if collection in CHUNKED_COLLECTIONS else n_results)
+        for collection, optimized_query in searches
+    ]
+    async def query_chroma():
+        chroma_results = await run_in_threadpool(query_chroma_batch, chroma_queries)
+        return [
+            collapse_chunk_hits(result.ids, result.distances, n_results) if collection in CHUNKED_COLLECTIONS else result.ids
+            for (collection, _), result in zip(searches, chroma_results)
+        ]
+    return await _search_flights.do(("chroma", tuple(searches), n_results), query_chroma)
+
+
+def _lexical_ids(collection: ChromaCollections, text: str, n_results: int) -> list[str]:
+    if collection == ChromaCollections.LINKEDIN_ORGANIZATION:
+        return get_lexical_index().search_organizations(text, n_results)
+    return get_lexical_index().search_repositories(text, n_results)
+
+
+def _organizations_named(query: str) -> list[str]:
+    return get_lexical_index().organizations_named(query)
+
+
+async def _lexical_rankings(collection: ChromaCollections, query: str, optimized_query: str, n_results: int) -> list[list[str]]:
+    lexical_text = f"{query} {optimized_query}"
+    lookups = [
+        _search_flights.do(
+            ("lexical", collection, lexical_text, n_results),
+            lambda: run_in_threadpool(_lexical_ids, collection, lexical_text, n_results),
+        ),
+    ]
+    if collection == ChromaCollections.LINKEDIN_ORGANIZATION:
+        lookups.append(run_in_threadpool(_organizations_named, query))
+    return list(await asyncio.gather(*lookups))
+
+
+async def _hybrid_search_ids(query: str, searches: list[tuple[ChromaCollections, str]], n_results: int = 5) -> list[list[str]]:
+    """
+    For each (collection, optimized query), fuse Chroma hits for the optimized query with
+    BM25 hits for the user's words plus the optimized keywords, so exact names and rare
+    terms are not lost. Organizations named exactly like the query get a third ranking
+    of their own.
+    """
+    vector_rankings, *lexical_rankings = await asyncio.gather(
+        _query_chroma_ids(searches, n_results),
+        *(_lexical_rankings(collection, query, optimized_query, n_results) for collection, optimized_query in searches),
+    )
+    return [
+        reciprocal_rank_fusion([vector_ranking, *rankings], n_results)
+        for vector_ranking, rankings in zip(vector_rankings, lexical_rankings)
+    ]
+
+
+async def _plan_with_separate_calls(query: str, classification: Optional[str] = None) -> tuple[str, str, Optional[str]]:
+    """
+    Classify and optimize with separate LLM calls, returning (classification, company
+    query, people query). A known classification skips the classifier and starts only
+    the optimizers it needs. Otherwise both optimizers start alongside the classifier;
+    the people query is only needed for individual searches and is cancelled otherwise.
+    """
+    if classification == SearchType.COMPANY:
+        return classification, await handle_company_query_func(query=query), None
+    if classification == SearchType.INDIVIDUAL:
+        company_query, people_query = await asyncio.gather(
+            handle_company_query_func(query=query), handle_other_query_func(query=query)
+        )
+        return classification, company_query, people_query
+
+    other_query_task = asyncio.create_task(handle_other_query_func(query=query))
+    company_query_task = asyncio.create_task(handle_company_query_func(query=query))
+    try:
+        classification = await classify_query_func(query=query)
+        if classification == "individual":
+            company_query, people_query = await asyncio.gather(company_query_task, other_query_task)
+        else:
+            company_query, people_query = await company_query_task, None
+    finally:
+        # No-op for finished tasks; drops the unneeded branch or cleans up on error
+        other_query_task.cancel()
+        company_query_task.cancel()
+    return classification, company_query, people_query
+
+
+async def _learn_query_label(query: str, search_type: SearchType) -> None:
+    """
+    Log an LLM classification and teach it to the local classifier.
+    """
+    async with AsyncSessionLocal() as db:
+        await record_search_query_label_async(normalize_query(query), search_type, db)
+    await run_in_threadpool(learn_query_label, query, search_type)
+
+
+async def _plan_search(query: str) -> tuple[str, str, Optional[str]]:
+    """
+    Return (classification, company query, people query). Organization names skip the
+    LLM. When the local classifier is confident, only the optimizers for its label are
+    called; otherwise the LLM classifies, in the single planner call when enabled.
+    """
+    if await run_in_threadpool(_organizations_named, query):
+        return SearchType.COMPANY.value, query, None
+
+    if settings.LOCAL_QUERY_CLASSIFIER:
+        local_search_type = await run_in_threadpool(classify_query_locally, query)
+        if local_search_type is not None:
+            return await _plan_with_separate_calls(query, local_search_type.value)
+
+    plan = await plan_query_func(query=query) if settings.SEARCH_QUERY_PLANNER else None
+    if plan is not None:
+        classification, company_query, people_query = plan.search_type.value, plan.company_query, plan.people_query
+    else:
+        classification, company_query, people_query = await _plan_with_separate_calls(query)
+    # Teach the local classifier labels it could not give itself
+    if settings.LOCAL_QUERY_CLASSIFIER and classification in (SearchType.COMPANY, SearchType.INDIVIDUAL):
+        await _learn_query_label(query, SearchType(classification))
+    return classification, company_query, people_query
+
+
+async def _hydrate_results(
+    loader: AsyncLoader,
+    organization_ids: list[str],
+    repository_paths: list[str],
+    max_members: int,
+) -> tuple[list[LinkedinOrganizationSchema], list[LinkedinUserSchema], list[RepositorySchema]]:
+    """
+    Load every hit in a fixed number of IN queries, keeping the search ranking order.
+    """
+    organizations, members = await get_organization_search_hits_async(organization_ids, max_members, loader.db)
+    repositories = await loader.repositories(repository_paths)
+
+    linkedin_results = [organizations[linkedin_id] for linkedin_id in organization_ids if linkedin_id in organizations]
+    linkedin_user_results = [
+        LinkedinUserSchema.model_validate(user) for linkedin_id in organization_ids for user in members[linkedin_id]
+    ]
+    github_results = [repositories[path] for path in repository_paths if path in repositories]
+    return linkedin_results, linkedin_user_results, github_results
+
 
 @router.get("/perform_search", response_model=GeneralQuerySchema)
 async def general_search(
     query: str,
-    db: Session = Depends(get_db)
+    max_members: int = Query(MAX_SEARCH_MEMBERS, ge=1, le=MAX_SEARCH_MEMBERS),
+    loader: AsyncLoader = Depends(get_async_loader)
 ):
     print("entered general search func")
 
-    print(get_chroma_collection(ChromaCollections.LINKEDIN_ORGANIZATION).count())
-    print(get_chroma_collection(ChromaCollections.GITHUB_REPOSITORY).count())
-    
-    classification = classify_query_func(query=query)
-    github_results: list[Repository] = []
+    print(get_chroma_count(ChromaCollections.LINKEDIN_ORGANIZATION))
+    print(get_chroma_count(ChromaCollections.GITHUB_REPOSITORY))
+
+    classification, company_query, people_query = await _search_flights.do(
+        ("plan", normalize_query(query)),
+        lambda: _plan_search(query),
+    )
     print(classification)
+    print("Optimized queries: ", company_query, people_query)
 
     #if we're just searching over individual, search over github and linkedin companies
+    #if we're searching over companies, search over linkedin companies only
+    searches = [(ChromaCollections.LINKEDIN_ORGANIZATION, company_query)]
     if classification == "individual":
-        optimized_query = handle_other_query_func(query=query)
-        print("Optimized query: ", optimized_query)
-
-        github_chroma_results = get_chroma_collection(ChromaCollections.GITHUB_REPOSITORY).query(
-            query_texts = optimized_query,
-            n_results = 5
-        )
-
-        print(github_chroma_results)
-
-        for github_chroma_result_id in github_chroma_results.get('ids')[0]:
-            github_results.append(
-                get_repository_by_path(
-                    path=github_chroma_result_id,
-                    db=db,
-                )
-            )
-    #if we're searching over companies, search over linkedin companies
-        
-    optimized_query = handle_company_query_func(query=query)
-
-    print("Optimized query: ", optimized_query)
-
-    chroma_results = get_chroma_collection(ChromaCollections.LINKEDIN_ORGANIZATION).query(
-        query_texts = optimized_query,
-        n_results = 5
+        searches.append((ChromaCollections.GITHUB_REPOSITORY, people_query))
+    chroma_result_ids, *github_chroma_result_ids = await _hybrid_search_ids(query, searches)
+
+    linkedin_results, linkedin_user_results, github_results = await _hydrate_results(
+        loader,
+        chroma_result_ids,
+        github_chroma_result_ids[0] if github_chroma_result_ids else [],
+        max_members,
     )
 
-    print(get_chroma_collection(ChromaCollections.LINKEDIN_ORGANIZATION).count())
-    print(get_chroma_collection(ChromaCollections.GITHUB_REPOSITORY).count())
-
-    print(chroma_results)
-
-    linkedin_results: list[LinkedinOrganization] = []
-    linkedin_user_results: list[LinkedinUser] = []
-
-
-    for chroma_result_id in chroma_results.get('ids')[0]:
-        linkedin_results.append(
-            get_linkedin_organization_by_id(
-                linkedin_id=chroma_result_id,
-                db=db,
-            )
-        )
-        users = get_users_by_organization(
-            db=db,
-            organization_id=chroma_result_id,
-        )
-        for user in users:
-            linkedin_user_results.append(user)
-
     print("linkedin: ", linkedin_results)
     print("github: ", github_results)
 
@@ -1,16 +1,87 @@
 from app.utils.enums import ChromaCollections
 import chromadb as cdb
-from typing import Any
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from threading import Lock
+from typing import Any, Dict, Optional
+import time
+
+
+# Counts only feed logging, so they may lag writes made by other processes
+CHROMA_COUNT_TTL_SECONDS = 60
+
+_client_lock = Lock()
+_chroma_client: Optional[Any] = None
+_collections: Dict[ChromaCollections, Any] = {}
+_counts: Dict[ChromaCollections, tuple[float, int]] = {}
 
 
 def get_chroma_client():
-    return cdb.PersistentClient(
-        path="persistent_chroma_client",
-    )
+    """
+    The process-wide persistent client, created on first use (or by init_chroma at startup).
+    Chroma clients are safe to share across threads.
+    """
+    global _chroma_client
+    if _chroma_client is None:
+        with _client_lock:
+            if _chroma_client is None:
+                _chroma_client = cdb.PersistentClient(
+                    path="persistent_chroma_client",
+                )
+    return _chroma_client
 
 
 def get_chroma_collection(collection: ChromaCollections) -> Any:
-    chroma_client = get_chroma_client()
-    return chroma_client.get_or_create_collection(
-        name=collection,
-    )
+    chroma_collection = _collections.get(collection)
+    if chroma_collection is None:
+        chroma_client = get_chroma_client()
+        with _client_lock:
+            chroma_collection = _collections.get(collection)
+            if chroma_collection is None:
+                chroma_collection = chroma_client.get_or_create_collection(
+                    name=collection,
+                    embedding_function=get_embedding_function(),
+                )
+                _collections[collection] = chroma_collection
+    return chroma_collection
+
+
+def get_chroma_count(collection: ChromaCollections) -> int:
+    cached = _counts.get(collection)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    count = get_chroma_collection(collection).count()
+    _counts[collection] = (time.monotonic() + CHROMA_COUNT_TTL_SECONDS, count)
+    return count
+
+
+def invalidate_chroma_count(collection: ChromaCollections) -> None:
+    _counts.pop(collection, None)
+
+
+def init_chroma() -> None:
+    """
+    Open the client and every collection up front so requests never pay for it.
+    """
+    for collection in ChromaCollections:
+        get_chroma_collection(collection)
+
+
+def close_chroma() -> None:
+    global _chroma_client
+    with _client_lock:
+        _collections.clear()
+        _counts.clear()
+        _chroma_client = None
+
+
+_embedding_function = None
+
+
+def get_embedding_function() -> DefaultEmbeddingFunction:
+    """
+    The embedding model collections use by default, loaded once per process.
+    """
+    global _embedding_function
+    if _embedding_function is None:
+        _embedding_function = DefaultEmbeddingFunction()
+    return _embedding_function
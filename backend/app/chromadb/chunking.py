@@ -0,0 +1,82 @@
+import re
+from typing import Dict, Iterable, List, Sequence
+from app.utils.enums import ChromaCollections
+
+
+# The default embedding model truncates input at 256 word pieces, roughly 1000 characters
+CHUNK_MAX_CHARS = 1000
+# Bounds the embedding cost of huge READMEs; the tail of a very long README adds little
+MAX_CHUNKS_PER_DOCUMENT = 64
+# Chroma metadata keys on each chunk
+PARENT_ID_KEY = "parent_id"
+CHUNK_INDEX_KEY = "chunk_index"
+CHUNK_SEPARATOR = "#"
+
+# Collections whose documents are stored as chunks with ids like "path#n"
+CHUNKED_COLLECTIONS = {ChromaCollections.GITHUB_REPOSITORY}
+
+_PARAGRAPH_PATTERN = re.compile(r"\n\s*\n")
+
+
+def chunk_id(parent_id: str, index: int) -> str:
+    return f"{parent_id}{CHUNK_SEPARATOR}{index}"
+
+
+def chunk_parent(id: str) -> str:
+    """
+    The entity id a chunk belongs to. Ids without a chunk suffix are returned unchanged.
+    """
+    return id.rsplit(CHUNK_SEPARATOR, 1)[0]
+
+
+def chunk_document(document: str, max_chars: int = CHUNK_MAX_CHARS) -> List[str]:
+    """
+    Split a document into chunks of at most max_chars, packing whole paragraphs where
+    possible and hard-splitting paragraphs that are longer. A document with no text is a
+    single empty chunk, so every entity keeps one entry in Chroma.
+    """
+    chunks: List[str] = []
+    current = ""
+    for paragraph in _PARAGRAPH_PATTERN.split(document or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + 2 + len(paragraph) <= max_chars:
+            current = f"{current}\n\n{paragraph}"
+            continue
+        if current:
+            chunks.append(current)
+        while len(paragraph) > max_chars:
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        current = paragraph
+    if current:
+        chunks.append(current)
+    return chunks[:MAX_CHUNKS_PER_DOCUMENT] or [""]
+
+
+def join_chunks(chunks: Dict[str, str]) -> Dict[str, str]:
+    """
+    Reassemble {chunk id: text} into {parent id: document}, in chunk order.
+    """
+    ordered: Dict[str, List[tuple[int, str]]] = {}
+    for id, text in chunks.items():
+        parent_id, _, index = id.rpartition(CHUNK_SEPARATOR)
+        ordered.setdefault(parent_id or id, []).append((int(index) if parent_id else 0, text))
+    return {
+        parent_id: "\n\n".join(text for _, text in sorted(parts) if text)
+        for parent_id, parts in ordered.items()
+    }
+
+
+def collapse_chunk_hits(ids: Sequence[str], distances: Iterable[float], limit: int) -> List[str]:
+    """
+    Map chunk hits to their parent ids, scoring each parent by its best (closest) chunk,
+    and return the top parents in score order.
+    """
+    best: Dict[str, float] = {}
+    for id, distance in zip(ids, distances):
+        parent_id = chunk_parent(id)
+        if parent_id not in best or distance < best[parent_id]:
+            best[parent_id] = distance
+    return sorted(best, key=best.get)[:limit]
@@ -4,3 +4,9 @@ from dataclasses import dataclass
 class ChromaResult:
     id: str
     document: str
+
+
+@dataclass
+class ChromaQueryResult:
+    ids: list[str]
+    distances: list[float]
@@ -0,0 +1,214 @@
+import hashlib
+import random
+from datetime import datetime, timedelta
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.chromadb import get_chroma_collection, invalidate_chroma_count
+from app.chromadb.chunking import CHUNK_INDEX_KEY, CHUNKED_COLLECTIONS, PARENT_ID_KEY, chunk_document, chunk_id
+from app.db.session import SessionLocal
+from app.models.chroma_outbox import ChromaOutbox
+from app.utils.enums import ChromaCollections
+
+
+INGESTION_BATCH_SIZE = 64
+INGESTION_MAX_DELAY_SECONDS = 2.0
+# Other processes (crawler agents) write outbox rows too; pick those up by polling
+RELAY_POLL_SECONDS = 10.0
+RETRY_BASE_SECONDS = 5.0
+RETRY_MAX_SECONDS = 30 * 60.0
+# Chroma metadata key holding the hash of the embedded document
+CONTENT_HASH_KEY = "content_hash"
+
+
+def content_hash(document: str) -> str:
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def record_chroma_document(collection: ChromaCollections, id: str, document: str, db: Session) -> None:
+    """
+    Add a Chroma upsert to the outbox. The caller commits, so the row lands in the same
+    transaction as the entity it describes; the relay applies it afterwards.
+    """
+    now = datetime.utcnow()
+    db.add(ChromaOutbox(
+        collection=collection.value,
+        document_id=id,
+        document=document,
+        attempts=0,
+        next_attempt_at=now,
+        created_at=now,
+    ))
+
+
+def notify_chroma_relay() -> None:
+    """
+    Tell this process's relay, if it runs one, that outbox rows were committed.
+    """
+    if _chroma_relay is not None:
+        _chroma_relay.notify()
+
+
+class ChromaOutboxRelay:
+    """
+    Background thread applying chroma_outbox rows to Chroma as batched upserts. It writes
+    once a batch worth of rows was committed or the first one has waited max_delay_seconds,
+    and polls for rows written by other processes. Documents whose content hash matches the
+    one stored in Chroma are not re-embedded; chunked collections compare per chunk. Failed rows are retried with backoff.
+    """
+
+    def __init__(self, batch_size: int = INGESTION_BATCH_SIZE, max_delay_seconds: float = INGESTION_MAX_DELAY_SECONDS):
+        self.batch_size = batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self._relay_lock = Lock()
+        self._wake = Event()
+        # Set once batch_size notifications arrived, or on stop, to cut the batching delay short
+        self._batch_ready = Event()
+        self._stopping = Event()
+        self._notified = 0
+        self._thread: Optional[Thread] = None
+        self.embedded_count = 0
+        self.skipped_count = 0
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._batch_ready.clear()
+            self._thread = Thread(target=self._run, name="chroma-outbox-relay", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._stopping.set()
+            self._wake.set()
+            self._batch_ready.set()
+            self._thread.join()
+        self.flush()
+
+    def notify(self) -> None:
+        self._notified += 1
+        self._wake.set()
+        if self._notified >= self.batch_size:
+            self._batch_ready.set()
+
+    def flush(self) -> None:
+        """
+        Apply every due outbox row now, in the calling thread.
+        """
+        while self._relay_batch() == self.batch_size:
+            pass
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(RELAY_POLL_SECONDS)
+            # Give writers a moment to fill a batch, unless one is already waiting
+            self._batch_ready.wait(self.max_delay_seconds)
+            self._wake.clear()
+            self._batch_ready.clear()
+            self._notified = 0
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error relaying chroma outbox: {e}")
+
+    def _relay_batch(self) -> int:
+        """
+        Apply up to batch_size due rows, returning how many were read.
+        """
+        with self._relay_lock:
+            db = SessionLocal()
+            try:
+                rows = db.scalars(
+                    select(ChromaOutbox)
+                    .where(ChromaOutbox.next_attempt_at <= datetime.utcnow())
+                    .order_by(ChromaOutbox.id)
+                    .limit(self.batch_size)
+                ).all()
+                rows_by_collection: Dict[str, List[ChromaOutbox]] = {}
+                for row in rows:
+                    rows_by_collection.setdefault(row.collection, []).append(row)
+
+                for collection, collection_rows in rows_by_collection.items():
+                    # Rows are in commit order, so later documents for an id win
+                    documents = {row.document_id: row.document for row in collection_rows}
+                    try:
+                        self._write_batch(ChromaCollections(collection), documents)
+                    except Exception as e:
+                        print(f"Error upserting {len(documents)} documents into chroma {collection}: {e}")
+                        for row in collection_rows:
+                            row.attempts += 1
+                            delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** row.attempts)
+                            row.next_attempt_at = datetime.utcnow() + timedelta(seconds=random.uniform(delay / 2, delay))
+                    else:
+                        db.execute(delete(ChromaOutbox).where(ChromaOutbox.id.in_([row.id for row in collection_rows])))
+                    invalidate_chroma_count(ChromaCollections(collection))
+                db.commit()
+            finally:
+                db.close()
+        return len(rows)
+
+    def _write_batch(self, collection: ChromaCollections, documents: Dict[str, str]) -> None:
+        """
+        Upsert the documents whose content hash differs from the one stored in Chroma.
+        Documents of chunked collections are split first, and hashed, upserted and
+        pruned chunk by chunk.
+        """
+        if collection in CHUNKED_COLLECTIONS:
+            self._write_chunks(collection, documents)
+            return
+        chroma_collection = get_chroma_collection(collection)
+        hashes = {id: content_hash(document) for id, document in documents.items()}
+        stored = chroma_collection.get(ids=list(documents), include=["metadatas"])
+        for id, metadata in zip(stored["ids"], stored["metadatas"]):
+            if metadata and metadata.get(CONTENT_HASH_KEY) == hashes[id]:
+                del hashes[id]
+        skipped = len(documents) - len(hashes)
+        if hashes:
+            chroma_collection.upsert(
+                documents=[documents[id] for id in hashes],
+                metadatas=[{CONTENT_HASH_KEY: document_hash} for document_hash in hashes.values()],
+                ids=list(hashes),
+            )
+        self.embedded_count += len(hashes)
+        self.skipped_count += skipped
+
+    def _write_chunks(self, collection: ChromaCollections, documents: Dict[str, str]) -> None:
+        chroma_collection = get_chroma_collection(collection)
+        chunks: Dict[str, str] = {}
+        metadatas: Dict[str, dict] = {}
+        for parent_id, document in documents.items():
+            for index, chunk in enumerate(chunk_document(document)):
+                id = chunk_id(parent_id, index)
+                chunks[id] = chunk
+                metadatas[id] = {CONTENT_HASH_KEY: content_hash(chunk), PARENT_ID_KEY: parent_id, CHUNK_INDEX_KEY: index}
+
+        stored = chroma_collection.get(where={PARENT_ID_KEY: {"$in": list(documents)}}, include=["metadatas"])
+        stored_hashes = {
+            id: metadata.get(CONTENT_HASH_KEY) for id, metadata in zip(stored["ids"], stored["metadatas"]) if metadata
+        }
+        changed = [id for id in chunks if stored_hashes.get(id) != metadatas[id][CONTENT_HASH_KEY]]
+        # Chunks past a document's new length, plus whole documents stored before chunking
+        stale = [id for id in stored_hashes if id not in chunks] + list(documents)
+        if changed:
+            chroma_collection.upsert(
+                documents=[chunks[id] for id in changed],
+                metadatas=[metadatas[id] for id in changed],
+                ids=changed,
+            )
+        chroma_collection.delete(ids=stale)
+        self.embedded_count += len(changed)
+        self.skipped_count += len(chunks) - len(changed)
+
+
+_chroma_relay: Optional[ChromaOutboxRelay] = None
+_chroma_relay_lock = Lock()
+
+
+def get_chroma_relay() -> ChromaOutboxRelay:
+    global _chroma_relay
+    if _chroma_relay is None:
+        with _chroma_relay_lock:
+            if _chroma_relay is None:
+                _chroma_relay = ChromaOutboxRelay()
+    return _chroma_relay
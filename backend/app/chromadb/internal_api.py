@@ -1,9 +1,16 @@
-from typing import Optional
-from app.chromadb import get_chroma_collection
-from app.chromadb.dataclass import ChromaResult
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Sequence
+from app.chromadb import get_chroma_collection, get_embedding_function, invalidate_chroma_count
+from app.chromadb.dataclass import ChromaQueryResult, ChromaResult
+from app.core.config import settings
 from app.utils.enums import ChromaCollections
 
 
+_query_embeddings: OrderedDict[tuple[str, str], Any] = OrderedDict()
+_query_embeddings_lock = Lock()
+
+
 def _convert_chroma_result_to_dataclass(
     chroma_result: dict,
 ) -> list[ChromaResult]:
@@ -20,6 +27,37 @@ def _convert_chroma_result_to_dataclass(
     return chroma_results
 
 
+def _embedding_model(embedding_function: Any) -> str:
+    name = getattr(embedding_function, "name", None)
+    return f"{type(embedding_function).__name__}:{name() if callable(name) else ''}"
+
+
+def embed_queries(queries: Sequence[str]) -> list[Any]:
+    """
+    Embed query texts, reusing an LRU of earlier query embeddings keyed by text and
+    embedding model. Misses are embedded together in one call. Blocking.
+    """
+    embedding_function = get_embedding_function()
+    model = _embedding_model(embedding_function)
+    embeddings: Dict[str, Any] = {}
+    with _query_embeddings_lock:
+        for query in queries:
+            embedding = _query_embeddings.get((model, query))
+            if embedding is not None:
+                _query_embeddings.move_to_end((model, query))
+                embeddings[query] = embedding
+
+    misses = [query for query in dict.fromkeys(queries) if query not in embeddings]
+    if misses:
+        embeddings.update(zip(misses, embedding_function(misses)))
+        with _query_embeddings_lock:
+            for query in misses:
+                _query_embeddings[(model, query)] = embeddings[query]
+            while len(_query_embeddings) > settings.QUERY_EMBEDDING_CACHE_SIZE:
+                _query_embeddings.popitem(last=False)
+    return [embeddings[query] for query in queries]
+
+
 def add_data_to_chroma(document: str, collection: ChromaCollections, id: str) -> None:
     chroma_collection = get_chroma_collection(
         collection=collection
@@ -28,6 +66,7 @@ def add_data_to_chroma(document: str, collection: ChromaCollections, id: str) ->
         documents=[document],
         ids=[id],
     )
+    invalidate_chroma_count(collection)
 
 
 def query_from_chroma(
@@ -38,13 +77,42 @@ def query_from_chroma(
     chroma_collection = get_chroma_collection(collection=collection)
 
     chroma_result = chroma_collection.query(
-        query_texts=query,
+        query_embeddings=embed_queries([query]),
         n_results=n_results,
     )
     
     return _convert_chroma_result_to_dataclass(chroma_result=chroma_result)
 
 
+def query_chroma_batch(
+    queries: Sequence[tuple[ChromaCollections, str, int]],
+) -> list[ChromaQueryResult]:
+    """
+    Run several (collection, query, n_results) lookups, embedding each distinct query
+    text once and sending one query_embeddings request per collection and n_results.
+    Results come back in input order. Blocking.
+    """
+    texts = list(dict.fromkeys(query for _, query, _ in queries))
+    embeddings = dict(zip(texts, embed_queries(texts)))
+    groups: Dict[tuple[ChromaCollections, int], list[int]] = {}
+    for index, (collection, _, n_results) in enumerate(queries):
+        groups.setdefault((collection, n_results), []).append(index)
+
+    results: list[Optional[ChromaQueryResult]] = [None] * len(queries)
+    for (collection, n_results), indexes in groups.items():
+        chroma_result = get_chroma_collection(collection=collection).query(
+            query_embeddings=[embeddings[queries[index][1]] for index in indexes],
+            n_results=n_results,
+            include=["distances"],
+        )
+        for row, index in enumerate(indexes):
+            results[index] = ChromaQueryResult(
+                ids=chroma_result["ids"][row],
+                distances=chroma_result["distances"][row],
+            )
+    return results
+
+
 def query_from_chroma_by_ids(
     ids: list[int],
     collection: ChromaCollections,
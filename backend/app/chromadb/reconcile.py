@@ -0,0 +1,76 @@
+from typing import Dict, Set
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.chromadb import get_chroma_collection, invalidate_chroma_count
+from app.chromadb.chunking import CHUNK_SEPARATOR, CHUNKED_COLLECTIONS, chunk_parent
+from app.chromadb.ingestion import get_chroma_relay, record_chroma_document
+from app.db.linkedin_organization_functions import organization_document
+from app.db.repository_functions import get_readme_by_path
+from app.models.chroma_outbox import ChromaOutbox
+from app.models.linkedin_organization import LinkedinOrganization
+from app.models.repository import Repository as RepositoryModel
+from app.utils.enums import ChromaCollections
+
+
+CHROMA_PAGE_SIZE = 5000
+
+
+def get_chroma_ids(collection: ChromaCollections) -> Set[str]:
+    chroma_collection = get_chroma_collection(collection)
+    ids: Set[str] = set()
+    offset = 0
+    while True:
+        page = chroma_collection.get(include=[], limit=CHROMA_PAGE_SIZE, offset=offset)["ids"]
+        ids.update(page)
+        if len(page) < CHROMA_PAGE_SIZE:
+            return ids
+        offset += CHROMA_PAGE_SIZE
+
+
+def reconcile_chroma(db: Session) -> Dict[str, Dict[str, int]]:
+    """
+    Diff SQL ids against Chroma ids for each collection. Entities missing from Chroma
+    (and without a pending outbox row) are written to the outbox and relayed; Chroma
+    documents with no SQL entity are deleted. Chunked collections are compared by the
+    parent id of each chunk. Returns per-collection repair counts.
+    """
+    pending = {
+        (collection, document_id)
+        for collection, document_id in db.execute(select(ChromaOutbox.collection, ChromaOutbox.document_id))
+    }
+    report = {}
+
+    organization_ids = set(db.scalars(select(LinkedinOrganization.linkedin_id)))
+    repository_paths = set(db.scalars(select(RepositoryModel.path)))
+    for collection, sql_ids in (
+        (ChromaCollections.LINKEDIN_ORGANIZATION, organization_ids),
+        (ChromaCollections.GITHUB_REPOSITORY, repository_paths),
+    ):
+        chroma_ids = get_chroma_ids(collection)
+        if collection in CHUNKED_COLLECTIONS:
+            # Whole documents stored before chunking count as missing and are replaced
+            chunk_ids = {id for id in chroma_ids if CHUNK_SEPARATOR in id}
+            orphaned = [id for id in chroma_ids if id not in chunk_ids or chunk_parent(id) not in sql_ids]
+            chroma_ids = {chunk_parent(id) for id in chunk_ids}
+        else:
+            orphaned = list(chroma_ids - sql_ids)
+        missing = [id for id in sql_ids - chroma_ids if (collection.value, id) not in pending]
+
+        if collection == ChromaCollections.LINKEDIN_ORGANIZATION:
+            for start in range(0, len(missing), CHROMA_PAGE_SIZE):
+                for organization in db.scalars(
+                    select(LinkedinOrganization).where(LinkedinOrganization.linkedin_id.in_(missing[start:start + CHROMA_PAGE_SIZE]))
+                ):
+                    record_chroma_document(collection, organization.linkedin_id, organization_document(organization), db)
+        else:
+            for path in missing:
+                record_chroma_document(collection, path, get_readme_by_path(path=path, token=None), db)
+        db.commit()
+
+        for start in range(0, len(orphaned), CHROMA_PAGE_SIZE):
+            get_chroma_collection(collection).delete(ids=orphaned[start:start + CHROMA_PAGE_SIZE])
+        invalidate_chroma_count(collection)
+        report[collection.value] = {"sql": len(sql_ids), "chroma": len(chroma_ids), "added": len(missing), "deleted": len(orphaned)}
+
+    get_chroma_relay().flush()
+    return report
@@ -10,6 +10,17 @@ class Settings(BaseSettings):
     FETCHAI_API_KEY: str | None = None
     LINKEDIN_PASSWORD_ENCRYPTION_KEY: str
     HYPERBOLIC_API_KEY: str | None = None
+    SEARCH_QUERY_PLANNER: bool = True
+    LOCAL_QUERY_CLASSIFIER: bool = True
+    # Minimum cosine margin between class centroids to skip the LLM classifier
+    LOCAL_CLASSIFIER_MIN_MARGIN: float = 0.05
+    LLM_CACHE_PATH: str = "llm_cache.db"
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    LEXICAL_INDEX_PATH: str = "search_index.db"
+    QUERY_EMBEDDING_CACHE_SIZE: int = 1024
+    # Minimum seconds between background connection scorer rebuilds while the graph changes
+    CONNECTION_SCORER_REBUILD_SECONDS: float = 30.0
 
     class Config:
         env_file = ".env"
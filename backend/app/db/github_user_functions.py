@@ -1,8 +1,12 @@
-from typing import List
+from typing import Dict, Iterable, List
 from app.models.github_user import GithubUser, GithubUserRepositoryMap
 from app.schemas.github_user import RepositoryContribution
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from app.schemas import GithubUser as GithubUserSchema
+from app.db.graph_change_functions import record_graph_change
+from app.utils.enums import GraphChangeAction, GraphNodeType
 
 
 def create_github_user(github_user: GithubUserSchema, db: Session):
@@ -15,6 +19,7 @@ def create_github_user(github_user: GithubUserSchema, db: Session):
         token=github_user.token,
     )
     db.add(db_github_user)
+    record_graph_change(GraphChangeAction.ADDED, GraphNodeType.GITHUB_USER, github_user.username, db)
     db.commit()
     db.refresh(db_github_user)
     return db_github_user
@@ -25,7 +30,7 @@ def get_github_user_by_username(username: str, db: Session) -> GithubUserSchema:
     if db_user:
         repositories = [
             RepositoryContribution(
-                path=repo_map.repository.path,
+                path=repo_map.repository_path,
                 num_contributions=repo_map.num_contributions
             ) for repo_map in db_user.repository_maps
         ]
@@ -41,12 +46,13 @@ def update_github_user(github_user: GithubUserSchema, db: Session) -> GithubUser
         update_data = github_user.dict(exclude={'repositories'}, exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_github_user, key, value)
+        record_graph_change(GraphChangeAction.UPDATED, GraphNodeType.GITHUB_USER, db_github_user.username, db)
         db.commit()
         db.refresh(db_github_user)
         # Convert the repositories to RepositorySchema
         repositories = [
             RepositoryContribution(
-                path=repo_map.repository.path,
+                path=repo_map.repository_path,
                 num_contributions=repo_map.num_contributions
             ) for repo_map in db_github_user.repository_maps
         ]
@@ -56,6 +62,41 @@ def update_github_user(github_user: GithubUserSchema, db: Session) -> GithubUser
     return None
 
 
+def _github_user_schema(db_user: GithubUser) -> GithubUserSchema:
+    user_dict = GithubUserSchema.from_orm(db_user).dict()
+    user_dict['repositories'] = [
+        RepositoryContribution(
+            path=repo_map.repository_path,
+            num_contributions=repo_map.num_contributions
+        ) for repo_map in db_user.repository_maps
+    ]
+    return GithubUserSchema(**user_dict)
+
+
+def _many_github_users_statement(usernames: Iterable[str]) -> Select:
+    return (
+        select(GithubUser)
+        .where(GithubUser.username.in_(set(usernames)))
+        .options(selectinload(GithubUser.repository_maps))
+    )
+
+
+def get_many_github_users_by_username(usernames: Iterable[str], db: Session) -> Dict[str, GithubUserSchema]:
+    """
+    Fetch GitHub users and their repository contributions in one IN query plus one selectin load.
+    Usernames that do not exist are left out of the result.
+    """
+    return {db_user.username: _github_user_schema(db_user) for db_user in db.scalars(_many_github_users_statement(usernames))}
+
+
+async def get_many_github_users_by_username_async(usernames: Iterable[str], db: AsyncSession) -> Dict[str, GithubUserSchema]:
+    return {db_user.username: _github_user_schema(db_user) for db_user in await db.scalars(_many_github_users_statement(usernames))}
+
+
 def get_github_users_by_repository(repository_path: str, db: Session) -> List[GithubUserSchema]:
     repo_maps = db.query(GithubUserRepositoryMap).filter(GithubUserRepositoryMap.repository_path == repository_path).all()
-    return [get_github_user_by_username(repo_map.github_user_username, db) for repo_map in repo_maps]
\ No newline at end of file
+    github_users = get_many_github_users_by_username([repo_map.github_user_username for repo_map in repo_maps], db)
+    return [
+        github_users[repo_map.github_user_username] for repo_map in repo_maps
+        if repo_map.github_user_username in github_users
+    ]
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.github_user import GithubUser
+from app.models.graph_change import GraphChange, GraphVersion
+from app.models.linkedin_user import LinkedinUser
+from app.utils.enums import GraphChangeAction, GraphNodeType
+
+
+def _next_graph_version(db: Session) -> int:
+    """
+    Bump the graph_version row. The UPDATE keeps that row locked until the caller commits,
+    so graph writes commit in version order and a client holding version N never misses a
+    change numbered below N that commits later.
+    """
+    bumped = db.execute(
+        update(GraphVersion).where(GraphVersion.id == 1).values(version=GraphVersion.version + 1)
+    ).rowcount
+    if not bumped:
+        # First write: continue from any versions logged before the counter existed
+        db.add(GraphVersion(id=1, version=(db.scalar(select(func.max(GraphChange.version))) or 0) + 1))
+        db.flush()
+    return db.scalar(select(GraphVersion.version).where(GraphVersion.id == 1))
+
+
+def record_graph_change(
+    action: GraphChangeAction,
+    node_type: GraphNodeType,
+    node_id: str,
+    db: Session,
+    target_type: Optional[GraphNodeType] = None,
+    target_id: Optional[str] = None,
+) -> None:
+    """
+    Append a node change (or a link change, when a target is given) to the change log,
+    bumping the graph version. The caller commits, so the entry lands with the write itself.
+    """
+    db.add(GraphChange(
+        version=_next_graph_version(db),
+        action=action.value,
+        node_type=node_type.value,
+        node_id=node_id,
+        target_type=target_type.value if target_type else None,
+        target_id=target_id,
+        created_at=datetime.utcnow(),
+    ))
+
+
+def record_membership_change(
+    action: GraphChangeAction,
+    user_type: GraphNodeType,
+    username: str,
+    group_type: GraphNodeType,
+    group_id: str,
+    db: Session,
+) -> None:
+    record_graph_change(action, user_type, username, db, target_type=group_type, target_id=group_id)
+
+
+def record_account_owner_change(
+    user_type: GraphNodeType,
+    username: str,
+    old_user_id: Optional[int],
+    new_user_id: Optional[int],
+    db: Session,
+) -> None:
+    """
+    Log the identity links a LinkedIn or GitHub account loses and gains when it moves
+    between registered users. Accounts of the same registered user reach each other, so
+    these links change the network just like memberships do.
+    """
+    is_linkedin = user_type == GraphNodeType.LINKEDIN_USER
+    other_model = GithubUser if is_linkedin else LinkedinUser
+    for action, user_id in ((GraphChangeAction.REMOVED, old_user_id), (GraphChangeAction.ADDED, new_user_id)):
+        if user_id is None:
+            continue
+        for other_username in db.scalars(select(other_model.username).where(other_model.user_id == user_id)):
+            linkedin_username, github_username = (username, other_username) if is_linkedin else (other_username, username)
+            record_membership_change(
+                action, GraphNodeType.LINKEDIN_USER, linkedin_username, GraphNodeType.GITHUB_USER, github_username, db
+            )
+
+
+def _graph_version_statement() -> Select:
+    return select(GraphVersion.version).where(GraphVersion.id == 1)
+
+
+def get_graph_version(db: Session) -> int:
+    return db.scalar(_graph_version_statement()) or 0
+
+
+async def get_graph_version_async(db: AsyncSession) -> int:
+    return await db.scalar(_graph_version_statement()) or 0
+
+
+def _graph_changes_statement(since: int, limit: int) -> Select:
+    return select(GraphChange).where(GraphChange.version > since).order_by(GraphChange.version).limit(limit)
+
+
+def get_graph_changes(since: int, limit: int, db: Session) -> List[GraphChange]:
+    """
+    Return up to `limit` changes with a version greater than `since`, oldest first.
+    """
+    return list(db.scalars(_graph_changes_statement(since, limit)))
+
+
+async def get_graph_changes_async(since: int, limit: int, db: AsyncSession) -> List[GraphChange]:
+    return list(await db.scalars(_graph_changes_statement(since, limit)))
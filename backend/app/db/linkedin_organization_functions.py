@@ -1,14 +1,19 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from app.db.linkedin_user_functions import get_user_organization_associations
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, selectinload
 from sqlalchemy.orm.attributes import set_attribute
-from app.chromadb import get_chroma_collection
+from app.chromadb.ingestion import notify_chroma_relay, record_chroma_document
+from app.db.graph_change_functions import record_graph_change, record_membership_change
+from app.db.public_network_functions import mark_public_network_dirty
+from app.search import index_organization
 from app.models.linkedin_organization import LinkedinOrganization
-from app.models.linkedin_user import LinkedinUserOrganizationMap
-from app.schemas.linkedin_organization import LinkedinOrganization as LinkedinOrganizationSchema
+from app.models.linkedin_user import LinkedinUser, LinkedinUserOrganizationMap
+from app.schemas.linkedin_organization import LinkedinOrganization as LinkedinOrganizationSchema, LinkedinUserContribution
 from datetime import datetime
 
-from app.utils.enums import ChromaCollections
+from app.utils.enums import ChromaCollections, GraphChangeAction, GraphNodeType, PublicNetworkNodeType
 
 def get_linkedin_organization_by_id(linkedin_id: str, db: Session) -> LinkedinOrganizationSchema | None:
     db_organization = db.query(LinkedinOrganization).filter(LinkedinOrganization.linkedin_id == linkedin_id).first()
@@ -29,30 +34,133 @@ def get_linkedin_organization_by_id(linkedin_id: str, db: Session) -> LinkedinOr
         )
     return None
 
+def _organization_schema(
+    db_organization: LinkedinOrganization,
+    user_maps: Optional[Iterable[LinkedinUserOrganizationMap]] = None,
+) -> LinkedinOrganizationSchema:
+    return LinkedinOrganizationSchema(
+        linkedin_id=db_organization.linkedin_id,
+        name=db_organization.name,
+        description=db_organization.description,
+        website=db_organization.website,
+        industry=db_organization.industry,
+        company_size=db_organization.company_size,
+        headquarters=db_organization.headquarters,
+        specialties=db_organization.specialties,
+        logo=db_organization.logo,
+        filters=db_organization.filters,
+        linkedin_users=[
+            LinkedinUserContribution(
+                username=user_map.linkedin_user_username,
+                role=user_map.role,
+                start_date=user_map.start_date.isoformat() if user_map.start_date else None,
+                end_date=user_map.end_date.isoformat() if user_map.end_date else None
+            ) for user_map in (db_organization.user_maps if user_maps is None else user_maps)
+        ]
+    )
+
+def _many_organizations_statement(linkedin_ids: Iterable[str]) -> Select:
+    return (
+        select(LinkedinOrganization)
+        .where(LinkedinOrganization.linkedin_id.in_(set(linkedin_ids)))
+        .options(selectinload(LinkedinOrganization.user_maps))
+    )
+
+def get_many_linkedin_organizations_by_id(linkedin_ids: Iterable[str], db: Session) -> Dict[str, LinkedinOrganizationSchema]:
+    """
+    Fetch organizations and their members in one IN query plus one selectin load.
+    Ids that do not exist are left out of the result.
+    """
+    return {
+        db_organization.linkedin_id: _organization_schema(db_organization)
+        for db_organization in db.scalars(_many_organizations_statement(linkedin_ids))
+    }
+
+async def get_many_linkedin_organizations_by_id_async(linkedin_ids: Iterable[str], db: AsyncSession) -> Dict[str, LinkedinOrganizationSchema]:
+    return {
+        db_organization.linkedin_id: _organization_schema(db_organization)
+        for db_organization in await db.scalars(_many_organizations_statement(linkedin_ids))
+    }
+
+def _ranked_members_statement(linkedin_ids: Iterable[str], max_members: Optional[int]) -> Select:
+    """
+    Membership rows with their users for the given organizations, at most max_members
+    per organization (ordered by username).
+    """
+    ranked = select(
+        LinkedinUserOrganizationMap,
+        func.row_number().over(
+            partition_by=LinkedinUserOrganizationMap.linkedin_organization_id,
+            order_by=LinkedinUserOrganizationMap.linkedin_user_username,
+        ).label("member_rank"),
+    ).where(LinkedinUserOrganizationMap.linkedin_organization_id.in_(set(linkedin_ids))).subquery()
+    ranked_map = aliased(LinkedinUserOrganizationMap, ranked)
+    statement = (
+        select(ranked_map, LinkedinUser)
+        .join(LinkedinUser, LinkedinUser.username == ranked_map.linkedin_user_username)
+        .order_by(ranked_map.linkedin_organization_id, ranked.c.member_rank)
+    )
+    if max_members is not None:
+        statement = statement.where(ranked.c.member_rank <= max_members)
+    return statement
+
+async def get_organization_search_hits_async(
+    linkedin_ids: Iterable[str],
+    max_members: Optional[int],
+    db: AsyncSession,
+) -> Tuple[Dict[str, LinkedinOrganizationSchema], Dict[str, List[LinkedinUser]]]:
+    """
+    Hydrate search hits: the organizations and up to max_members members of each, in two
+    queries however many ids are given. Returns (organizations, members by organization id).
+    """
+    linkedin_ids = list(linkedin_ids)
+    db_organizations = await db.scalars(
+        select(LinkedinOrganization).where(LinkedinOrganization.linkedin_id.in_(set(linkedin_ids)))
+    )
+    user_maps: Dict[str, List[LinkedinUserOrganizationMap]] = {linkedin_id: [] for linkedin_id in linkedin_ids}
+    members: Dict[str, List[LinkedinUser]] = {linkedin_id: [] for linkedin_id in linkedin_ids}
+    for user_map, db_user in await db.execute(_ranked_members_statement(linkedin_ids, max_members)):
+        user_maps[user_map.linkedin_organization_id].append(user_map)
+        members[user_map.linkedin_organization_id].append(db_user)
+    organizations = {
+        db_organization.linkedin_id: _organization_schema(db_organization, user_maps[db_organization.linkedin_id])
+        for db_organization in db_organizations
+    }
+    return organizations, members
+
+async def get_linkedin_organizations_async(skip: int, limit: int, db: AsyncSession) -> List[LinkedinOrganizationSchema]:
+    """
+    One page of organizations, without their members.
+    """
+    db_organizations = await db.scalars(select(LinkedinOrganization).offset(skip).limit(limit))
+    return [LinkedinOrganizationSchema.from_orm(db_organization) for db_organization in db_organizations]
+
+def organization_document(organization) -> str:
+    """
+    The text embedded in Chroma for an organization (schema or model).
+    """
+    name_string = f"Organization name: {organization.name}\n" if organization.name else ""
+    description_string = f"Description: {organization.description}\n" if organization.description else ""
+    industry_string = f"Industry: {organization.industry}\n" if organization.industry else ""
+    company_size_string = f"Company size: {organization.company_size}\n" if organization.company_size else ""
+    specialties_string = f"Specialties: {organization.specialties}\n" if organization.specialties else ""
+    return name_string + description_string + industry_string + company_size_string + specialties_string
+
 def create_linkedin_organization(organization: LinkedinOrganizationSchema, db: Session) -> LinkedinOrganizationSchema:
-    # Create linkedin orgainzation in chroma
-    try:
-        name_string = f"Organization name: {organization.name}\n" if organization.name else ""
-        description_string = f"Description: {organization.description}\n" if organization.description else ""
-        industry_string = f"Industry: {organization.industry}\n" if organization.industry else ""
-        company_size_string = f"Company size: {organization.company_size}\n" if organization.company_size else ""
-        specialties_string = f"Specialties: {organization.specialties}\n" if organization.specialties else ""
-        linkedin_chroma_string = (
-            name_string + description_string + industry_string + company_size_string + specialties_string
-        )
-        linkedin_chroma_collection = get_chroma_collection(
-            collection=ChromaCollections.LINKEDIN_ORGANIZATION,
-        )
-        linkedin_chroma_collection.upsert(
-            documents=[linkedin_chroma_string],
-            ids=[organization.linkedin_id],
-        )
-    except Exception as e:
-        print(f"Error creating linkedin organization in chroma: {e}")
-    # Create organization in DB
+    # Create organization in DB, with its chroma document in the outbox of the same transaction
     db_organization = LinkedinOrganization(**organization.dict(exclude={'linkedin_users'}))
     db.add(db_organization)
+    record_chroma_document(
+        ChromaCollections.LINKEDIN_ORGANIZATION,
+        organization.linkedin_id,
+        organization_document(organization),
+        db,
+    )
+    mark_public_network_dirty(organization.linkedin_id, PublicNetworkNodeType.LINKEDIN_ORGANIZATION, db)
+    record_graph_change(GraphChangeAction.ADDED, GraphNodeType.LINKEDIN_ORGANIZATION, organization.linkedin_id, db)
     db.commit()
+    notify_chroma_relay()
+    index_organization(organization.linkedin_id, organization.name, organization.description, organization.specialties)
     db.refresh(db_organization)
     return LinkedinOrganizationSchema(
         **db_organization.__dict__,
@@ -65,16 +173,19 @@ def update_linkedin_organization(organization: LinkedinOrganizationSchema, db: S
         for key, value in organization.dict(exclude_unset=True).items():
             if key != 'linkedin_users':
                 setattr(db_organization, key, value)
+        mark_public_network_dirty(db_organization.linkedin_id, PublicNetworkNodeType.LINKEDIN_ORGANIZATION, db)
+        record_graph_change(GraphChangeAction.UPDATED, GraphNodeType.LINKEDIN_ORGANIZATION, db_organization.linkedin_id, db)
         db.commit()
         db.refresh(db_organization)
+        index_organization(db_organization.linkedin_id, db_organization.name, db_organization.description, db_organization.specialties)
         return get_linkedin_organization_by_id(db_organization.linkedin_id, db)
     return None
 
 def add_user_to_organization(linkedin_id: str, linkedin_username: str, role: Optional[str], start_date: Optional[datetime], end_date: Optional[datetime], db: Session) -> LinkedinOrganizationSchema | None:
     db_organization = db.query(LinkedinOrganization).filter(LinkedinOrganization.linkedin_id == linkedin_id).first()
     if db_organization:
-        from app.db.linkedin_user_functions import get_linkedin_user_by_username
-        db_linkedin_user = get_linkedin_user_by_username(linkedin_username, db)
+        from app.models.linkedin_user import LinkedinUser
+        db_linkedin_user = db.query(LinkedinUser.username).filter(LinkedinUser.username == linkedin_username).first()
         if db_linkedin_user:
             existing_relationship = db.query(LinkedinUserOrganizationMap).filter_by(
                 linkedin_user_username=linkedin_username,
@@ -85,6 +196,7 @@ def add_user_to_organization(linkedin_id: str, linkedin_username: str, role: Opt
                 set_attribute(existing_relationship, 'role', role)
                 set_attribute(existing_relationship, 'start_date', start_date)
                 set_attribute(existing_relationship, 'end_date', end_date)
+                action = GraphChangeAction.UPDATED
             else:
                 new_relationship = LinkedinUserOrganizationMap(
                     linkedin_user_username=linkedin_username,
@@ -94,6 +206,11 @@ def add_user_to_organization(linkedin_id: str, linkedin_username: str, role: Opt
                     end_date=end_date
                 )
                 db.add(new_relationship)
+                action = GraphChangeAction.ADDED
+            mark_public_network_dirty(linkedin_id, PublicNetworkNodeType.LINKEDIN_ORGANIZATION, db)
+            record_membership_change(
+                action, GraphNodeType.LINKEDIN_USER, linkedin_username, GraphNodeType.LINKEDIN_ORGANIZATION, linkedin_id, db
+            )
             
             db.commit()
             db.refresh(db_organization)
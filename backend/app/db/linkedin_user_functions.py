@@ -1,11 +1,15 @@
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 from app.models.linkedin_user import LinkedinUser, LinkedinUserOrganizationMap
 from app.schemas.linkedin_user import LinkedinUser as LinkedinUserSchema, LinkedinOrganizationContribution, LinkedinUserCreate
 from app.schemas.linkedin_organization import LinkedinUserContribution
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 import json
 from cryptography.fernet import Fernet
 from app.core.config import settings
+from app.db.graph_change_functions import record_graph_change
+from app.utils.enums import GraphChangeAction, GraphNodeType
 
 def get_fernet():
     return Fernet(settings.LINKEDIN_PASSWORD_ENCRYPTION_KEY)
@@ -50,6 +54,7 @@ def create_linkedin_user(linkedin_user: LinkedinUserSchema, db: Session):
         external_websites=json.dumps(linkedin_user.external_websites) if linkedin_user.external_websites else None,
     )
     db.add(db_linkedin_user)
+    record_graph_change(GraphChangeAction.ADDED, GraphNodeType.LINKEDIN_USER, linkedin_user.username, db)
     db.commit()
     db.refresh(db_linkedin_user)
     return db_linkedin_user
@@ -63,6 +68,51 @@ def get_linkedin_user_by_username(username: str, db: Session) -> LinkedinUserSch
         return LinkedinUserSchema(**user_dict)
     return None
 
+def _linkedin_user_schema(db_user: LinkedinUser, max_organizations: Optional[int] = None) -> LinkedinUserSchema:
+    user_dict = LinkedinUserSchema.from_orm(db_user).dict()
+    user_dict['organizations'] = [
+        LinkedinOrganizationContribution(
+            linkedin_id=org_map.linkedin_organization_id,
+            role=org_map.role,
+            start_date=org_map.start_date.isoformat() if org_map.start_date else None,
+            end_date=org_map.end_date.isoformat() if org_map.end_date else None
+        ) for org_map in db_user.organization_maps[:max_organizations]
+    ]
+    return LinkedinUserSchema(**user_dict)
+
+def _many_linkedin_users_statement(usernames: Iterable[str]) -> Select:
+    return (
+        select(LinkedinUser)
+        .where(LinkedinUser.username.in_(set(usernames)))
+        .options(selectinload(LinkedinUser.organization_maps))
+    )
+
+def get_many_linkedin_users_by_username(usernames: Iterable[str], db: Session) -> Dict[str, LinkedinUserSchema]:
+    """
+    Fetch LinkedIn users and their organizations in one IN query plus one selectin load.
+    Usernames that do not exist are left out of the result.
+    """
+    return {
+        db_user.username: _linkedin_user_schema(db_user)
+        for db_user in db.scalars(_many_linkedin_users_statement(usernames))
+    }
+
+async def get_many_linkedin_users_by_username_async(usernames: Iterable[str], db: AsyncSession) -> Dict[str, LinkedinUserSchema]:
+    return {
+        db_user.username: _linkedin_user_schema(db_user)
+        for db_user in await db.scalars(_many_linkedin_users_statement(usernames))
+    }
+
+async def get_linkedin_users_async(skip: int, limit: int, db: AsyncSession) -> List[LinkedinUserSchema]:
+    """
+    One page of LinkedIn users with their organizations (at most 250 each, as in
+    get_user_organization_associations), loaded in two queries.
+    """
+    db_users = await db.scalars(
+        select(LinkedinUser).offset(skip).limit(limit).options(selectinload(LinkedinUser.organization_maps))
+    )
+    return [_linkedin_user_schema(db_user, max_organizations=250) for db_user in db_users]
+
 def update_linkedin_user(linkedin_user: LinkedinUserCreate, db: Session) -> LinkedinUserSchema | None:
     fernet = get_fernet()
     print("Linkedin user: ", linkedin_user)
@@ -75,6 +125,7 @@ def update_linkedin_user(linkedin_user: LinkedinUserCreate, db: Session) -> Link
             if key == 'password':
                 value = fernet.encrypt(value.encode())
             setattr(db_linkedin_user, key, value)
+        record_graph_change(GraphChangeAction.UPDATED, GraphNodeType.LINKEDIN_USER, db_linkedin_user.username, db)
         db.commit()
         db.refresh(db_linkedin_user)
         organizations = [
@@ -100,3 +151,32 @@ def get_users_by_organization(db: Session, organization_id: str) -> List[Linkedi
         .all()
     )
     return users
+
+
+def _users_by_organization(organization_ids: Iterable[str], users: Iterable[LinkedinUser]) -> Dict[str, List[LinkedinUser]]:
+    users_by_organization: Dict[str, List[LinkedinUser]] = {organization_id: [] for organization_id in organization_ids}
+    for user in users:
+        for org_map in user.organization_maps:
+            if org_map.linkedin_organization_id in users_by_organization:
+                users_by_organization[org_map.linkedin_organization_id].append(user)
+    return users_by_organization
+
+def _users_in_organizations_statement(organization_ids: Iterable[str]) -> Select:
+    return (
+        select(LinkedinUser)
+        .join(LinkedinUserOrganizationMap)
+        .where(LinkedinUserOrganizationMap.linkedin_organization_id.in_(set(organization_ids)))
+        .options(selectinload(LinkedinUser.organization_maps))
+        .distinct()
+    )
+
+def get_many_users_by_organization(db: Session, organization_ids: Iterable[str]) -> Dict[str, List[LinkedinUser]]:
+    """
+    Batched get_users_by_organization: members of every given organization in one query.
+    """
+    organization_ids = list(organization_ids)
+    return _users_by_organization(organization_ids, db.scalars(_users_in_organizations_statement(organization_ids)))
+
+async def get_many_users_by_organization_async(db: AsyncSession, organization_ids: Iterable[str]) -> Dict[str, List[LinkedinUser]]:
+    organization_ids = list(organization_ids)
+    return _users_by_organization(organization_ids, await db.scalars(_users_in_organizations_statement(organization_ids)))
@@ -0,0 +1,91 @@
+from typing import Any, Awaitable, Callable, Dict, Iterable
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.db.github_user_functions import get_many_github_users_by_username, get_many_github_users_by_username_async
+from app.db.linkedin_organization_functions import (
+    get_many_linkedin_organizations_by_id,
+    get_many_linkedin_organizations_by_id_async,
+)
+from app.db.linkedin_user_functions import get_many_linkedin_users_by_username, get_many_linkedin_users_by_username_async
+from app.db.repository_functions import get_many_repositories_by_path, get_many_repositories_by_path_async
+from app.db.session import get_async_db, get_db
+
+
+class Loader:
+    """
+    Per-request identity cache in front of the get_many_* functions. Each load fetches only
+    the keys not seen before in this request, in a single batched call.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._cache: Dict[Callable, Dict[str, Any]] = {}
+
+    def load_many(self, fetch: Callable[[Iterable[str], Session], Dict[str, Any]], keys: Iterable[str]) -> Dict[str, Any]:
+        cache = self._cache.setdefault(fetch, {})
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in cache]
+        if missing:
+            fetched = fetch(missing, self.db)
+            for key in missing:
+                cache[key] = fetched.get(key)
+        return {key: cache[key] for key in keys if cache[key] is not None}
+
+    def linkedin_users(self, usernames: Iterable[str]) -> Dict[str, Any]:
+        return self.load_many(get_many_linkedin_users_by_username, usernames)
+
+    def github_users(self, usernames: Iterable[str]) -> Dict[str, Any]:
+        return self.load_many(get_many_github_users_by_username, usernames)
+
+    def linkedin_organizations(self, linkedin_ids: Iterable[str]) -> Dict[str, Any]:
+        return self.load_many(get_many_linkedin_organizations_by_id, linkedin_ids)
+
+    def repositories(self, paths: Iterable[str]) -> Dict[str, Any]:
+        return self.load_many(get_many_repositories_by_path, paths)
+
+    def prime(self, fetch: Callable, key: str, value: Any) -> None:
+        """
+        Seed or overwrite a cached entry, e.g. after the caller created or updated it.
+        """
+        self._cache.setdefault(fetch, {})[key] = value
+
+
+class AsyncLoader:
+    """
+    Loader for an AsyncSession, backed by the get_many_*_async functions.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._cache: Dict[Callable, Dict[str, Any]] = {}
+
+    async def load_many(self, fetch: Callable[[Iterable[str], AsyncSession], Awaitable[Dict[str, Any]]], keys: Iterable[str]) -> Dict[str, Any]:
+        cache = self._cache.setdefault(fetch, {})
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in cache]
+        if missing:
+            fetched = await fetch(missing, self.db)
+            for key in missing:
+                cache[key] = fetched.get(key)
+        return {key: cache[key] for key in keys if cache[key] is not None}
+
+    async def linkedin_users(self, usernames: Iterable[str]) -> Dict[str, Any]:
+        return await self.load_many(get_many_linkedin_users_by_username_async, usernames)
+
+    async def github_users(self, usernames: Iterable[str]) -> Dict[str, Any]:
+        return await self.load_many(get_many_github_users_by_username_async, usernames)
+
+    async def linkedin_organizations(self, linkedin_ids: Iterable[str]) -> Dict[str, Any]:
+        return await self.load_many(get_many_linkedin_organizations_by_id_async, linkedin_ids)
+
+    async def repositories(self, paths: Iterable[str]) -> Dict[str, Any]:
+        return await self.load_many(get_many_repositories_by_path_async, paths)
+
+
+def get_loader(db: Session = Depends(get_db)) -> Loader:
+    return Loader(db)
+
+
+def get_async_loader(db: AsyncSession = Depends(get_async_db)) -> AsyncLoader:
+    return AsyncLoader(db)
@@ -0,0 +1,176 @@
+from typing import Dict, Iterable, List, Set, Tuple
+from sqlalchemy import Select, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.github_user import GithubUser, GithubUserRepositoryMap
+from app.models.linkedin_user import LinkedinUser, LinkedinUserOrganizationMap
+from app.utils.enums import GraphNodeType
+
+
+# Breadth-first walk of the user <-> organization/repository graph in one statement.
+# Every user or group edge costs one hop; LinkedIn and GitHub accounts owned by the same
+# registered user are joined at no cost. Plain recursive CTE syntax, so it runs on SQLite
+# (3.34+) as well as MySQL 8 / SingleStore. MySQL types the CTE's columns from the anchor
+# rows, so those cast kind and id wide enough for every node type and id that follows.
+REACHABLE_NETWORK_QUERY = text("""
+WITH RECURSIVE reach(kind, id, hops) AS (
+    SELECT CAST('linkedin_user' AS CHAR(32)), CAST(username AS CHAR(512)), 0 FROM linkedin_users WHERE user_id = :user_id
+    UNION
+    SELECT CAST('github_user' AS CHAR(32)), CAST(username AS CHAR(512)), 0 FROM github_users WHERE user_id = :user_id
+    UNION
+    SELECT 'linkedin_organization', m.linkedin_organization_id, r.hops + 1
+    FROM reach r JOIN linkedin_user_organization_map m ON m.linkedin_user_username = r.id
+    WHERE r.kind = 'linkedin_user' AND r.hops < :depth
+    UNION
+    SELECT 'linkedin_user', m.linkedin_user_username, r.hops + 1
+    FROM reach r JOIN linkedin_user_organization_map m ON m.linkedin_organization_id = r.id
+    WHERE r.kind = 'linkedin_organization' AND r.hops < :depth
+    UNION
+    SELECT 'github_repository', m.repository_path, r.hops + 1
+    FROM reach r JOIN github_user_repository_map m ON m.github_user_username = r.id
+    WHERE r.kind = 'github_user' AND r.hops < :depth
+    UNION
+    SELECT 'github_user', m.github_user_username, r.hops + 1
+    FROM reach r JOIN github_user_repository_map m ON m.repository_path = r.id
+    WHERE r.kind = 'github_repository' AND r.hops < :depth
+    UNION
+    SELECT 'github_user', g.username, r.hops
+    FROM reach r JOIN linkedin_users l ON l.username = r.id JOIN github_users g ON g.user_id = l.user_id
+    WHERE r.kind = 'linkedin_user'
+    UNION
+    SELECT 'linkedin_user', l.username, r.hops
+    FROM reach r JOIN github_users g ON g.username = r.id JOIN linkedin_users l ON l.user_id = g.user_id
+    WHERE r.kind = 'github_user'
+)
+SELECT kind, id, MIN(hops) FROM reach GROUP BY kind, id
+""")
+
+
+def _reachable_network(rows) -> Dict[GraphNodeType, Dict[str, int]]:
+    reachable: Dict[GraphNodeType, Dict[str, int]] = {node_type: {} for node_type in GraphNodeType}
+    for kind, node_id, hops in rows:
+        reachable[GraphNodeType(kind)][node_id] = hops
+    return reachable
+
+
+def get_reachable_network(user_id: int, depth: int, db: Session) -> Dict[GraphNodeType, Dict[str, int]]:
+    """
+    Return {node type: {id: hops}} for every user, organization and repository within
+    `depth` hops of the registered user's LinkedIn and GitHub accounts, in one round trip.
+    """
+    return _reachable_network(db.execute(REACHABLE_NETWORK_QUERY, {"user_id": user_id, "depth": depth}))
+
+
+async def get_reachable_network_async(user_id: int, depth: int, db: AsyncSession) -> Dict[GraphNodeType, Dict[str, int]]:
+    return _reachable_network(await db.execute(REACHABLE_NETWORK_QUERY, {"user_id": user_id, "depth": depth}))
+
+
+def _membership_statements(reachable: Dict[GraphNodeType, Dict[str, int]]) -> Dict[GraphNodeType, Select]:
+    return {
+        GraphNodeType.LINKEDIN_ORGANIZATION: select(
+            LinkedinUserOrganizationMap.linkedin_user_username,
+            LinkedinUserOrganizationMap.linkedin_organization_id,
+        ).where(
+            LinkedinUserOrganizationMap.linkedin_user_username.in_(set(reachable[GraphNodeType.LINKEDIN_USER]))
+        ),
+        GraphNodeType.GITHUB_REPOSITORY: select(
+            GithubUserRepositoryMap.github_user_username,
+            GithubUserRepositoryMap.repository_path,
+        ).where(
+            GithubUserRepositoryMap.github_user_username.in_(set(reachable[GraphNodeType.GITHUB_USER]))
+        ),
+    }
+
+
+def get_network_memberships(
+    reachable: Dict[GraphNodeType, Dict[str, int]], db: Session
+) -> Dict[GraphNodeType, List[Tuple[str, str]]]:
+    """
+    Return {group type: [(username, group id)]} for every organization and repository
+    membership of the reached users, without loading the users themselves.
+    """
+    return {
+        group_type: [tuple(row) for row in db.execute(statement)]
+        for group_type, statement in _membership_statements(reachable).items()
+    }
+
+
+async def get_network_memberships_async(
+    reachable: Dict[GraphNodeType, Dict[str, int]], db: AsyncSession
+) -> Dict[GraphNodeType, List[Tuple[str, str]]]:
+    return {
+        group_type: [tuple(row) for row in await db.execute(statement)]
+        for group_type, statement in _membership_statements(reachable).items()
+    }
+
+
+def _registered_user_statements(linkedin_usernames: Iterable[str], github_usernames: Iterable[str]) -> List[Tuple[bool, Select]]:
+    return [
+        (is_linkedin, select(model.username, model.user_id).where(model.username.in_(set(usernames)), model.user_id.isnot(None)))
+        for is_linkedin, model, usernames in ((True, LinkedinUser, linkedin_usernames), (False, GithubUser, github_usernames))
+    ]
+
+
+def get_registered_user_ids(
+    linkedin_usernames: Iterable[str], github_usernames: Iterable[str], db: Session
+) -> Dict[Tuple[bool, str], int]:
+    """
+    Return {(is_linkedin, username): user id} for the given accounts owned by a registered user.
+    """
+    return {
+        (is_linkedin, username): user_id
+        for is_linkedin, statement in _registered_user_statements(linkedin_usernames, github_usernames)
+        for username, user_id in db.execute(statement)
+    }
+
+
+async def get_registered_user_ids_async(
+    linkedin_usernames: Iterable[str], github_usernames: Iterable[str], db: AsyncSession
+) -> Dict[Tuple[bool, str], int]:
+    user_ids = {}
+    for is_linkedin, statement in _registered_user_statements(linkedin_usernames, github_usernames):
+        for username, user_id in await db.execute(statement):
+            user_ids[(is_linkedin, username)] = user_id
+    return user_ids
+
+
+def _group_columns(group_type: GraphNodeType):
+    """
+    (group id column, username column) of the map table behind an organization or repository.
+    """
+    if group_type == GraphNodeType.LINKEDIN_ORGANIZATION:
+        return LinkedinUserOrganizationMap.linkedin_organization_id, LinkedinUserOrganizationMap.linkedin_user_username
+    return GithubUserRepositoryMap.repository_path, GithubUserRepositoryMap.github_user_username
+
+
+def _group_members_statement(group_type: GraphNodeType, group_id: str) -> Select:
+    group_column, user_column = _group_columns(group_type)
+    return select(user_column).where(group_column == group_id)
+
+
+def get_group_member_usernames(group_type: GraphNodeType, group_id: str, db: Session) -> List[str]:
+    return list(db.scalars(_group_members_statement(group_type, group_id)))
+
+
+async def get_group_member_usernames_async(group_type: GraphNodeType, group_id: str, db: AsyncSession) -> List[str]:
+    return list(await db.scalars(_group_members_statement(group_type, group_id)))
+
+
+def _groups_with_members_statement(group_type: GraphNodeType, group_ids: Iterable[str], usernames: Iterable[str]) -> Select:
+    group_column, user_column = _group_columns(group_type)
+    return select(group_column).where(group_column.in_(set(group_ids)), user_column.in_(set(usernames))).distinct()
+
+
+def get_groups_with_members(
+    group_type: GraphNodeType, group_ids: Iterable[str], usernames: Iterable[str], db: Session
+) -> Set[str]:
+    """
+    Return the subset of `group_ids` that have at least one member among `usernames`.
+    """
+    return set(db.scalars(_groups_with_members_statement(group_type, group_ids, usernames)))
+
+
+async def get_groups_with_members_async(
+    group_type: GraphNodeType, group_ids: Iterable[str], usernames: Iterable[str], db: AsyncSession
+) -> Set[str]:
+    return set(await db.scalars(_groups_with_members_statement(group_type, group_ids, usernames)))
@@ -0,0 +1,259 @@
+from datetime import datetime
+from threading import Event, Lock, Thread
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from app.db.session import SessionLocal
+from app.models.github_user import GithubUserRepositoryMap
+from app.models.linkedin_organization import LinkedinOrganization
+from app.models.linkedin_user import LinkedinUserOrganizationMap
+from app.models.public_network import (
+    PublicNetworkDirtyGroup,
+    PublicNetworkLink,
+    PublicNetworkNode,
+    PublicNetworkSnapshot,
+)
+from app.models.repository import Repository as RepositoryModel
+from app.utils.enums import PublicNetworkNodeType
+
+
+# Keeps IN (...) lists well under SQLite's bound parameter limit
+REFRESH_BATCH_SIZE = 500
+# Groups are flagged by writes in any process; the refresher picks them up by polling
+REFRESH_POLL_SECONDS = 5.0
+
+
+def _batches(ids: List[str]) -> Iterable[List[str]]:
+    for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+        yield ids[start:start + REFRESH_BATCH_SIZE]
+
+
+def mark_public_network_dirty(group_id: str, node_type: PublicNetworkNodeType, db: Session) -> None:
+    """
+    Flag an organization or repository for refresh in the public network snapshot.
+    Committed together with the caller's write; the refresher applies it afterwards.
+    """
+    db.merge(PublicNetworkDirtyGroup(id=group_id, type=node_type.value))
+
+
+def _organization_nodes(ids: List[str], db: Session) -> Tuple[List[dict], Dict[Tuple[str, str], int]]:
+    user_counts = dict(
+        db.query(LinkedinUserOrganizationMap.linkedin_organization_id, func.count())
+        .filter(LinkedinUserOrganizationMap.linkedin_organization_id.in_(ids))
+        .group_by(LinkedinUserOrganizationMap.linkedin_organization_id)
+        .all()
+    )
+    nodes = [
+        {
+            "id": org.linkedin_id,
+            "type": PublicNetworkNodeType.LINKEDIN_ORGANIZATION.value,
+            "name": org.name,
+            "description": org.description,
+            "industry": org.industry,
+            "company_size": org.company_size,
+            "user_count": user_counts.get(org.linkedin_id, 0),
+        }
+        for org in db.query(LinkedinOrganization).filter(LinkedinOrganization.linkedin_id.in_(ids))
+    ]
+
+    own_map, other_map = aliased(LinkedinUserOrganizationMap), aliased(LinkedinUserOrganizationMap)
+    shared_users = (
+        db.query(own_map.linkedin_organization_id, other_map.linkedin_organization_id, func.count())
+        .join(other_map, own_map.linkedin_user_username == other_map.linkedin_user_username)
+        .filter(
+            own_map.linkedin_organization_id.in_(ids),
+            other_map.linkedin_organization_id != own_map.linkedin_organization_id,
+        )
+        .group_by(own_map.linkedin_organization_id, other_map.linkedin_organization_id)
+        .all()
+    )
+    return nodes, {(min(a, b), max(a, b)): weight for a, b, weight in shared_users}
+
+
+def _repository_nodes(ids: List[str], db: Session) -> Tuple[List[dict], Dict[Tuple[str, str], int]]:
+    contributor_counts = dict(
+        db.query(GithubUserRepositoryMap.repository_path, func.count())
+        .filter(GithubUserRepositoryMap.repository_path.in_(ids))
+        .group_by(GithubUserRepositoryMap.repository_path)
+        .all()
+    )
+    nodes = [
+        {
+            "id": repo.path,
+            "type": PublicNetworkNodeType.GITHUB_REPOSITORY.value,
+            "name": repo.path.split('/')[-1],
+            "description": repo.description,
+            "stars": repo.stars,
+            "contributor_count": contributor_counts.get(repo.path, 0),
+        }
+        for repo in db.query(RepositoryModel).filter(RepositoryModel.path.in_(ids))
+    ]
+
+    own_map, other_map = aliased(GithubUserRepositoryMap), aliased(GithubUserRepositoryMap)
+    shared_contributors = (
+        db.query(own_map.repository_path, other_map.repository_path, func.count())
+        .join(other_map, own_map.github_user_username == other_map.github_user_username)
+        .filter(
+            own_map.repository_path.in_(ids),
+            other_map.repository_path != own_map.repository_path,
+        )
+        .group_by(own_map.repository_path, other_map.repository_path)
+        .all()
+    )
+    return nodes, {(min(a, b), max(a, b)): weight for a, b, weight in shared_contributors}
+
+
+def _lock_snapshot(db: Session) -> Tuple[PublicNetworkSnapshot, bool]:
+    """
+    Return the snapshot row locked for update, and whether this call created it. The row
+    lock makes concurrent refreshes, in any worker or process, run one after the other.
+    """
+    snapshot = db.scalars(select(PublicNetworkSnapshot).where(PublicNetworkSnapshot.id == 1).with_for_update()).first()
+    if snapshot is not None:
+        return snapshot, False
+    try:
+        db.add(PublicNetworkSnapshot(id=1, revision=0))
+        db.flush()
+        created = True
+    except IntegrityError:
+        # Another refresh created it first; wait for its lock instead
+        db.rollback()
+        created = False
+    return db.scalars(select(PublicNetworkSnapshot).where(PublicNetworkSnapshot.id == 1).with_for_update()).one(), created
+
+
+def refresh_public_network(db: Session) -> int:
+    """
+    Bring the persisted public network snapshot up to date and return its revision. The
+    first refresh builds it from every organization and repository; later ones only
+    rebuild the nodes and incident links of groups flagged by mark_public_network_dirty.
+    """
+    snapshot, created = _lock_snapshot(db)
+    if created:
+        for (linkedin_id,) in db.query(LinkedinOrganization.linkedin_id):
+            mark_public_network_dirty(linkedin_id, PublicNetworkNodeType.LINKEDIN_ORGANIZATION, db)
+        for (path,) in db.query(RepositoryModel.path):
+            mark_public_network_dirty(path, PublicNetworkNodeType.GITHUB_REPOSITORY, db)
+        db.flush()
+
+    dirty_groups = db.query(PublicNetworkDirtyGroup).all()
+    if not dirty_groups and snapshot.updated_at is not None:
+        revision = snapshot.revision
+        db.commit()
+        return revision
+
+    for node_type, build_nodes, link_type in (
+        (PublicNetworkNodeType.LINKEDIN_ORGANIZATION, _organization_nodes, "shared_user"),
+        (PublicNetworkNodeType.GITHUB_REPOSITORY, _repository_nodes, "shared_contributor"),
+    ):
+        dirty_ids = [group.id for group in dirty_groups if group.type == node_type.value]
+        for ids in _batches(dirty_ids):
+            nodes, links = build_nodes(ids, db)
+            db.query(PublicNetworkNode).filter(PublicNetworkNode.id.in_(ids)).delete(synchronize_session=False)
+            db.query(PublicNetworkLink).filter(
+                or_(PublicNetworkLink.source.in_(ids), PublicNetworkLink.target.in_(ids))
+            ).delete(synchronize_session=False)
+            db.add_all(PublicNetworkNode(id=node["id"], type=node["type"], data=node) for node in nodes)
+            db.add_all(
+                PublicNetworkLink(source=source, target=target, type=link_type, weight=weight)
+                for (source, target), weight in links.items()
+            )
+            db.flush()
+
+    for group in dirty_groups:
+        db.delete(group)
+    snapshot.revision += 1
+    snapshot.updated_at = datetime.utcnow()
+    revision = snapshot.revision
+    db.commit()
+    return revision
+
+
+class PublicNetworkRefresher:
+    """
+    Background thread applying flagged groups to the public network snapshot, so the
+    anonymous public network route only ever reads it.
+    """
+
+    def __init__(self, poll_seconds: float = REFRESH_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._stopping = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = Thread(target=self._run, name="public-network-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._stopping.set()
+            self._thread.join()
+
+    def refresh(self) -> int:
+        db = SessionLocal()
+        try:
+            return refresh_public_network(db)
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.poll_seconds):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing public network: {e}")
+
+
+_public_network_refresher: Optional[PublicNetworkRefresher] = None
+_public_network_refresher_lock = Lock()
+
+
+def get_public_network_refresher() -> PublicNetworkRefresher:
+    global _public_network_refresher
+    if _public_network_refresher is None:
+        with _public_network_refresher_lock:
+            if _public_network_refresher is None:
+                _public_network_refresher = PublicNetworkRefresher()
+    return _public_network_refresher
+
+
+def iter_public_network(db: Session) -> Iterator[Tuple[str, dict]]:
+    """
+    Stream the current public network as ("node", node) then ("link", link) records,
+    reading rows in batches.
+    """
+    nodes = db.query(PublicNetworkNode.data).order_by(PublicNetworkNode.type, PublicNetworkNode.id)
+    for (data,) in nodes.yield_per(REFRESH_BATCH_SIZE):
+        yield "node", data
+    links = db.query(PublicNetworkLink.source, PublicNetworkLink.target, PublicNetworkLink.type, PublicNetworkLink.weight)
+    for source, target, link_type, weight in links.yield_per(REFRESH_BATCH_SIZE):
+        yield "link", {"source": source, "target": target, "type": link_type, "weight": weight}
+
+
+def get_public_network_snapshot(db: Session) -> dict:
+    """
+    Return the public network payload as of the last refresh.
+    """
+    public_network = {"nodes": [], "links": []}
+    for kind, record in iter_public_network(db):
+        public_network[f"{kind}s"].append(record)
+    nodes = public_network["nodes"]
+    public_network["counts"] = {
+        "linkedin_organizations": sum(1 for node in nodes if node["type"] == PublicNetworkNodeType.LINKEDIN_ORGANIZATION),
+        "github_repositories": sum(1 for node in nodes if node["type"] == PublicNetworkNodeType.GITHUB_REPOSITORY),
+        "links": len(public_network["links"]),
+    }
+    return public_network
+
+
+def get_public_network_revision(db: Session) -> int:
+    return db.scalar(select(PublicNetworkSnapshot.revision).where(PublicNetworkSnapshot.id == 1)) or 0
+
+
+def has_public_organizations(db: Session) -> bool:
+    return db.scalar(
+        select(PublicNetworkNode.id).where(PublicNetworkNode.type == PublicNetworkNodeType.LINKEDIN_ORGANIZATION.value).limit(1)
+    ) is not None
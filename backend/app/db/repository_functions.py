@@ -1,15 +1,20 @@
 import requests
 
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy.orm.attributes import set_attribute
 from fastapi import Depends
-from typing import List
-from app.chromadb import get_chroma_collection
+from typing import Dict, Iterable, List
+from app.chromadb.ingestion import notify_chroma_relay, record_chroma_document
+from app.search import index_repository
+from app.db.graph_change_functions import record_graph_change, record_membership_change
+from app.db.public_network_functions import mark_public_network_dirty
 from app.models.repository import Repository as RepositoryModel
 from app.models.github_user import GithubUserRepositoryMap
 from app.schemas.repository import Repository as RepositorySchema, GithubUserContribution
 from app.db.session import get_db
-from app.utils.enums import ChromaCollections
+from app.utils.enums import ChromaCollections, GraphChangeAction, GraphNodeType, PublicNetworkNodeType
 
 
 """
@@ -43,48 +48,76 @@ def get_repository_by_path(path: str, db: Session = Depends(get_db)) -> Reposito
     return None
 
 
+def _repository_schema(repo: RepositoryModel) -> RepositorySchema:
+    return RepositorySchema(
+        path=repo.path,
+        description=repo.description,
+        stars=repo.stars,
+        github_users=[
+            GithubUserContribution(
+                username=user_repo_map.github_user_username,
+                num_contributions=user_repo_map.num_contributions
+            ) for user_repo_map in repo.github_users
+        ]
+    )
+
+
+def _many_repositories_statement(paths: Iterable[str]) -> Select:
+    return (
+        select(RepositoryModel)
+        .where(RepositoryModel.path.in_(set(paths)))
+        .options(selectinload(RepositoryModel.github_users))
+    )
+
+
+def get_many_repositories_by_path(paths: Iterable[str], db: Session) -> Dict[str, RepositorySchema]:
+    """
+    Fetch repositories and their contributors in one IN query plus one selectin load.
+    Paths that do not exist are left out of the result.
+    """
+    return {repo.path: _repository_schema(repo) for repo in db.scalars(_many_repositories_statement(paths))}
+
+
+async def get_many_repositories_by_path_async(paths: Iterable[str], db: AsyncSession) -> Dict[str, RepositorySchema]:
+    return {repo.path: _repository_schema(repo) for repo in await db.scalars(_many_repositories_statement(paths))}
+
+
 def get_repositories_by_github_user(username: str, db: Session) -> List[RepositorySchema]:
     user_repo_maps = db.query(GithubUserRepositoryMap).filter(GithubUserRepositoryMap.github_user_username == username).all()
-    return [get_repository_by_path(user_repo_map.repository_path, db) for user_repo_map in user_repo_maps]
+    repositories = get_many_repositories_by_path([user_repo_map.repository_path for user_repo_map in user_repo_maps], db)
+    return [
+        repositories[user_repo_map.repository_path] for user_repo_map in user_repo_maps
+        if user_repo_map.repository_path in repositories
+    ]
+
+
+def _all_repositories_statement() -> Select:
+    return select(RepositoryModel).options(selectinload(RepositoryModel.github_users))
 
 
 def get_all_repositories(db: Session) -> List[RepositorySchema]:
-    db_repositories = db.query(RepositoryModel).all()
-    return [
-        RepositorySchema(
-            path=repo.path,
-            description=repo.description,
-            stars=repo.stars,
-            github_users=[
-                GithubUserContribution(
-                    username=user_repo_map.github_user_username,
-                    num_contributions=user_repo_map.num_contributions
-                ) for user_repo_map in repo.github_users
-            ]
-        ) for repo in db_repositories
-    ]
+    return [_repository_schema(repo) for repo in db.scalars(_all_repositories_statement())]
+
+
+async def get_all_repositories_async(db: AsyncSession) -> List[RepositorySchema]:
+    return [_repository_schema(repo) for repo in await db.scalars(_all_repositories_statement())]
 
 def create_repository(repository: RepositorySchema, token: str | None, db: Session) -> RepositorySchema:
-    # Create repository in chroma DB with path as the ID
-    try:
-        readme_string = get_readme_by_path(path=repository.path, token=token)
-        github_collection = get_chroma_collection(
-            collection=ChromaCollections.GITHUB_REPOSITORY,
-        )
-        github_collection.upsert(
-            documents=[readme_string],
-            ids=[repository.path],
-        )
-    except Exception as e:
-        print(f"Error creating repository in chroma: {e}")
-    # Create repository in primary DB
+    readme_string = get_readme_by_path(path=repository.path, token=token)
+    # Create repository in primary DB, with its README in the chroma outbox of the same
+    # transaction; path is the chroma ID
     db_repository = RepositoryModel(
         path=repository.path,
         description=repository.description,
         stars=repository.stars,
     )
     db.add(db_repository)
+    record_chroma_document(ChromaCollections.GITHUB_REPOSITORY, repository.path, readme_string, db)
+    mark_public_network_dirty(repository.path, PublicNetworkNodeType.GITHUB_REPOSITORY, db)
+    record_graph_change(GraphChangeAction.ADDED, GraphNodeType.GITHUB_REPOSITORY, repository.path, db)
     db.commit()
+    notify_chroma_relay()
+    index_repository(repository.path, repository.description, readme_string)
     db.refresh(db_repository)
     return RepositorySchema(
         path=db_repository.path,
@@ -99,16 +132,19 @@ def update_repository(repository: RepositorySchema, db: Session) -> RepositorySc
         for key, value in repository.dict(exclude_unset=True).items():
             if key != 'github_users':
                 setattr(db_repository, key, value)
+        mark_public_network_dirty(db_repository.path, PublicNetworkNodeType.GITHUB_REPOSITORY, db)
+        record_graph_change(GraphChangeAction.UPDATED, GraphNodeType.GITHUB_REPOSITORY, db_repository.path, db)
         db.commit()
         db.refresh(db_repository)
+        index_repository(db_repository.path, db_repository.description)
         return get_repository_by_path(db_repository.path, db)
     return None
 
 def add_user_to_repository(repository_path: str, github_username: str, num_contributions: int, db: Session) -> RepositorySchema | None:
     db_repository = db.query(RepositoryModel).filter(RepositoryModel.path == repository_path).first()
     if db_repository:
-        from app.db.github_user_functions import get_github_user_by_username
-        db_github_user = get_github_user_by_username(github_username, db)
+        from app.models.github_user import GithubUser
+        db_github_user = db.query(GithubUser.username).filter(GithubUser.username == github_username).first()
         if db_github_user:
             existing_relationship = db.query(GithubUserRepositoryMap).filter_by(
                 github_user_username=github_username,
@@ -117,6 +153,7 @@ def add_user_to_repository(repository_path: str, github_username: str, num_contr
 
             if existing_relationship:
                 set_attribute(existing_relationship, 'num_contributions', num_contributions)
+                action = GraphChangeAction.UPDATED
             else:
                 new_relationship = GithubUserRepositoryMap(
                     github_user_username=github_username,
@@ -124,6 +161,11 @@ def add_user_to_repository(repository_path: str, github_username: str, num_contr
                     num_contributions=num_contributions
                 )
                 db.add(new_relationship)
+                action = GraphChangeAction.ADDED
+            mark_public_network_dirty(repository_path, PublicNetworkNodeType.GITHUB_REPOSITORY, db)
+            record_membership_change(
+                action, GraphNodeType.GITHUB_USER, github_username, GraphNodeType.GITHUB_REPOSITORY, repository_path, db
+            )
             
             db.commit()
             db.refresh(db_repository)
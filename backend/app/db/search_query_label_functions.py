@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.search_query_label import SearchQueryLabel
+from app.utils.enums import SearchType
+
+
+async def record_search_query_label_async(query: str, search_type: SearchType, db: AsyncSession) -> None:
+    """
+    Log an LLM classification so the local query classifier can learn from it.
+    """
+    await db.merge(SearchQueryLabel(query=query, search_type=search_type.value, created_at=datetime.utcnow()))
+    await db.commit()
+
+
+def get_search_query_labels(db: Session) -> List[Tuple[str, str]]:
+    return list(db.execute(select(SearchQueryLabel.query, SearchQueryLabel.search_type)).tuples())
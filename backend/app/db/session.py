@@ -1,5 +1,9 @@
+from typing import Any, Callable
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 
@@ -7,9 +11,45 @@ engine = create_engine(settings.SQLALCHEMY_DATABASE_URL)  # singlestore connecti
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def get_async_database_url(url: str) -> URL:
+    """
+    Swap the configured sync driver for its asyncio counterpart (aiosqlite / aiomysql).
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    if url.get_backend_name() in ("mysql", "singlestoredb"):
+        return url.set(drivername="mysql+aiomysql")
+    return url
+
+
+async_engine = create_async_engine(get_async_database_url(settings.SQLALCHEMY_DATABASE_URL))
+# Objects stay usable after commit; async code cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_with_sync_session(fn: Callable[[Session], Any]) -> Any:
+    """
+    Run sync database code in the threadpool with its own session, for work that holds
+    process-wide locks or is CPU heavy and so must not run on the event loop.
+    """
+    def run():
+        db = SessionLocal()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+    return await run_in_threadpool(run)
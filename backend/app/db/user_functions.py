@@ -1,22 +1,28 @@
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from jose import jwt, JWTError
 from app.core.config import settings
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models import User
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _token_email(token: str) -> str:
+    credentials_exception = _credentials_exception()
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
         email: str = payload.get("sub", "")
@@ -24,9 +30,28 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    return email
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    email = _token_email(token)
     user = db.query(User).filter(User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
+    """
+    get_current_user for routes on an AsyncSession. The linked LinkedIn and GitHub accounts
+    are loaded eagerly, since async sessions cannot lazy-load them later.
+    """
+    email = _token_email(token)
+    user = await db.scalar(
+        select(User).where(User.email == email).options(selectinload(User.linkedin_user), selectinload(User.github_user))
+    )
+    if user is None:
+        raise _credentials_exception()
     return user
 
 
@@ -36,3 +61,9 @@ def get_user_by_email(email: str, db: Session) -> User | None:
 
 def get_user_by_id(user_id: int, db: Session) -> User | None:
     return db.query(User).filter(User.id == user_id).first()
+
+
+async def get_user_by_id_async(user_id: int, db: AsyncSession) -> User | None:
+    return await db.scalar(
+        select(User).where(User.id == user_id).options(selectinload(User.linkedin_user), selectinload(User.github_user))
+    )
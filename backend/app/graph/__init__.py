@@ -0,0 +1,79 @@
+import time
+from threading import Lock, Thread
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.graph_change_functions import get_graph_version
+from app.db.session import SessionLocal
+from app.graph.index import GraphIndex
+from app.graph.scoring import ConnectionScorer
+
+
+_graph_index: Optional[GraphIndex] = None
+_graph_index_lock = Lock()
+_connection_scorer: Optional[ConnectionScorer] = None
+_connection_scorer_lock = Lock()
+_connection_scorer_rebuilding = False
+
+
+def get_graph_index(db: Session) -> GraphIndex:
+    """
+    Return the process-wide graph index, loading it from the map tables on first use and
+    catching it up from the change log whenever the graph version has moved, whichever
+    process made the writes.
+    """
+    global _graph_index
+    graph_index = _graph_index
+    if graph_index is not None and graph_index.version >= get_graph_version(db):
+        return graph_index
+    with _graph_index_lock:
+        graph_index = _graph_index
+        if graph_index is None or not graph_index.catch_up(db):
+            graph_index = GraphIndex()
+            graph_index.load(db)
+            _graph_index = graph_index
+    return graph_index
+
+
+def get_connection_scorer(db: Session) -> ConnectionScorer:
+    """
+    Return the process-wide connection scorer, building it on first use. Once the graph
+    version moves past the one it was built at, a rebuild starts in the background, at
+    most once per CONNECTION_SCORER_REBUILD_SECONDS, and the current matrices keep being
+    served until the new ones are ready.
+    """
+    global _connection_scorer
+    connection_scorer = _connection_scorer
+    if connection_scorer is None:
+        with _connection_scorer_lock:
+            if _connection_scorer is None:
+                _connection_scorer = ConnectionScorer(db)
+            return _connection_scorer
+    if (
+        time.monotonic() - connection_scorer.built_at >= settings.CONNECTION_SCORER_REBUILD_SECONDS
+        and connection_scorer.version < get_graph_version(db)
+    ):
+        _start_connection_scorer_rebuild()
+    return connection_scorer
+
+
+def _rebuild_connection_scorer() -> None:
+    global _connection_scorer, _connection_scorer_rebuilding
+    db = SessionLocal()
+    try:
+        _connection_scorer = ConnectionScorer(db)
+    except Exception as e:
+        print(f"Connection scorer rebuild failed: {e}")
+    finally:
+        db.close()
+        with _connection_scorer_lock:
+            _connection_scorer_rebuilding = False
+
+
+def _start_connection_scorer_rebuild() -> None:
+    global _connection_scorer_rebuilding
+    with _connection_scorer_lock:
+        if _connection_scorer_rebuilding:
+            return
+        _connection_scorer_rebuilding = True
+    Thread(target=_rebuild_connection_scorer, name="connection-scorer-rebuild", daemon=True).start()
@@ -0,0 +1,60 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class IdentityIndex:
+    """
+    Cross-platform identity lookups for a graph payload as it is built: node ids by
+    username and by account, LinkedIn <-> GitHub account links, and emitted group ids.
+    """
+
+    def __init__(self):
+        self.node_ids_by_username: Dict[str, List[int]] = defaultdict(list)
+        self.node_ids_by_account: Dict[Tuple[bool, str], List[int]] = defaultdict(list)
+        self.linkedin_to_github: Dict[str, str] = {}
+        self.github_to_linkedin: Dict[str, str] = {}
+        self.group_ids: Set[str] = set()
+
+    def link_accounts(self, linkedin_username: str, github_username: str) -> None:
+        self.linkedin_to_github[linkedin_username] = github_username
+        self.github_to_linkedin[github_username] = linkedin_username
+
+    def link_registered_accounts(self, linkedin_users: Iterable, github_users: Iterable) -> None:
+        """
+        Link LinkedIn and GitHub accounts that belong to the same registered user.
+        """
+        github_by_user_id = {u.user_id: u.username for u in github_users if u.user_id is not None}
+        for linkedin_user in linkedin_users:
+            github_username = github_by_user_id.get(linkedin_user.user_id)
+            if github_username is not None:
+                self.link_accounts(linkedin_user.username, github_username)
+
+    def linked_account(self, username: str, is_linkedin: bool) -> Optional[str]:
+        if is_linkedin:
+            return self.linkedin_to_github.get(username)
+        return self.github_to_linkedin.get(username)
+
+    def add_node(self, node_id: int, username: str, is_linkedin: bool) -> None:
+        self.node_ids_by_username[username].append(node_id)
+        self.node_ids_by_account[(is_linkedin, username)].append(node_id)
+
+    def add_group(self, group_id: str) -> bool:
+        """
+        Record a group id, returning False if it was already emitted.
+        """
+        if group_id in self.group_ids:
+            return False
+        self.group_ids.add(group_id)
+        return True
+
+    def corresponding_user_nodes(self, node_id: int, username: str, is_linkedin: bool) -> List[int]:
+        """
+        Other nodes for the same person: nodes sharing the username on either platform,
+        plus nodes of the linked account on the other platform.
+        """
+        node_ids = set(self.node_ids_by_username[username])
+        linked_username = self.linked_account(username, is_linkedin)
+        if linked_username is not None:
+            node_ids.update(self.node_ids_by_account[(not is_linkedin, linked_username)])
+        node_ids.discard(node_id)
+        return sorted(node_ids)
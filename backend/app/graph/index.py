@@ -0,0 +1,210 @@
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from threading import RLock
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+from sqlalchemy.orm import Session
+from app.db.graph_change_functions import get_graph_changes, get_graph_version
+from app.models.github_user import GithubUserRepositoryMap
+from app.models.linkedin_user import LinkedinUserOrganizationMap
+from app.utils.enums import GraphChangeAction, GraphNodeType
+
+
+# Buffered edges are merged into the CSR arrays once they reach this share of the built ones
+MERGE_FRACTION = 0.125
+MIN_MERGE_EDGES = 1024
+# An index further behind the change log than this is reloaded from the map tables instead
+MAX_REPLAYED_CHANGES = 10000
+
+
+class _Adjacency(NamedTuple):
+    """
+    One direction of the graph: sorted neighbours of row `r` are `indices[indptr[r]:indptr[r + 1]]`,
+    plus edges added since the arrays were built, buffered per row in `extra`.
+    """
+    indptr: array
+    indices: array
+    extra: Dict[int, Set[int]]
+
+
+def _empty_adjacency() -> _Adjacency:
+    return _Adjacency(array("q", [0]), array("q"), {})
+
+
+def _merge(adjacency: _Adjacency, num_rows: int) -> _Adjacency:
+    """
+    Fold the buffered edges into new CSR arrays. Untouched rows are copied as slices, so
+    the work is one step per row plus the buffered edges, not one per stored edge.
+    """
+    indptr, indices, extra = adjacency
+    built_rows = len(indptr) - 1
+    merged_indptr = array("q", [0]) * (num_rows + 1)
+    merged_indices = array("q")
+    for row in range(num_rows):
+        neighbours = indices[indptr[row]:indptr[row + 1]] if row < built_rows else array("q")
+        added = extra.get(row)
+        if added:
+            neighbours = array("q", sorted(chain(neighbours, added)))
+        merged_indices.extend(neighbours)
+        merged_indptr[row + 1] = len(merged_indices)
+    return _Adjacency(merged_indptr, merged_indices, {})
+
+
+def _has_neighbour(adjacency: _Adjacency, row: int, neighbour: int) -> bool:
+    indptr, indices, extra = adjacency
+    if row + 1 < len(indptr):
+        start, end = indptr[row], indptr[row + 1]
+        position = bisect_left(indices, neighbour, start, end)
+        if position < end and indices[position] == neighbour:
+            return True
+    return neighbour in extra.get(row, ())
+
+
+class BipartiteAdjacency:
+    """
+    User <-> group (organization or repository) adjacency over interned integer ids.
+
+    Edges are kept in two CSR layouts, one indexed by user and one by group, so both
+    directions are a slice lookup. Edges added after the last build are buffered per row
+    and merged into the arrays in bulk once enough of them pile up.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self.user_ids: Dict[str, int] = {}
+        self.user_keys: List[str] = []
+        self.group_ids: Dict[str, int] = {}
+        self.group_keys: List[str] = []
+        # Each direction is swapped as a unit, so lock-free readers never mix builds
+        self._by_user = _empty_adjacency()
+        self._by_group = _empty_adjacency()
+        self._num_extra = 0
+
+    @staticmethod
+    def _intern(ids: Dict[str, int], keys: List[str], key: str) -> int:
+        key_id = ids.get(key)
+        if key_id is None:
+            key_id = len(keys)
+            keys.append(key)
+            ids[key] = key_id
+        return key_id
+
+    def _add_edge(self, user: str, group: str) -> None:
+        user_id = self._intern(self.user_ids, self.user_keys, user)
+        group_id = self._intern(self.group_ids, self.group_keys, group)
+        if _has_neighbour(self._by_user, user_id, group_id):
+            return
+        self._by_user.extra.setdefault(user_id, set()).add(group_id)
+        self._by_group.extra.setdefault(group_id, set()).add(user_id)
+        self._num_extra += 1
+
+    def add_edge(self, user: str, group: str) -> None:
+        with self._lock:
+            self._add_edge(user, group)
+            if self._num_extra >= max(MIN_MERGE_EDGES, MERGE_FRACTION * len(self._by_user.indices)):
+                self._merge()
+
+    def add_edges(self, edges: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            for user, group in edges:
+                self._add_edge(user, group)
+            self._merge()
+
+    def _merge(self) -> None:
+        if not self._num_extra:
+            return
+        self._by_user = _merge(self._by_user, len(self.user_keys))
+        self._by_group = _merge(self._by_group, len(self.group_keys))
+        self._num_extra = 0
+
+    def _neighbours(self, direction: str, row: int) -> array:
+        adjacency: _Adjacency = getattr(self, direction)
+        indptr, indices, extra = adjacency
+        if row + 1 < len(indptr) and row not in extra:
+            return indices[indptr[row]:indptr[row + 1]]
+        # Rows with buffered edges, or newer than the arrays, are read under the lock
+        with self._lock:
+            indptr, indices, extra = getattr(self, direction)
+            neighbours = indices[indptr[row]:indptr[row + 1]] if row + 1 < len(indptr) else array("q")
+            added = extra.get(row)
+            if added:
+                neighbours = array("q", sorted(chain(neighbours, added)))
+            return neighbours
+
+    def group_ids_of(self, user_id: int) -> array:
+        return self._neighbours("_by_user", user_id)
+
+    def user_ids_of(self, group_id: int) -> array:
+        return self._neighbours("_by_group", group_id)
+
+    def groups_of(self, user: str) -> List[str]:
+        user_id = self.user_ids.get(user)
+        if user_id is None:
+            return []
+        return [self.group_keys[group_id] for group_id in self.group_ids_of(user_id)]
+
+    def users_of(self, group: str) -> List[str]:
+        group_id = self.group_ids.get(group)
+        if group_id is None:
+            return []
+        return [self.user_keys[user_id] for user_id in self.user_ids_of(group_id)]
+
+    @property
+    def num_edges(self) -> int:
+        with self._lock:
+            return len(self._by_user.indices) + self._num_extra
+
+
+class GraphIndex:
+    """
+    In-process index of the LinkedIn user <-> organization and GitHub user <-> repository
+    graphs, loaded from the map tables at a graph version and caught up from the change
+    log, so writes made by other processes show up too.
+    """
+
+    def __init__(self):
+        self.linkedin = BipartiteAdjacency()
+        self.github = BipartiteAdjacency()
+        # Graph version the index reflects
+        self.version = 0
+
+    def load(self, db: Session) -> None:
+        # Read the version before the edges: memberships committed in between are replayed
+        # on the next catch up, which is harmless since edges are deduplicated
+        self.version = get_graph_version(db)
+        self.linkedin.add_edges(
+            db.query(
+                LinkedinUserOrganizationMap.linkedin_user_username,
+                LinkedinUserOrganizationMap.linkedin_organization_id,
+            ).yield_per(10000)
+        )
+        self.github.add_edges(
+            db.query(
+                GithubUserRepositoryMap.github_user_username,
+                GithubUserRepositoryMap.repository_path,
+            ).yield_per(10000)
+        )
+
+    def catch_up(self, db: Session) -> bool:
+        """
+        Add the memberships logged since the index version. Returns False if the index
+        cannot be caught up incrementally, because something was removed or it is too far
+        behind, and must be reloaded instead.
+        """
+        changes = get_graph_changes(self.version, MAX_REPLAYED_CHANGES + 1, db)
+        if len(changes) > MAX_REPLAYED_CHANGES:
+            return False
+        for change in changes:
+            if change.target_type == GraphNodeType.LINKEDIN_ORGANIZATION:
+                adjacency = self.linkedin
+            elif change.target_type == GraphNodeType.GITHUB_REPOSITORY:
+                adjacency = self.github
+            else:
+                adjacency = None
+            # Removed nodes and memberships are rare; identity links are not in the index
+            if change.action == GraphChangeAction.REMOVED and (adjacency is not None or change.target_type is None):
+                return False
+            if adjacency is not None:
+                adjacency.add_edge(change.node_id, change.target_id)
+            self.version = change.version
+        return True
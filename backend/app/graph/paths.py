@@ -0,0 +1,137 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from app.graph.index import GraphIndex
+from app.utils.enums import GraphNodeType
+
+
+# Nodes are packed into one int: (id << 2) | kind, with one id space per kind
+_LINKEDIN_USER, _LINKEDIN_ORGANIZATION, _GITHUB_USER, _GITHUB_REPOSITORY = range(4)
+_NODE_TYPES = {
+    _LINKEDIN_USER: GraphNodeType.LINKEDIN_USER,
+    _LINKEDIN_ORGANIZATION: GraphNodeType.LINKEDIN_ORGANIZATION,
+    _GITHUB_USER: GraphNodeType.GITHUB_USER,
+    _GITHUB_REPOSITORY: GraphNodeType.GITHUB_REPOSITORY,
+}
+
+
+class IntroductionPathFinder:
+    """
+    Shortest-path search over the user <-> organization/repository graph held by the
+    graph index. LinkedIn and GitHub accounts of the same registered user are joined
+    by an extra edge so paths can cross platforms.
+    """
+
+    def __init__(self, graph_index: GraphIndex, account_links: Iterable[Tuple[str, str]], max_fanout: int):
+        self.graph_index = graph_index
+        self.max_fanout = max_fanout
+        self.linkedin_to_github: Dict[int, int] = {}
+        self.github_to_linkedin: Dict[int, int] = {}
+        for linkedin_username, github_username in account_links:
+            linkedin_id = graph_index.linkedin.user_ids.get(linkedin_username)
+            github_id = graph_index.github.user_ids.get(github_username)
+            if linkedin_id is not None and github_id is not None:
+                self.linkedin_to_github[linkedin_id] = github_id
+                self.github_to_linkedin[github_id] = linkedin_id
+
+    def node(self, node_type: GraphNodeType, key: str) -> Optional[int]:
+        if node_type == GraphNodeType.LINKEDIN_USER:
+            key_id, kind = self.graph_index.linkedin.user_ids.get(key), _LINKEDIN_USER
+        elif node_type == GraphNodeType.GITHUB_USER:
+            key_id, kind = self.graph_index.github.user_ids.get(key), _GITHUB_USER
+        elif node_type == GraphNodeType.LINKEDIN_ORGANIZATION:
+            key_id, kind = self.graph_index.linkedin.group_ids.get(key), _LINKEDIN_ORGANIZATION
+        else:
+            key_id, kind = self.graph_index.github.group_ids.get(key), _GITHUB_REPOSITORY
+        return None if key_id is None else (key_id << 2) | kind
+
+    def describe(self, node: int) -> Tuple[GraphNodeType, str]:
+        key_id, kind = node >> 2, node & 3
+        if kind == _LINKEDIN_USER:
+            key = self.graph_index.linkedin.user_keys[key_id]
+        elif kind == _LINKEDIN_ORGANIZATION:
+            key = self.graph_index.linkedin.group_keys[key_id]
+        elif kind == _GITHUB_USER:
+            key = self.graph_index.github.user_keys[key_id]
+        else:
+            key = self.graph_index.github.group_keys[key_id]
+        return _NODE_TYPES[kind], key
+
+    def _neighbours(self, node: int) -> Iterator[int]:
+        key_id, kind = node >> 2, node & 3
+        if kind == _LINKEDIN_USER:
+            for group_id in self.graph_index.linkedin.group_ids_of(key_id)[:self.max_fanout]:
+                yield (group_id << 2) | _LINKEDIN_ORGANIZATION
+            if key_id in self.linkedin_to_github:
+                yield (self.linkedin_to_github[key_id] << 2) | _GITHUB_USER
+        elif kind == _LINKEDIN_ORGANIZATION:
+            for user_id in self.graph_index.linkedin.user_ids_of(key_id)[:self.max_fanout]:
+                yield (user_id << 2) | _LINKEDIN_USER
+        elif kind == _GITHUB_USER:
+            for group_id in self.graph_index.github.group_ids_of(key_id)[:self.max_fanout]:
+                yield (group_id << 2) | _GITHUB_REPOSITORY
+            if key_id in self.github_to_linkedin:
+                yield (self.github_to_linkedin[key_id] << 2) | _LINKEDIN_USER
+        else:
+            for user_id in self.graph_index.github.user_ids_of(key_id)[:self.max_fanout]:
+                yield (user_id << 2) | _GITHUB_USER
+
+    def _expand(self, frontier: List[int], visited: Dict[int, Tuple[int, List[int]]], depth: int) -> List[int]:
+        next_layer: Dict[int, List[int]] = {}
+        for node in frontier:
+            for neighbour in self._neighbours(node):
+                if neighbour in visited:
+                    continue
+                next_layer.setdefault(neighbour, []).append(node)
+        for neighbour, parents in next_layer.items():
+            visited[neighbour] = (depth, parents)
+        return list(next_layer)
+
+    @staticmethod
+    def _chains(node: int, visited: Dict[int, Tuple[int, List[int]]], limit: int) -> List[List[int]]:
+        """
+        Up to `limit` parent chains from `node` back to a root of one BFS side.
+        """
+        chains: List[List[int]] = []
+        stack = [[node]]
+        while stack and len(chains) < limit:
+            chain = stack.pop()
+            parents = visited[chain[-1]][1]
+            if not parents:
+                chains.append(chain)
+            for parent in parents:
+                stack.append(chain + [parent])
+        return chains
+
+    def find(self, sources: List[int], targets: List[int], max_depth: int, k: int) -> List[List[int]]:
+        """
+        Bidirectional BFS from `sources` to `targets`, returning up to `k` shortest paths
+        (as node lists) of at most `max_depth` edges. The smaller frontier is expanded first.
+        """
+        forward: Dict[int, Tuple[int, List[int]]] = {node: (0, []) for node in sources}
+        backward: Dict[int, Tuple[int, List[int]]] = {node: (0, []) for node in targets}
+        forward_frontier, backward_frontier = list(forward), list(backward)
+        forward_depth = backward_depth = 0
+        meeting = [node for node in forward if node in backward]
+
+        while not meeting and forward_frontier and backward_frontier and forward_depth + backward_depth < max_depth:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_depth += 1
+                forward_frontier = self._expand(forward_frontier, forward, forward_depth)
+                meeting = [node for node in forward_frontier if node in backward]
+            else:
+                backward_depth += 1
+                backward_frontier = self._expand(backward_frontier, backward, backward_depth)
+                meeting = [node for node in backward_frontier if node in forward]
+
+        if not meeting:
+            return []
+        shortest = min(forward[node][0] + backward[node][0] for node in meeting)
+        paths: List[List[int]] = []
+        for node in meeting:
+            if forward[node][0] + backward[node][0] != shortest:
+                continue
+            for head in self._chains(node, forward, k):
+                for tail in self._chains(node, backward, k):
+                    paths.append(head[::-1] + tail[1:])
+                    if len(paths) >= k:
+                        return paths
+        return paths
@@ -0,0 +1,169 @@
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+from app.db.graph_change_functions import get_graph_version
+from app.models.github_user import GithubUserRepositoryMap
+from app.models.linkedin_user import LinkedinUserOrganizationMap
+
+
+# A shared organization counts more when both people have a known role there
+ROLE_WEIGHT = 1.0
+NO_ROLE_WEIGHT = 0.5
+# Added per calendar year two people were at the same organization at the same time
+TENURE_YEAR_WEIGHT = 0.25
+
+
+class ConnectionScores:
+    """
+    User x feature incidence matrices for one platform. `weighted` is built so that
+    `weighted @ weighted.T` is the pairwise connection strength; `groups` is the binary
+    user x group incidence used for shared-group and mutual-neighbour counts.
+    """
+
+    def __init__(self, usernames: np.ndarray, weighted: sparse.csr_matrix, groups: sparse.csr_matrix):
+        self.usernames = usernames
+        self.user_ids: Dict[str, int] = {username: i for i, username in enumerate(usernames.tolist())}
+        self.weighted = weighted
+        self.weighted_t = weighted.T.tocsr()
+        self.groups = groups
+        self.groups_t = groups.T.tocsr()
+
+    def score(self, seed: str, usernames: Iterable[str]) -> Dict[str, Tuple[float, int, int]]:
+        """
+        Return {username: (strength, shared_groups, mutual_connections)} between `seed` and
+        each of `usernames`, computed as a handful of sparse products over the seed's row.
+        """
+        seed_id = self.user_ids.get(seed)
+        target_ids = np.array([self.user_ids[u] for u in usernames if u in self.user_ids], dtype=np.int64)
+        if seed_id is None or not len(target_ids):
+            return {}
+
+        strength = (self.weighted[seed_id] @ self.weighted_t).toarray().ravel()
+        shared_groups = (self.groups[seed_id] @ self.groups_t).toarray().ravel()
+
+        # Mutual neighbours: people who share a group with both the seed and the target
+        neighbour_ids = np.flatnonzero(shared_groups)
+        neighbour_ids = neighbour_ids[neighbour_ids != seed_id]
+        neighbours_of_neighbours = self.groups[neighbour_ids] @ self.groups_t
+        neighbours_of_neighbours.data[:] = 1
+        mutual = np.asarray(neighbours_of_neighbours.sum(axis=0)).ravel()
+        # A target is not its own mutual connection
+        mutual[neighbour_ids] -= 1
+
+        return {
+            str(self.usernames[i]): (float(strength[i]), int(shared_groups[i]), int(mutual[i]))
+            for i in target_ids
+        }
+
+
+def _intern(keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    return np.unique(np.array(keys, dtype=object).astype(str), return_inverse=True)
+
+
+def build_linkedin_scores(db: Session) -> ConnectionScores:
+    rows = db.query(
+        LinkedinUserOrganizationMap.linkedin_user_username,
+        LinkedinUserOrganizationMap.linkedin_organization_id,
+        LinkedinUserOrganizationMap.role,
+        LinkedinUserOrganizationMap.start_date,
+        LinkedinUserOrganizationMap.end_date,
+    ).all()
+    if not rows:
+        return ConnectionScores(np.array([], dtype=str), sparse.csr_matrix((0, 0)), sparse.csr_matrix((0, 0)))
+
+    usernames, user_idx = _intern([row[0] for row in rows])
+    organizations, org_idx = _intern([row[1] for row in rows])
+    num_users, num_orgs = len(usernames), len(organizations)
+
+    role_weight = np.array([ROLE_WEIGHT if row[2] else NO_ROLE_WEIGHT for row in rows])
+    groups = sparse.csr_matrix((np.ones(len(rows)), (user_idx, org_idx)), shape=(num_users, num_orgs))
+    membership = sparse.csr_matrix((np.sqrt(role_weight), (user_idx, org_idx)), shape=(num_users, num_orgs))
+
+    # One column per (organization, year); overlapping tenure falls out of the product
+    current_year = datetime.utcnow().year
+    start_years = np.array([row[3].year if row[3] else -1 for row in rows])
+    end_years = np.array([row[4].year if row[4] else current_year for row in rows])
+    dated = start_years >= 0
+    span = np.where(dated, np.maximum(end_years - start_years + 1, 1), 0)
+    tenure_rows = np.repeat(np.arange(len(rows)), span)
+    offsets = np.arange(len(tenure_rows)) - np.repeat(np.cumsum(span) - span, span)
+    tenure_years = start_years[tenure_rows] + offsets
+    if len(tenure_rows):
+        min_year = tenure_years.min()
+        num_years = tenure_years.max() - min_year + 1
+        tenure_cols = org_idx[tenure_rows] * num_years + (tenure_years - min_year)
+        tenure_features, tenure_cols = np.unique(tenure_cols, return_inverse=True)
+        tenure = sparse.csr_matrix(
+            (np.full(len(tenure_rows), np.sqrt(TENURE_YEAR_WEIGHT)), (user_idx[tenure_rows], tenure_cols)),
+            shape=(num_users, len(tenure_features)),
+        )
+        weighted = sparse.hstack([membership, tenure], format="csr")
+    else:
+        weighted = membership
+    return ConnectionScores(usernames, weighted, groups)
+
+
+def build_github_scores(db: Session) -> ConnectionScores:
+    rows = db.query(
+        GithubUserRepositoryMap.github_user_username,
+        GithubUserRepositoryMap.repository_path,
+        GithubUserRepositoryMap.num_contributions,
+    ).all()
+    if not rows:
+        return ConnectionScores(np.array([], dtype=str), sparse.csr_matrix((0, 0)), sparse.csr_matrix((0, 0)))
+
+    usernames, user_idx = _intern([row[0] for row in rows])
+    repositories, repo_idx = _intern([row[1] for row in rows])
+    shape = (len(usernames), len(repositories))
+
+    contributions = np.log1p(np.array([row[2] or 0 for row in rows], dtype=np.float64))
+    # Keep a floor so contributors recorded with 0 commits still count as connected
+    weighted = sparse.csr_matrix((np.maximum(contributions, 1.0), (user_idx, repo_idx)), shape=shape)
+    groups = sparse.csr_matrix((np.ones(len(rows)), (user_idx, repo_idx)), shape=shape)
+    return ConnectionScores(usernames, weighted, groups)
+
+
+class ConnectionScorer:
+    def __init__(self, db: Session):
+        # Read before the map tables, so writes made during the build still count as newer
+        self.version = get_graph_version(db)
+        self.built_at = time.monotonic()
+        self.linkedin = build_linkedin_scores(db)
+        self.github = build_github_scores(db)
+
+    def score_accounts(
+        self,
+        accounts: Iterable[Tuple[bool, str]],
+        linkedin_seed: Optional[str],
+        github_seed: Optional[str],
+    ) -> Dict[Tuple[bool, str], dict]:
+        """
+        Return {(is_linkedin, username): fields} with connection_strength (normalized to 0..1
+        over the given accounts), shared_groups and mutual_connections relative to the seeds.
+        """
+        accounts = set(accounts)
+        seeds = {(True, linkedin_seed), (False, github_seed)}
+        scores = {}
+        for is_linkedin, platform, seed in ((True, self.linkedin, linkedin_seed), (False, self.github, github_seed)):
+            if seed is None:
+                continue
+            usernames = {username for account_is_linkedin, username in accounts if account_is_linkedin == is_linkedin}
+            for username, score in platform.score(seed, usernames).items():
+                scores[(is_linkedin, username)] = score
+
+        max_strength = max((score[0] for key, score in scores.items() if key not in seeds), default=0.0)
+        fields = {}
+        for account in accounts:
+            if account in seeds:
+                fields[account] = {"connection_strength": 1.0, "shared_groups": 0, "mutual_connections": 0}
+                continue
+            strength, shared_groups, mutual = scores.get(account, (0.0, 0, 0))
+            fields[account] = {
+                "connection_strength": round(strength / max_strength, 4) if max_strength else 0.0,
+                "shared_groups": shared_groups,
+                "mutual_connections": mutual,
+            }
+        return fields
@@ -3,3 +3,7 @@ from .github_user import GithubUser, GithubUserRepositoryMap
 from .linkedin_user import LinkedinUser, LinkedinUserOrganizationMap
 from .linkedin_organization import LinkedinOrganization
 from .repository import Repository
+from .public_network import PublicNetworkSnapshot, PublicNetworkNode, PublicNetworkLink, PublicNetworkDirtyGroup
+from .graph_change import GraphChange, GraphVersion
+from .search_query_label import SearchQueryLabel
+from .chroma_outbox import ChromaOutbox
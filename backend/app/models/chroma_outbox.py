@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer, DateTime, Text
+from app.db.database import Base
+
+
+class ChromaOutbox(Base):
+    __tablename__ = "chroma_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    collection = Column(String)  # ChromaCollections
+    document_id = Column(String)
+    document = Column(Text)
+    attempts = Column(Integer, default=0)
+    # Rows are relayed once this has passed; pushed back after each failed attempt
+    next_attempt_at = Column(DateTime, index=True)
+    created_at = Column(DateTime)
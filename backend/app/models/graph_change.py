@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from app.db.database import Base
+
+
+class GraphChange(Base):
+    __tablename__ = "graph_changes"
+
+    # Taken from the graph_version counter, so versions follow commit order
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    action = Column(String)  # GraphChangeAction
+    node_type = Column(String)  # GraphNodeType
+    node_id = Column(String)
+    # Set for links: the organization/repository end of a user membership
+    target_type = Column(String, nullable=True)
+    target_id = Column(String, nullable=True)
+    created_at = Column(DateTime)
+
+
+class GraphVersion(Base):
+    __tablename__ = "graph_version"
+
+    # Single row (id 1) holding the latest graph version handed out
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, default=0)
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+from app.db.database import Base
+
+
+class PublicNetworkSnapshot(Base):
+    __tablename__ = "public_network_snapshot"
+
+    id = Column(Integer, primary_key=True)
+    revision = Column(Integer, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+
+class PublicNetworkNode(Base):
+    __tablename__ = "public_network_nodes"
+
+    id = Column(String, primary_key=True, index=True)
+    type = Column(String)
+    data = Column(JSON)  # Node payload, served as-is
+
+
+class PublicNetworkLink(Base):
+    __tablename__ = "public_network_links"
+
+    # Links are undirected and stored once, with source < target
+    source = Column(String, primary_key=True)
+    target = Column(String, primary_key=True, index=True)
+    type = Column(String)
+    weight = Column(Integer, default=1)
+
+
+class PublicNetworkDirtyGroup(Base):
+    __tablename__ = "public_network_dirty_groups"
+
+    id = Column(String, primary_key=True)
+    type = Column(String)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime
+from app.db.database import Base
+
+
+class SearchQueryLabel(Base):
+    __tablename__ = "search_query_labels"
+
+    # Normalized query text
+    query = Column(String(512), primary_key=True)
+    search_type = Column(String)  # SearchType
+    created_at = Column(DateTime)
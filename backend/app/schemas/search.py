@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, Field, model_validator
 
 from app.schemas.linkedin_organization import LinkedinOrganization
 from app.schemas.repository import Repository
 from app.schemas.linkedin_user import LinkedinUser
+from app.utils.enums import SearchType
 
 
 class LinkedinQuerySchema(BaseModel):
@@ -14,3 +16,15 @@ class GeneralQuerySchema(BaseModel):
     linkedin_results: list[LinkedinOrganization]
     linkedin_user_results: list[LinkedinUser]
     github_results: list[Repository]
+
+
+class QueryPlan(BaseModel):
+    search_type: SearchType
+    company_query: str = Field(min_length=1)
+    people_query: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_people_query(self):
+        if self.search_type == SearchType.INDIVIDUAL and not self.people_query:
+            raise ValueError("people_query is required for individual searches")
+        return self
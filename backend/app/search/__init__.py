@@ -0,0 +1,80 @@
+from threading import Lock
+from typing import Optional
+from app.chromadb import get_chroma_collection
+from app.chromadb.chunking import PARENT_ID_KEY, join_chunks
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.linkedin_organization import LinkedinOrganization
+from app.models.repository import Repository
+from app.search.lexical import LexicalIndex
+from app.utils.enums import ChromaCollections
+
+
+BACKFILL_PAGE_SIZE = 1000
+
+_lexical_index: Optional[LexicalIndex] = None
+_lexical_index_lock = Lock()
+
+
+def _backfill(lexical_index: LexicalIndex) -> None:
+    """
+    Index every organization and repository already stored, reassembling READMEs from
+    their Chroma chunks.
+    """
+    db = SessionLocal()
+    try:
+        lexical_index.upsert_organizations(
+            db.query(
+                LinkedinOrganization.linkedin_id,
+                LinkedinOrganization.name,
+                LinkedinOrganization.description,
+                LinkedinOrganization.specialties,
+            ).yield_per(1000)
+        )
+        repositories = db.query(Repository.path, Repository.description).all()
+    finally:
+        db.close()
+
+    readmes = {}
+    paths = [path for path, _ in repositories]
+    for start in range(0, len(paths), BACKFILL_PAGE_SIZE):
+        chroma_result = get_chroma_collection(ChromaCollections.GITHUB_REPOSITORY).get(
+            where={PARENT_ID_KEY: {"$in": paths[start:start + BACKFILL_PAGE_SIZE]}},
+            include=["documents"],
+        )
+        readmes.update(join_chunks(dict(zip(chroma_result["ids"], chroma_result["documents"]))))
+    lexical_index.upsert_repositories(
+        (path, description, readmes.get(path) or "") for path, description in repositories
+    )
+
+
+def get_lexical_index() -> LexicalIndex:
+    """
+    Return the process-wide lexical index, backfilling it from the database until one
+    backfill has completed on its file. Blocking; call from the threadpool.
+    """
+    global _lexical_index
+    if _lexical_index is None:
+        with _lexical_index_lock:
+            if _lexical_index is None:
+                lexical_index = LexicalIndex(settings.LEXICAL_INDEX_PATH)
+                # Upserts are idempotent, so an interrupted backfill simply runs again
+                if not lexical_index.backfilled:
+                    _backfill(lexical_index)
+                    lexical_index.mark_backfilled()
+                _lexical_index = lexical_index
+    return _lexical_index
+
+
+def index_organization(linkedin_id: str, name: Optional[str], description: Optional[str], specialties: Optional[str]) -> None:
+    try:
+        get_lexical_index().upsert_organizations([(linkedin_id, name, description, specialties)])
+    except Exception as e:
+        print(f"Error indexing linkedin organization for lexical search: {e}")
+
+
+def index_repository(path: str, description: Optional[str], readme: Optional[str] = None) -> None:
+    try:
+        get_lexical_index().upsert_repositories([(path, description, readme)])
+    except Exception as e:
+        print(f"Error indexing repository for lexical search: {e}")
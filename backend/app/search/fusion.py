@@ -0,0 +1,16 @@
+from typing import Dict, List, Sequence
+
+
+# Standard RRF damping constant; keeps any single list's top hit from dominating
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], limit: int, k: int = RRF_K) -> List[str]:
+    """
+    Merge ranked id lists by summing 1 / (k + rank) per id. Ties keep first-seen order.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
@@ -0,0 +1,153 @@
+import re
+import sqlite3
+from threading import Lock
+from typing import Iterable, List, Optional, Tuple
+
+
+# Bump to rebuild index files written with an older layout
+SCHEMA_VERSION = 1
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _match_expression(text: str) -> Optional[str]:
+    """
+    FTS5 query matching any term of free text; terms are quoted so user input can't
+    inject FTS syntax.
+    """
+    terms = dict.fromkeys(token.lower() for token in _TOKEN_PATTERN.findall(text))
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+def _name_key(name: Optional[str]) -> str:
+    return " ".join(_TOKEN_PATTERN.findall((name or "").lower()))
+
+
+def _path_text(path: str) -> str:
+    # "groq/groq-python" should match "groq" and "python"
+    return re.sub(r"[/\-_.]", " ", path)
+
+
+class LexicalIndex:
+    """
+    SQLite FTS5 index over organization name/description/specialties and repository
+    path/description/README, ranked with BM25. Blocking; async callers should use the
+    threadpool.
+    """
+
+    def __init__(self, path: str):
+        self._lock = Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            # Older files keyed FTS rows by their UNINDEXED id column; rebuild them
+            self._db.executescript(
+                """
+                DROP TABLE IF EXISTS organizations_fts;
+                DROP TABLE IF EXISTS organization_names;
+                DROP TABLE IF EXISTS repositories_fts;
+                DROP TABLE IF EXISTS repository_rows;
+                DROP TABLE IF EXISTS lexical_meta;
+                """
+            )
+        # FTS5 can only look rows up quickly by rowid, so each id maps to a rowid here
+        self._db.executescript(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS organizations_fts USING fts5(
+                linkedin_id UNINDEXED, name, description, specialties, tokenize = 'porter unicode61'
+            );
+            CREATE TABLE IF NOT EXISTS organization_names (linkedin_id TEXT PRIMARY KEY, name_key TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS organization_names_key ON organization_names (name_key);
+            CREATE VIRTUAL TABLE IF NOT EXISTS repositories_fts USING fts5(
+                path UNINDEXED, path_text, description, readme, tokenize = 'porter unicode61'
+            );
+            CREATE TABLE IF NOT EXISTS repository_rows (path TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS lexical_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            PRAGMA user_version = {SCHEMA_VERSION};
+            """
+        )
+        self._db.commit()
+
+    @property
+    def backfilled(self) -> bool:
+        """
+        Whether a backfill from the database ran to completion on this file.
+        """
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM lexical_meta WHERE key = 'backfilled'").fetchone() is not None
+
+    def mark_backfilled(self) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO lexical_meta (key, value) VALUES ('backfilled', '1')")
+            self._db.commit()
+
+    def upsert_organizations(self, organizations: Iterable[Tuple[str, Optional[str], Optional[str], Optional[str]]]) -> None:
+        """
+        Index (linkedin_id, name, description, specialties) rows, replacing earlier entries.
+        """
+        with self._lock:
+            for linkedin_id, name, description, specialties in organizations:
+                row_id = self._db.execute(
+                    "INSERT INTO organization_names (linkedin_id, name_key) VALUES (?, ?) "
+                    "ON CONFLICT (linkedin_id) DO UPDATE SET name_key = excluded.name_key RETURNING rowid",
+                    (linkedin_id, _name_key(name)),
+                ).fetchone()[0]
+                self._db.execute("DELETE FROM organizations_fts WHERE rowid = ?", (row_id,))
+                self._db.execute(
+                    "INSERT INTO organizations_fts (rowid, linkedin_id, name, description, specialties) VALUES (?, ?, ?, ?, ?)",
+                    (row_id, linkedin_id, name or "", description or "", specialties or ""),
+                )
+            self._db.commit()
+
+    def upsert_repositories(self, repositories: Iterable[Tuple[str, Optional[str], Optional[str]]]) -> None:
+        """
+        Index (path, description, readme) rows, replacing earlier entries. A None readme
+        keeps the one already indexed.
+        """
+        with self._lock:
+            for path, description, readme in repositories:
+                row_id = self._db.execute(
+                    "INSERT INTO repository_rows (path) VALUES (?) "
+                    "ON CONFLICT (path) DO UPDATE SET path = excluded.path RETURNING rowid",
+                    (path,),
+                ).fetchone()[0]
+                if readme is None:
+                    row = self._db.execute("SELECT readme FROM repositories_fts WHERE rowid = ?", (row_id,)).fetchone()
+                    readme = row[0] if row else ""
+                self._db.execute("DELETE FROM repositories_fts WHERE rowid = ?", (row_id,))
+                self._db.execute(
+                    "INSERT INTO repositories_fts (rowid, path, path_text, description, readme) VALUES (?, ?, ?, ?, ?)",
+                    (row_id, path, _path_text(path), description or "", readme),
+                )
+            self._db.commit()
+
+    def _search(self, table: str, id_column: str, text: str, limit: int) -> List[str]:
+        expression = _match_expression(text)
+        if expression is None:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {id_column} FROM {table} WHERE {table} MATCH ? ORDER BY bm25({table}) LIMIT ?",
+                (expression, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def search_organizations(self, text: str, limit: int) -> List[str]:
+        return self._search("organizations_fts", "linkedin_id", text, limit)
+
+    def search_repositories(self, text: str, limit: int) -> List[str]:
+        return self._search("repositories_fts", "path", text, limit)
+
+    def organizations_named(self, text: str) -> List[str]:
+        """
+        Organizations whose name equals the text, ignoring case and punctuation.
+        """
+        name_key = _name_key(text)
+        if not name_key:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT linkedin_id FROM organization_names WHERE name_key = ?", (name_key,)
+            ).fetchall()
+        return [row[0] for row in rows]
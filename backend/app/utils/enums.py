@@ -4,3 +4,26 @@ from enum import Enum
 class ChromaCollections(str, Enum):
     LINKEDIN_ORGANIZATION = "linkedin_organization"
     GITHUB_REPOSITORY = "github_repository"
+
+
+class PublicNetworkNodeType(str, Enum):
+    LINKEDIN_ORGANIZATION = "linkedin_organization"
+    GITHUB_REPOSITORY = "github_repository"
+
+
+class GraphNodeType(str, Enum):
+    LINKEDIN_USER = "linkedin_user"
+    LINKEDIN_ORGANIZATION = "linkedin_organization"
+    GITHUB_USER = "github_user"
+    GITHUB_REPOSITORY = "github_repository"
+
+
+class GraphChangeAction(str, Enum):
+    ADDED = "added"
+    UPDATED = "updated"
+    REMOVED = "removed"
+
+
+class SearchType(str, Enum):
+    COMPANY = "company"
+    INDIVIDUAL = "individual"
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.utils.llm_client import SMALL_MODEL, chat_completion
+
+
+# Expired disk rows are purged once every this many writes
+PURGE_EVERY_WRITES = 256
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def cache_key(user_message: str, model: str, system_message: str, overrides: dict) -> str:
+    prompt_hash = hashlib.sha256(
+        json.dumps([system_message, overrides], sort_keys=True).encode()
+    ).hexdigest()
+    return hashlib.sha256(
+        json.dumps([normalize_query(user_message), model, prompt_hash]).encode()
+    ).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier cache of LLM replies: an in-process LRU in front of a SQLite file, both
+    expiring entries after ttl_seconds. Disk reads and writes are blocking; async
+    callers should run them in the threadpool.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def _remember(self, key: str, expires_at: float, value: str) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_from_memory(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry[1]
+
+    def get_from_disk(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[1], row[0])
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at)
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY_WRITES == 0:
+                self._db.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMResponseCache(
+                    settings.LLM_CACHE_PATH,
+                    settings.LLM_CACHE_MAX_ENTRIES,
+                    settings.LLM_CACHE_TTL_SECONDS,
+                )
+    return _cache
+
+
+async def cached_chat_completion(system_message: str, user_message: str, model: str = SMALL_MODEL, **overrides) -> str:
+    """
+    chat_completion for deterministic stages: runs at temperature 0 and reuses replies
+    for the same normalized user message, model and prompt.
+    """
+    overrides["temperature"] = 0
+    key = cache_key(user_message, model, system_message, overrides)
+    cache = get_llm_cache()
+    reply = cache.get_from_memory(key)
+    if reply is None:
+        reply = await run_in_threadpool(cache.get_from_disk, key)
+    if reply is None:
+        reply = await chat_completion(system_message, user_message, model=model, **overrides)
+        await run_in_threadpool(cache.set, key, reply)
+    return reply
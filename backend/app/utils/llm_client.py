@@ -0,0 +1,112 @@
+import asyncio
+import random
+from typing import Dict, Optional
+import aiohttp
+from app.core.config import settings
+
+
+HYPERBOLIC_CHAT_URL = "https://api.hyperbolic.xyz/v1/chat/completions"
+
+SMALL_MODEL = "meta-llama/Meta-Llama-3.1-8B-Instruct"
+LARGE_MODEL = "meta-llama/Meta-Llama-3-70B-Instruct"
+
+# Request body defaults per model; call sites override individual fields
+MODEL_SETTINGS: Dict[str, dict] = {
+    SMALL_MODEL: {"max_tokens": 2048, "temperature": 0.7, "top_p": 0.9, "timeout": 30},
+    LARGE_MODEL: {"max_tokens": 2048, "temperature": 0.7, "top_p": 0.9, "timeout": 60},
+}
+
+MAX_CONCURRENT_REQUESTS = 8
+MAX_CONNECTIONS = 16
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session: Optional[aiohttp.ClientSession] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class LLMError(Exception):
+    pass
+
+
+def _client() -> tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+    """
+    Lazily create the pooled session and concurrency limit for the running event loop.
+    Both are bound to a loop, so a new loop (e.g. a uagents process) gets its own.
+    """
+    global _session, _semaphore, _loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _loop is not loop:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS, keepalive_timeout=30),
+            headers={"Content-Type": "application/json"},
+        )
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        _loop = loop
+    return _session, _semaphore
+
+
+async def close_llm_client() -> None:
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _backoff(attempt: int, retry_after: Optional[str]) -> float:
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    # Full jitter so concurrent retries do not hit the API in lockstep
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+async def chat_completion(system_message: str, user_message: str, model: str = SMALL_MODEL, **overrides) -> str:
+    """
+    Send a system + user chat to Hyperbolic and return the reply text. Retries 429s, 5xx
+    responses and connection errors with jittered exponential backoff.
+    """
+    request_settings = {**MODEL_SETTINGS.get(model, MODEL_SETTINGS[SMALL_MODEL]), **overrides}
+    timeout = aiohttp.ClientTimeout(total=request_settings.pop("timeout"), connect=5)
+    data = {
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_message},
+        ],
+        "model": model,
+        **{key: value for key, value in request_settings.items() if value is not None},
+    }
+    headers = {"Authorization": f"Bearer {settings.HYPERBOLIC_API_KEY}"}
+
+    session, semaphore = _client()
+    for attempt in range(MAX_ATTEMPTS):
+        retry_after = None
+        try:
+            async with semaphore:
+                async with session.post(HYPERBOLIC_CHAT_URL, headers=headers, json=data, timeout=timeout) as response:
+                    if response.status not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        try:
+                            result = await response.json()
+                            content = result['choices'][0]['message']['content']
+                        except (ValueError, KeyError, IndexError, TypeError) as e:
+                            raise LLMError(f"Hyperbolic returned a malformed reply for {model}") from e
+                        if not isinstance(content, str):
+                            raise LLMError(f"Hyperbolic returned no reply text for {model}")
+                        return content
+                    retry_after = response.headers.get("Retry-After")
+                    print(f"Hyperbolic returned {response.status} for {model}, attempt {attempt + 1}/{MAX_ATTEMPTS}")
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            print(f"Hyperbolic request failed for {model}, attempt {attempt + 1}/{MAX_ATTEMPTS}: {e!r}")
+        except aiohttp.ClientResponseError as e:
+            raise LLMError(f"Hyperbolic returned {e.status} for {model}") from e
+
+        if attempt + 1 < MAX_ATTEMPTS:
+            await asyncio.sleep(_backoff(attempt, retry_after))
+
+    raise LLMError(f"Hyperbolic request for {model} failed after {MAX_ATTEMPTS} attempts")
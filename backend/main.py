@@ -1,9 +1,15 @@
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import auth, github, linkedin, network
 from app.db.database import create_tables
 from app.core.config import settings
 from app.api.routes.search import router as search_router
+from app.utils.llm_client import close_llm_client
+from app.chromadb import close_chroma, init_chroma
+from app.chromadb.ingestion import get_chroma_relay
+from app.db.public_network_functions import get_public_network_refresher
+from app.agents.local_classifier import get_local_classifier
 
 app = FastAPI()
 
@@ -24,6 +30,21 @@ app.include_router(search_router)
 @app.on_event("startup")
 async def startup_event():
     create_tables()
+    init_chroma()
+    get_chroma_relay().start()
+    # Build or catch up the snapshot before serving, then keep it current in the background
+    await run_in_threadpool(get_public_network_refresher().refresh)
+    get_public_network_refresher().start()
+    if settings.LOCAL_QUERY_CLASSIFIER:
+        await run_in_threadpool(get_local_classifier)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_llm_client()
+    get_chroma_relay().stop()
+    get_public_network_refresher().stop()
+    close_chroma()
 
 
 @app.get("/")
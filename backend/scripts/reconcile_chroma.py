@@ -0,0 +1,22 @@
+from app.chromadb.ingestion import get_chroma_relay
+from app.chromadb.reconcile import reconcile_chroma
+from app.db.session import SessionLocal
+
+
+def main():
+    db = SessionLocal()
+    try:
+        report = reconcile_chroma(db)
+    finally:
+        db.close()
+    for collection, counts in report.items():
+        print(
+            f"{collection}: {counts['sql']} in SQL, {counts['chroma']} in chroma, "
+            f"{counts['added']} added, {counts['deleted']} deleted"
+        )
+    relay = get_chroma_relay()
+    print(f"relayed: {relay.embedded_count} embedded, {relay.skipped_count} skipped unchanged")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+
+# Settings, engines and index paths are read when app modules are imported, so point them
+# at a scratch directory before anything from app is loaded
+_TEST_DIR = tempfile.mkdtemp(prefix="nebulink-tests-")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+os.environ["LEXICAL_INDEX_PATH"] = os.path.join(_TEST_DIR, "search_index.db")
+os.environ["LLM_CACHE_PATH"] = os.path.join(_TEST_DIR, "llm_cache.db")
+os.environ["LINKEDIN_PASSWORD_ENCRYPTION_KEY"] = "x" * 43 + "="
+os.environ["HYPERBOLIC_API_KEY"] = "test-key"
+
+import pytest  # noqa: E402
+import app.models  # noqa: E402,F401 registers every table on Base
+from app.db.database import Base, engine  # noqa: E402
+from app.db.session import SessionLocal  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """
+    A session on a freshly created SQLite database.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+class GraphBuilder:
+    """
+    Adds registered users, accounts, organizations, repositories and memberships straight
+    to the tables, creating whatever a row refers to. Nothing is logged as a graph change.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def user(self, user_id, linkedin=None, github=None):
+        self.db.merge(app.models.User(id=user_id, email=f"user{user_id}@example.com", password="x"))
+        if linkedin:
+            self.db.merge(app.models.LinkedinUser(username=linkedin, name=linkedin, user_id=user_id))
+        if github:
+            self.db.merge(app.models.GithubUser(username=github, name=github, user_id=user_id))
+        self.db.flush()
+
+    def linkedin_member(self, username, linkedin_id, role="Engineer"):
+        if self.db.get(app.models.LinkedinUser, username) is None:
+            self.db.add(app.models.LinkedinUser(username=username, name=username))
+        if self.db.get(app.models.LinkedinOrganization, linkedin_id) is None:
+            self.db.add(app.models.LinkedinOrganization(linkedin_id=linkedin_id, name=linkedin_id))
+        self.db.merge(app.models.LinkedinUserOrganizationMap(
+            linkedin_user_username=username, linkedin_organization_id=linkedin_id, role=role
+        ))
+        self.db.flush()
+
+    def github_contributor(self, username, path, num_contributions=1):
+        if self.db.get(app.models.GithubUser, username) is None:
+            self.db.add(app.models.GithubUser(username=username, name=username))
+        if self.db.get(app.models.Repository, path) is None:
+            self.db.add(app.models.Repository(path=path, description=path))
+        self.db.merge(app.models.GithubUserRepositoryMap(
+            github_user_username=username, repository_path=path, num_contributions=num_contributions
+        ))
+        self.db.flush()
+
+
+@pytest.fixture
+def graph(db):
+    return GraphBuilder(db)
+
+
+class FakeChromaCollection:
+    """
+    In-memory stand-in for a Chroma collection, covering the calls the app makes: get by
+    ids or by a metadata filter, upsert, delete, count and query by embedding.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.metadatas = {}
+        self.embeddings = {}
+        self.upserted = []
+
+    @staticmethod
+    def _matches(metadata, where):
+        for key, condition in where.items():
+            value = (metadata or {}).get(key)
+            if isinstance(condition, dict) and "$in" in condition:
+                if value not in condition["$in"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        if ids is None:
+            ids = [id for id in self.documents if where is None or self._matches(self.metadatas.get(id), where)]
+        ids = [id for id in ids if id in self.documents][offset:None if limit is None else offset + limit]
+        return {
+            "ids": ids,
+            "documents": [self.documents[id] for id in ids],
+            "metadatas": [self.metadatas.get(id) for id in ids],
+        }
+
+    def upsert(self, ids, documents, metadatas=None, embeddings=None):
+        self.upserted.append(list(ids))
+        for index, id in enumerate(ids):
+            self.documents[id] = documents[index]
+            self.metadatas[id] = metadatas[index] if metadatas else None
+            if embeddings is not None:
+                self.embeddings[id] = embeddings[index]
+
+    def add(self, ids, documents, metadatas=None):
+        self.upsert(ids, documents, metadatas)
+
+    def delete(self, ids):
+        for id in ids:
+            self.documents.pop(id, None)
+            self.metadatas.pop(id, None)
+            self.embeddings.pop(id, None)
+
+    def count(self):
+        return len(self.documents)
+
+
+@pytest.fixture
+def chroma(monkeypatch):
+    """
+    Replace every Chroma collection with a FakeChromaCollection, keyed by collection.
+    """
+    import app.chromadb
+    from app.utils.enums import ChromaCollections
+
+    collections = {collection: FakeChromaCollection() for collection in ChromaCollections}
+    monkeypatch.setattr(app.chromadb, "_collections", dict(collections))
+    monkeypatch.setattr(app.chromadb, "_counts", {})
+    return collections
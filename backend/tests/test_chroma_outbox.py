@@ -0,0 +1,121 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+import app.chromadb.reconcile as reconcile
+import app.db.repository_functions as repository_functions
+import app.search
+from app.chromadb.ingestion import ChromaOutboxRelay, record_chroma_document
+from app.core.config import settings
+from app.db.linkedin_organization_functions import create_linkedin_organization, organization_document
+from app.db.repository_functions import create_repository
+from app.models import LinkedinOrganization, Repository
+from app.models.chroma_outbox import ChromaOutbox
+from app.schemas.linkedin_organization import LinkedinOrganization as LinkedinOrganizationSchema
+from app.schemas.repository import Repository as RepositorySchema
+from app.utils.enums import ChromaCollections
+
+
+ORGANIZATIONS = ChromaCollections.LINKEDIN_ORGANIZATION
+REPOSITORIES = ChromaCollections.GITHUB_REPOSITORY
+
+
+@pytest.fixture(autouse=True)
+def lexical_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_PATH", str(tmp_path / "search_index.db"))
+    monkeypatch.setattr(app.search, "_lexical_index", None)
+
+
+@pytest.fixture
+def readmes(monkeypatch):
+    readmes = {}
+    monkeypatch.setattr(repository_functions, "get_readme_by_path", lambda path, token: readmes.get(path, ""))
+    monkeypatch.setattr(reconcile, "get_readme_by_path", lambda path, token: readmes.get(path, ""))
+    return readmes
+
+
+def _outbox(db):
+    db.expire_all()
+    return [(row.collection, row.document_id) for row in db.scalars(select(ChromaOutbox).order_by(ChromaOutbox.id))]
+
+
+def test_created_organizations_are_written_to_the_outbox(db, chroma):
+    organization = LinkedinOrganizationSchema(linkedin_id="globex", name="Globex", description="Biotech")
+
+    create_linkedin_organization(organization, db)
+
+    assert _outbox(db) == [(ORGANIZATIONS.value, "globex")]
+    assert chroma[ORGANIZATIONS].documents == {}
+    ChromaOutboxRelay().flush()
+    assert chroma[ORGANIZATIONS].documents == {"globex": organization_document(organization)}
+    assert _outbox(db) == []
+
+
+def test_created_repositories_are_written_to_the_outbox(db, chroma, readmes):
+    readmes["acme/anvil"] = "falling weights"
+
+    create_repository(RepositorySchema(path="acme/anvil", description="Anvil"), None, db)
+    ChromaOutboxRelay().flush()
+
+    assert chroma[REPOSITORIES].documents == {"acme/anvil#0": "falling weights"}
+
+
+def test_rolled_back_entities_leave_no_outbox_row(db, chroma):
+    db.add(LinkedinOrganization(linkedin_id="globex", name="Globex"))
+    record_chroma_document(ORGANIZATIONS, "globex", "Globex", db)
+    db.rollback()
+
+    assert _outbox(db) == []
+    assert db.get(LinkedinOrganization, "globex") is None
+
+
+def test_failed_creates_leave_no_outbox_row(db, chroma):
+    create_linkedin_organization(LinkedinOrganizationSchema(linkedin_id="globex", name="Globex"), db)
+    ChromaOutboxRelay().flush()
+
+    with pytest.raises(IntegrityError):
+        create_linkedin_organization(LinkedinOrganizationSchema(linkedin_id="globex", name="Duplicate"), db)
+    db.rollback()
+
+    assert _outbox(db) == []
+    assert chroma[ORGANIZATIONS].documents["globex"] == "Organization name: Globex\n"
+
+
+def test_rows_survive_a_chroma_outage(db, chroma, monkeypatch):
+    create_linkedin_organization(LinkedinOrganizationSchema(linkedin_id="globex", name="Globex"), db)
+    monkeypatch.setattr(chroma[ORGANIZATIONS], "upsert", lambda *args, **kwargs: 1 / 0)
+
+    ChromaOutboxRelay().flush()
+
+    assert _outbox(db) == [(ORGANIZATIONS.value, "globex")]
+    assert db.get(LinkedinOrganization, "globex") is not None
+
+
+def test_reconcile_adds_missing_and_deletes_orphaned_documents(db, chroma, readmes):
+    db.add_all([
+        LinkedinOrganization(linkedin_id="globex", name="Globex"),
+        LinkedinOrganization(linkedin_id="initech", name="Initech"),
+        Repository(path="acme/anvil"),
+    ])
+    db.commit()
+    readmes["acme/anvil"] = "falling weights"
+    chroma[ORGANIZATIONS].upsert(ids=["initech", "gone"], documents=["Initech", "Gone"])
+    # A whole README stored before chunking, and the chunk of a deleted repository
+    chroma[REPOSITORIES].upsert(ids=["acme/anvil", "acme/gone#0"], documents=["old", "gone"])
+
+    report = reconcile.reconcile_chroma(db)
+
+    assert report[ORGANIZATIONS.value] == {"sql": 2, "chroma": 2, "added": 1, "deleted": 1}
+    assert report[REPOSITORIES.value] == {"sql": 1, "chroma": 1, "added": 1, "deleted": 2}
+    assert sorted(chroma[ORGANIZATIONS].documents) == ["globex", "initech"]
+    assert chroma[REPOSITORIES].documents == {"acme/anvil#0": "falling weights"}
+    assert _outbox(db) == []
+
+
+def test_reconcile_leaves_pending_documents_to_the_relay(db, chroma, monkeypatch):
+    create_linkedin_organization(LinkedinOrganizationSchema(linkedin_id="globex", name="Globex"), db)
+    monkeypatch.setattr(reconcile, "get_chroma_relay", lambda: ChromaOutboxRelay())
+
+    report = reconcile.reconcile_chroma(db)
+
+    assert report[ORGANIZATIONS.value]["added"] == 0
+    assert chroma[ORGANIZATIONS].upserted == [["globex"]]
@@ -0,0 +1,158 @@
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+import app.chromadb.ingestion as ingestion
+from app.chromadb.ingestion import ChromaOutboxRelay, record_chroma_document
+from app.models.chroma_outbox import ChromaOutbox
+from app.utils.enums import ChromaCollections
+
+
+ORGANIZATIONS = ChromaCollections.LINKEDIN_ORGANIZATION
+
+
+def _record(db, documents, collection=ORGANIZATIONS):
+    for id, document in documents:
+        record_chroma_document(collection, id, document, db)
+    db.commit()
+
+
+def _outbox(db):
+    db.expire_all()
+    return db.scalars(select(ChromaOutbox).order_by(ChromaOutbox.id)).all()
+
+
+def test_flush_upserts_in_batches(db, chroma):
+    _record(db, [(f"org{i}", f"document {i}") for i in range(5)])
+
+    ChromaOutboxRelay(batch_size=2).flush()
+
+    assert chroma[ORGANIZATIONS].upserted == [["org0", "org1"], ["org2", "org3"], ["org4"]]
+    assert chroma[ORGANIZATIONS].documents["org3"] == "document 3"
+    assert _outbox(db) == []
+
+
+def test_later_rows_for_an_id_win(db, chroma):
+    _record(db, [("org", "first"), ("org", "second")])
+    _record(db, [("org", "third")])
+
+    ChromaOutboxRelay().flush()
+
+    assert chroma[ORGANIZATIONS].upserted == [["org"]]
+    assert chroma[ORGANIZATIONS].documents["org"] == "third"
+
+
+def test_collections_are_written_separately(db, chroma):
+    _record(db, [("org", "an organization")])
+    _record(db, [("owner/repo", "a readme")], ChromaCollections.GITHUB_REPOSITORY)
+
+    ChromaOutboxRelay().flush()
+
+    assert chroma[ORGANIZATIONS].documents == {"org": "an organization"}
+    assert chroma[ChromaCollections.GITHUB_REPOSITORY].documents == {"owner/repo#0": "a readme"}
+
+
+def test_failed_rows_are_retried_with_backoff(db, chroma, monkeypatch):
+    _record(db, [("org", "document")])
+    upsert = chroma[ORGANIZATIONS].upsert
+
+    def failing_upsert(*args, **kwargs):
+        raise ConnectionError("chroma is down")
+
+    monkeypatch.setattr(chroma[ORGANIZATIONS], "upsert", failing_upsert)
+    relay = ChromaOutboxRelay()
+    before = datetime.utcnow()
+    relay.flush()
+
+    [row] = _outbox(db)
+    assert row.attempts == 1
+    delay = ingestion.RETRY_BASE_SECONDS * 2
+    assert before + timedelta(seconds=delay / 2) <= row.next_attempt_at <= datetime.utcnow() + timedelta(seconds=delay)
+
+    # Not due yet, so a second flush leaves it alone even with Chroma back
+    monkeypatch.setattr(chroma[ORGANIZATIONS], "upsert", upsert)
+    relay.flush()
+    assert _outbox(db)[0].attempts == 1
+    assert chroma[ORGANIZATIONS].documents == {}
+
+    row.next_attempt_at = datetime.utcnow()
+    db.commit()
+    relay.flush()
+    assert _outbox(db) == []
+    assert chroma[ORGANIZATIONS].documents == {"org": "document"}
+
+
+def test_backoff_is_capped(db, chroma, monkeypatch):
+    _record(db, [("org", "document")])
+    db.execute(ChromaOutbox.__table__.update().values(attempts=40))
+    db.commit()
+    monkeypatch.setattr(chroma[ORGANIZATIONS], "upsert", lambda *args, **kwargs: 1 / 0)
+
+    ChromaOutboxRelay().flush()
+
+    [row] = _outbox(db)
+    assert row.attempts == 41
+    assert row.next_attempt_at <= datetime.utcnow() + timedelta(seconds=ingestion.RETRY_MAX_SECONDS)
+
+
+def test_one_failing_collection_does_not_hold_back_another(db, chroma, monkeypatch):
+    _record(db, [("org", "an organization")])
+    _record(db, [("owner/repo", "a readme")], ChromaCollections.GITHUB_REPOSITORY)
+    monkeypatch.setattr(chroma[ChromaCollections.GITHUB_REPOSITORY], "upsert", lambda *args, **kwargs: 1 / 0)
+
+    ChromaOutboxRelay().flush()
+
+    assert chroma[ORGANIZATIONS].documents == {"org": "an organization"}
+    assert [row.collection for row in _outbox(db)] == [ChromaCollections.GITHUB_REPOSITORY.value]
+
+
+def test_background_thread_writes_after_notify(db, chroma, monkeypatch):
+    monkeypatch.setattr(ingestion, "RELAY_POLL_SECONDS", 60.0)
+    relay = ChromaOutboxRelay(batch_size=2, max_delay_seconds=60.0)
+    written = threading.Event()
+    upsert = chroma[ORGANIZATIONS].upsert
+
+    def recording_upsert(*args, **kwargs):
+        upsert(*args, **kwargs)
+        written.set()
+
+    monkeypatch.setattr(chroma[ORGANIZATIONS], "upsert", recording_upsert)
+    relay.start()
+    try:
+        # The thread starts its batching delay on the first row; completing the batch
+        # ends the delay early
+        _record(db, [("org0", "zero")])
+        relay.notify()
+        time.sleep(0.2)
+        assert not written.is_set()
+        _record(db, [("org1", "one")])
+        relay.notify()
+        assert written.wait(5)
+        assert chroma[ORGANIZATIONS].upserted == [["org0", "org1"]]
+    finally:
+        started = time.monotonic()
+        relay.stop()
+    assert time.monotonic() - started < 5
+
+
+def test_stop_flushes_what_is_left(db, chroma, monkeypatch):
+    monkeypatch.setattr(ingestion, "RELAY_POLL_SECONDS", 60.0)
+    relay = ChromaOutboxRelay(max_delay_seconds=60.0)
+    relay.start()
+    _record(db, [("org", "document")])
+    relay.notify()
+
+    relay.stop()
+
+    assert chroma[ORGANIZATIONS].documents == {"org": "document"}
+    assert _outbox(db) == []
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 64])
+def test_flush_drains_every_due_row(db, chroma, batch_size):
+    _record(db, [(f"org{i}", f"document {i}") for i in range(7)])
+
+    ChromaOutboxRelay(batch_size=batch_size).flush()
+
+    assert sorted(chroma[ORGANIZATIONS].documents) == [f"org{i}" for i in range(7)]
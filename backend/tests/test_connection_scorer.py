@@ -0,0 +1,132 @@
+import threading
+from datetime import datetime
+import numpy as np
+import pytest
+import app.graph
+from app.core.config import settings
+from app.db.graph_change_functions import get_graph_version
+from app.db.linkedin_organization_functions import add_user_to_organization
+from app.graph import get_connection_scorer
+from app.graph.scoring import ConnectionScorer
+from app.models import LinkedinUserOrganizationMap
+
+
+def _join_rebuilds():
+    for thread in threading.enumerate():
+        if thread.name == "connection-scorer-rebuild":
+            thread.join(5)
+
+
+@pytest.fixture
+def members(db, graph):
+    graph.linkedin_member("alice", "acme")
+    graph.linkedin_member("bob", "acme")
+    graph.linkedin_member("bob", "globex", role=None)
+    graph.linkedin_member("carol", "globex")
+    graph.linkedin_member("dave", "initech")
+    graph.github_contributor("alice-gh", "acme/anvil", 10)
+    graph.github_contributor("bob-gh", "acme/anvil", 0)
+    db.commit()
+
+
+@pytest.fixture
+def fresh_scorer(monkeypatch):
+    monkeypatch.setattr(app.graph, "_connection_scorer", None)
+    monkeypatch.setattr(app.graph, "_connection_scorer_rebuilding", False)
+    yield
+    _join_rebuilds()
+
+
+def test_scores_relative_to_the_seeds(db, members):
+    scorer = ConnectionScorer(db)
+    accounts = [(True, "alice"), (True, "bob"), (True, "carol"), (True, "dave")]
+
+    fields = scorer.score_accounts(accounts, "alice", None)
+
+    assert fields[(True, "alice")] == {"connection_strength": 1.0, "shared_groups": 0, "mutual_connections": 0}
+    assert fields[(True, "bob")] == {"connection_strength": 1.0, "shared_groups": 1, "mutual_connections": 0}
+    # carol shares nothing with alice but knows bob, who does
+    assert fields[(True, "carol")] == {"connection_strength": 0.0, "shared_groups": 0, "mutual_connections": 1}
+    assert fields[(True, "dave")] == {"connection_strength": 0.0, "shared_groups": 0, "mutual_connections": 0}
+
+
+def test_strength_is_normalized_across_platforms(db, members):
+    scorer = ConnectionScorer(db)
+
+    fields = scorer.score_accounts([(True, "bob"), (False, "bob-gh")], "alice", "alice-gh")
+
+    # Ten commits outweigh one shared organization; zero commits still count as one
+    assert fields[(False, "bob-gh")] == {"connection_strength": 1.0, "shared_groups": 1, "mutual_connections": 0}
+    assert fields[(True, "bob")]["connection_strength"] == round(1 / np.log1p(10), 4)
+
+
+def test_overlapping_tenure_adds_strength(db, graph):
+    graph.linkedin_member("alice", "acme")
+    graph.linkedin_member("bob", "acme")
+    graph.linkedin_member("carol", "acme")
+    for username, start in (("alice", 2015), ("bob", 2016), ("carol", 2021)):
+        db.query(LinkedinUserOrganizationMap).filter_by(linkedin_user_username=username).update(
+            {"start_date": datetime(start, 1, 1), "end_date": datetime(2020, 1, 1) if username != "carol" else None}
+        )
+    db.commit()
+
+    fields = ConnectionScorer(db).score_accounts([(True, "alice"), (True, "bob"), (True, "carol")], "alice", None)
+
+    assert fields[(True, "bob")]["connection_strength"] == 1.0
+    assert 0 < fields[(True, "carol")]["connection_strength"] < 1.0
+
+
+def test_no_seeds_score_nothing(db, members):
+    fields = ConnectionScorer(db).score_accounts([(True, "bob")], None, None)
+
+    assert fields == {(True, "bob"): {"connection_strength": 0.0, "shared_groups": 0, "mutual_connections": 0}}
+
+
+def test_rebuilds_in_the_background_after_writes(db, members, fresh_scorer, monkeypatch):
+    monkeypatch.setattr(settings, "CONNECTION_SCORER_REBUILD_SECONDS", 0.0)
+    scorer = get_connection_scorer(db)
+    assert get_connection_scorer(db) is scorer
+
+    add_user_to_organization("initech", "alice", "Engineer", None, None, db)
+    # The stale scorer keeps being served while the new one builds
+    assert get_connection_scorer(db) is scorer
+    _join_rebuilds()
+
+    rebuilt = get_connection_scorer(db)
+    assert rebuilt is not scorer
+    assert rebuilt.version == get_graph_version(db)
+    assert rebuilt.score_accounts([(True, "dave")], "alice", None)[(True, "dave")]["shared_groups"] == 1
+
+
+def test_rebuilds_wait_for_the_debounce_interval(db, members, fresh_scorer, monkeypatch):
+    monkeypatch.setattr(settings, "CONNECTION_SCORER_REBUILD_SECONDS", 3600.0)
+    scorer = get_connection_scorer(db)
+
+    add_user_to_organization("initech", "alice", "Engineer", None, None, db)
+    get_connection_scorer(db)
+    _join_rebuilds()
+
+    assert get_connection_scorer(db) is scorer
+
+
+def test_one_rebuild_runs_at_a_time(db, members, fresh_scorer, monkeypatch):
+    monkeypatch.setattr(settings, "CONNECTION_SCORER_REBUILD_SECONDS", 0.0)
+    get_connection_scorer(db)
+    add_user_to_organization("initech", "alice", "Engineer", None, None, db)
+    release = threading.Event()
+    builds = []
+    original = app.graph.ConnectionScorer
+
+    def slow_scorer(session):
+        builds.append(1)
+        release.wait(5)
+        return original(session)
+
+    monkeypatch.setattr(app.graph, "ConnectionScorer", slow_scorer)
+    for _ in range(5):
+        get_connection_scorer(db)
+    release.set()
+    _join_rebuilds()
+
+    assert builds == [1]
+    assert not app.graph._connection_scorer_rebuilding
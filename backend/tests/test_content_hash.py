@@ -0,0 +1,75 @@
+from app.chromadb.chunking import CHUNK_MAX_CHARS, PARENT_ID_KEY
+from app.chromadb.ingestion import CONTENT_HASH_KEY, ChromaOutboxRelay, content_hash, record_chroma_document
+from app.utils.enums import ChromaCollections
+
+
+ORGANIZATIONS = ChromaCollections.LINKEDIN_ORGANIZATION
+REPOSITORIES = ChromaCollections.GITHUB_REPOSITORY
+
+
+def _relay(db, relay, documents, collection=ORGANIZATIONS):
+    for id, document in documents:
+        record_chroma_document(collection, id, document, db)
+    db.commit()
+    relay.flush()
+
+
+def test_unchanged_documents_are_not_upserted_again(db, chroma):
+    relay = ChromaOutboxRelay()
+    _relay(db, relay, [("org0", "zero"), ("org1", "one")])
+    _relay(db, relay, [("org0", "zero"), ("org1", "one, edited")])
+
+    assert chroma[ORGANIZATIONS].upserted == [["org0", "org1"], ["org1"]]
+    assert (relay.embedded_count, relay.skipped_count) == (3, 1)
+    assert chroma[ORGANIZATIONS].metadatas["org1"] == {CONTENT_HASH_KEY: content_hash("one, edited")}
+
+
+def test_all_unchanged_batch_makes_no_upsert(db, chroma):
+    relay = ChromaOutboxRelay()
+    _relay(db, relay, [("org", "same")])
+    _relay(db, relay, [("org", "same")])
+
+    assert chroma[ORGANIZATIONS].upserted == [["org"]]
+    assert relay.skipped_count == 1
+
+
+def test_documents_stored_without_a_hash_are_reembedded(db, chroma):
+    # Written before hashes were stored
+    chroma[ORGANIZATIONS].upsert(ids=["org"], documents=["same"])
+    relay = ChromaOutboxRelay()
+
+    _relay(db, relay, [("org", "same")])
+
+    assert chroma[ORGANIZATIONS].upserted[-1] == ["org"]
+    assert chroma[ORGANIZATIONS].metadatas["org"] == {CONTENT_HASH_KEY: content_hash("same")}
+
+
+def test_chunks_are_compared_one_by_one(db, chroma):
+    # Paragraphs this long are never packed together, so each is one chunk
+    first, second, edited, third = (letter * (CHUNK_MAX_CHARS - 10) for letter in "abBc")
+    relay = ChromaOutboxRelay()
+    _relay(db, relay, [("owner/repo", f"{first}\n\n{second}\n\n{third}")], REPOSITORIES)
+    _relay(db, relay, [("owner/repo", f"{first}\n\n{edited}\n\n{third}")], REPOSITORIES)
+
+    assert chroma[REPOSITORIES].upserted == [["owner/repo#0", "owner/repo#1", "owner/repo#2"], ["owner/repo#1"]]
+    assert (relay.embedded_count, relay.skipped_count) == (4, 2)
+    assert chroma[REPOSITORIES].documents["owner/repo#1"] == edited
+
+
+def test_shrunk_documents_drop_their_extra_chunks(db, chroma):
+    relay = ChromaOutboxRelay()
+    _relay(db, relay, [("owner/repo", "a" * (CHUNK_MAX_CHARS * 3))], REPOSITORIES)
+    _relay(db, relay, [("owner/repo", "a" * CHUNK_MAX_CHARS)], REPOSITORIES)
+
+    assert sorted(chroma[REPOSITORIES].documents) == ["owner/repo#0"]
+    assert relay.skipped_count == 1
+
+
+def test_whole_documents_from_before_chunking_are_replaced(db, chroma):
+    chroma[REPOSITORIES].upsert(ids=["owner/repo"], documents=["readme"])
+    relay = ChromaOutboxRelay()
+
+    _relay(db, relay, [("owner/repo", "readme")], REPOSITORIES)
+
+    assert chroma[REPOSITORIES].documents == {"owner/repo#0": "readme"}
+    assert chroma[REPOSITORIES].metadatas["owner/repo#0"][PARENT_ID_KEY] == "owner/repo"
@@ -0,0 +1,30 @@
+from app.search.fusion import RRF_K, reciprocal_rank_fusion
+
+
+def test_sums_reciprocal_ranks_across_lists():
+    # "b" is second in both lists and beats "a" and "c", which top only one list each
+    fused = reciprocal_rank_fusion([["a", "b", "d"], ["c", "b"]], limit=10)
+
+    assert fused == ["b", "a", "c", "d"]
+
+
+def test_scores_use_the_damping_constant():
+    # With k = 0 a first place scores 1 and a second place 1/2, so two second places tie
+    # with one first place (the first seen wins) and three beat it
+    assert reciprocal_rank_fusion([["a", "b"], ["c", "b"]], limit=1, k=0) == ["a"]
+    assert reciprocal_rank_fusion([["a", "b"], ["c", "b"], ["d", "b"]], limit=1, k=0) == ["b"]
+    assert RRF_K == 60
+
+
+def test_ties_keep_first_seen_order():
+    assert reciprocal_rank_fusion([["x"], ["y"], ["z"]], limit=10) == ["x", "y", "z"]
+
+
+def test_limit_and_empty_rankings():
+    assert reciprocal_rank_fusion([["a", "b", "c"]], limit=2) == ["a", "b"]
+    assert reciprocal_rank_fusion([[], []], limit=5) == []
+    assert reciprocal_rank_fusion([], limit=5) == []
+
+
+def test_duplicates_across_lists_are_returned_once():
+    assert reciprocal_rank_fusion([["a", "b"], ["b", "a"], ["a"]], limit=10) == ["a", "b"]
@@ -0,0 +1,87 @@
+import pytest
+import app.graph
+import app.graph.index
+from app.db.graph_change_functions import get_graph_version, record_account_owner_change, record_membership_change
+from app.db.linkedin_organization_functions import add_user_to_organization
+from app.db.repository_functions import add_user_to_repository
+from app.db.session import SessionLocal
+from app.graph import get_graph_index
+from app.models import LinkedinUserOrganizationMap
+from app.utils.enums import GraphChangeAction, GraphNodeType
+
+
+@pytest.fixture
+def index(db, graph, monkeypatch):
+    monkeypatch.setattr(app.graph, "_graph_index", None)
+    graph.linkedin_member("alice", "acme")
+    graph.linkedin_member("bob", "globex")
+    graph.github_contributor("alice-gh", "acme/anvil")
+    db.commit()
+    return get_graph_index(db)
+
+
+@pytest.fixture
+def other_session():
+    """
+    A separate session, standing in for a write made by another process.
+    """
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_unchanged_version_serves_the_same_index(db, index):
+    assert get_graph_index(db) is index
+    assert index.linkedin.groups_of("alice") == ["acme"]
+    assert index.github.users_of("acme/anvil") == ["alice-gh"]
+
+
+def test_memberships_written_elsewhere_are_caught_up(db, index, other_session):
+    add_user_to_organization("globex", "alice", "Engineer", None, None, other_session)
+    add_user_to_repository("acme/anvil", "alice-gh", 3, other_session)
+
+    caught_up = get_graph_index(db)
+
+    assert caught_up is index
+    assert caught_up.version == get_graph_version(db)
+    assert sorted(caught_up.linkedin.groups_of("alice")) == ["acme", "globex"]
+    assert sorted(caught_up.linkedin.users_of("globex")) == ["alice", "bob"]
+    # An updated membership replays as the edge it already has
+    assert caught_up.github.users_of("acme/anvil") == ["alice-gh"]
+
+
+def test_removed_memberships_reload_the_index(db, index, other_session):
+    other_session.query(LinkedinUserOrganizationMap).filter_by(linkedin_user_username="alice").delete()
+    record_membership_change(
+        GraphChangeAction.REMOVED, GraphNodeType.LINKEDIN_USER, "alice", GraphNodeType.LINKEDIN_ORGANIZATION, "acme", other_session
+    )
+    other_session.commit()
+
+    reloaded = get_graph_index(db)
+
+    assert reloaded is not index
+    assert reloaded.linkedin.groups_of("alice") == []
+    assert reloaded.version == get_graph_version(db)
+
+
+def test_identity_links_do_not_reload_the_index(db, graph, index, other_session):
+    graph.user(1, linkedin="alice", github="alice-gh")
+    db.commit()
+    record_account_owner_change(GraphNodeType.GITHUB_USER, "alice-gh", 1, None, other_session)
+    other_session.commit()
+
+    assert get_graph_index(db) is index
+    assert index.version == get_graph_version(db)
+
+
+def test_a_long_backlog_reloads_the_index(db, index, other_session, monkeypatch):
+    monkeypatch.setattr(app.graph.index, "MAX_REPLAYED_CHANGES", 1)
+    add_user_to_organization("globex", "alice", None, None, None, other_session)
+    add_user_to_organization("acme", "bob", None, None, None, other_session)
+
+    reloaded = get_graph_index(db)
+
+    assert reloaded is not index
+    assert sorted(reloaded.linkedin.users_of("acme")) == ["alice", "bob"]
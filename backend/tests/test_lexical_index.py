@@ -0,0 +1,186 @@
+import sqlite3
+import pytest
+import app.search
+from app.chromadb.chunking import CHUNK_INDEX_KEY, PARENT_ID_KEY
+from app.core.config import settings
+from app.models import LinkedinOrganization, Repository
+from app.search import get_lexical_index
+from app.search.lexical import SCHEMA_VERSION, LexicalIndex
+from app.utils.enums import ChromaCollections
+
+
+@pytest.fixture
+def index(tmp_path):
+    return LexicalIndex(str(tmp_path / "index.db"))
+
+
+def _row_counts(index):
+    return {
+        table: index._db.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        for table in ("organizations_fts", "organization_names", "repositories_fts", "repository_rows")
+    }
+
+
+def test_ranks_organizations_by_bm25(index):
+    index.upsert_organizations([
+        ("acme", "Acme", "Rockets and anvils", "rockets"),
+        ("globex", "Globex", "Biotech protein design", "biotech, protein folding"),
+        ("initech", "Initech", "Software for banks", None),
+    ])
+
+    assert index.search_organizations("protein biotech startups", 5) == ["globex"]
+    assert index.search_organizations("rockets", 5) == ["acme"]
+    # Porter stemming matches inflections
+    assert index.search_organizations("bank", 5) == ["initech"]
+
+
+def test_upserts_replace_earlier_entries(index):
+    index.upsert_organizations([("acme", "Acme", "Rockets", None)])
+    index.upsert_organizations([("acme", "Acme Corp", "Anvils", None)])
+
+    assert index.search_organizations("rockets", 5) == []
+    assert index.search_organizations("anvils", 5) == ["acme"]
+    assert index.organizations_named("acme corp") == ["acme"]
+    assert index.organizations_named("acme") == []
+    assert _row_counts(index)["organizations_fts"] == _row_counts(index)["organization_names"] == 1
+
+
+def test_rows_stay_keyed_by_rowid_across_many_upserts(index):
+    for round in range(3):
+        index.upsert_organizations((f"org{i}", f"Org {i}", f"round{round} org", None) for i in range(50))
+        index.upsert_repositories((f"owner/repo{i}", f"round{round} repo", None) for i in range(50))
+
+    assert _row_counts(index) == {"organizations_fts": 50, "organization_names": 50, "repositories_fts": 50, "repository_rows": 50}
+    assert index.search_organizations("round1", 100) == []
+    assert len(index.search_organizations("round2", 100)) == 50
+    # Each FTS row shares its rowid with the side table entry for the same id
+    mismatched = index._db.execute(
+        "SELECT count(*) FROM organizations_fts f JOIN organization_names n ON n.rowid = f.rowid WHERE n.linkedin_id != f.linkedin_id"
+    ).fetchone()[0]
+    assert mismatched == 0
+
+
+def test_organizations_named_ignores_case_and_punctuation(index):
+    index.upsert_organizations([("groq", "Groq, Inc.", "LPU inference", None), ("other", "Groq Labs", None, None)])
+
+    assert index.organizations_named("groq inc") == ["groq"]
+    assert index.organizations_named("GROQ   INC!") == ["groq"]
+    assert index.organizations_named("   ") == []
+
+
+def test_repository_paths_and_readmes_are_searchable(index):
+    index.upsert_repositories([
+        ("groq/groq-python", "Client library", "Install with pip"),
+        ("acme/anvil", "Anvil physics", None),
+    ])
+
+    assert index.search_repositories("python", 5) == ["groq/groq-python"]
+    assert index.search_repositories("pip", 5) == ["groq/groq-python"]
+    assert index.search_repositories("anvil", 5) == ["acme/anvil"]
+
+
+def test_none_readme_keeps_the_indexed_readme(index):
+    index.upsert_repositories([("acme/anvil", "Anvil", "falling weights")])
+    index.upsert_repositories([("acme/anvil", "Anvil physics engine", None)])
+
+    assert index.search_repositories("weights", 5) == ["acme/anvil"]
+    assert index.search_repositories("engine", 5) == ["acme/anvil"]
+    index.upsert_repositories([("acme/anvil", "Anvil physics engine", "")])
+    assert index.search_repositories("weights", 5) == []
+
+
+def test_query_text_cannot_inject_fts_syntax(index):
+    index.upsert_organizations([("acme", "Acme", "near rockets", None)])
+
+    assert index.search_organizations('NEAR(" rockets AND OR * -', 5) == ["acme"]
+    assert index.search_organizations("", 5) == []
+    assert index.search_organizations("!!!", 5) == []
+
+
+def test_older_files_are_rebuilt(tmp_path):
+    path = str(tmp_path / "index.db")
+    old = sqlite3.connect(path)
+    old.executescript(
+        """
+        CREATE VIRTUAL TABLE organizations_fts USING fts5(linkedin_id UNINDEXED, name, description, specialties);
+        INSERT INTO organizations_fts VALUES ('stale', 'Stale', 'left over', '');
+        CREATE TABLE lexical_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        INSERT INTO lexical_meta VALUES ('backfilled', '1');
+        """
+    )
+    old.commit()
+    old.close()
+
+    index = LexicalIndex(path)
+
+    assert index._db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert index.search_organizations("left over", 5) == []
+    assert not index.backfilled
+
+
+def test_backfill_marker(index):
+    assert not index.backfilled
+    index.mark_backfilled()
+    assert index.backfilled
+
+
+@pytest.fixture
+def lexical_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "LEXICAL_INDEX_PATH", str(tmp_path / "search_index.db"))
+    monkeypatch.setattr(app.search, "_lexical_index", None)
+    return settings
+
+
+def _seed(db, chroma):
+    db.add(LinkedinOrganization(linkedin_id="globex", name="Globex", description="Biotech protein design"))
+    db.add(Repository(path="acme/anvil", description="Anvil"))
+    db.commit()
+    repositories = chroma[ChromaCollections.GITHUB_REPOSITORY]
+    repositories.upsert(
+        ids=["acme/anvil#1", "acme/anvil#0"],
+        documents=["second chunk mentions gravity", "first chunk mentions weights"],
+        metadatas=[{PARENT_ID_KEY: "acme/anvil", CHUNK_INDEX_KEY: 1}, {PARENT_ID_KEY: "acme/anvil", CHUNK_INDEX_KEY: 0}],
+    )
+
+
+def test_backfills_from_the_database_and_chroma_chunks(db, chroma, lexical_settings):
+    _seed(db, chroma)
+
+    index = get_lexical_index()
+
+    assert index.backfilled
+    assert index.search_organizations("protein", 5) == ["globex"]
+    assert index.search_repositories("weights", 5) == index.search_repositories("gravity", 5) == ["acme/anvil"]
+    readme = index._db.execute("SELECT readme FROM repositories_fts").fetchone()[0]
+    assert readme == "first chunk mentions weights\n\nsecond chunk mentions gravity"
+
+
+def test_interrupted_backfill_runs_again(db, chroma, lexical_settings, monkeypatch):
+    _seed(db, chroma)
+
+    def interrupted(lexical_index):
+        lexical_index.upsert_organizations([("globex", "Globex", "partial", None)])
+        raise RuntimeError("killed")
+
+    original = app.search._backfill
+    monkeypatch.setattr(app.search, "_backfill", interrupted)
+    with pytest.raises(RuntimeError):
+        get_lexical_index()
+    assert app.search._lexical_index is None
+    assert not LexicalIndex(settings.LEXICAL_INDEX_PATH).backfilled
+
+    monkeypatch.setattr(app.search, "_backfill", original)
+    index = get_lexical_index()
+
+    assert index.backfilled
+    assert index.search_repositories("gravity", 5) == ["acme/anvil"]
+
+
+def test_completed_backfill_is_not_repeated(db, chroma, lexical_settings, monkeypatch):
+    _seed(db, chroma)
+    get_lexical_index()
+
+    monkeypatch.setattr(app.search, "_lexical_index", None)
+    monkeypatch.setattr(app.search, "_backfill", lambda lexical_index: pytest.fail("backfilled twice"))
+
+    assert get_lexical_index().search_organizations("protein", 5) == ["globex"]
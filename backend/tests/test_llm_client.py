@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from app.utils import llm_client
+from app.utils.llm_client import LARGE_MODEL, LLMError, SMALL_MODEL, _backoff, chat_completion
+
+
+def _reply(content):
+    return lambda: web.json_response({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+
+def _status(status, headers=None):
+    return lambda: web.json_response({"error": "nope"}, status=status, headers=headers)
+
+
+class FakeHyperbolic:
+    """
+    Stands in for the Hyperbolic chat endpoint, answering with the given replies in order
+    (the last one repeats) and recording every request.
+    """
+
+    def __init__(self, *replies, delay=0.0):
+        self.replies = list(replies)
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request):
+        self.requests.append((request.headers.get("Authorization"), await request.json()))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+            return reply()
+        finally:
+            self.in_flight -= 1
+
+
+def _run(monkeypatch, fake, call):
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", fake.handle)
+        server = TestServer(app)
+        await server.start_server()
+        monkeypatch.setattr(llm_client, "HYPERBOLIC_CHAT_URL", str(server.make_url("/v1/chat/completions")))
+        try:
+            return await call()
+        finally:
+            await llm_client.close_llm_client()
+            await server.close()
+    return asyncio.run(scenario())
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_client, "_backoff", lambda attempt, retry_after: 0)
+
+
+def test_returns_the_reply_text(monkeypatch):
+    fake = FakeHyperbolic(_reply("biotech protein"))
+
+    reply = _run(monkeypatch, fake, lambda: chat_completion("system", "user", model=LARGE_MODEL, max_tokens=50))
+
+    assert reply == "biotech protein"
+    authorization, body = fake.requests[0]
+    assert authorization == "Bearer test-key"
+    assert body["model"] == LARGE_MODEL
+    assert body["messages"] == [{"role": "system", "content": "system"}, {"role": "user", "content": "user"}]
+    assert body["max_tokens"] == 50
+    assert body["temperature"] == llm_client.MODEL_SETTINGS[LARGE_MODEL]["temperature"]
+    assert "timeout" not in body
+
+
+@pytest.mark.parametrize("status", sorted(llm_client.RETRY_STATUSES))
+def test_retries_retryable_statuses(monkeypatch, status):
+    fake = FakeHyperbolic(_status(status), _status(status), _reply("ok"))
+
+    assert _run(monkeypatch, fake, lambda: chat_completion("system", "user")) == "ok"
+    assert len(fake.requests) == 3
+
+
+def test_gives_up_after_max_attempts(monkeypatch):
+    fake = FakeHyperbolic(_status(503))
+
+    with pytest.raises(LLMError, match="failed after"):
+        _run(monkeypatch, fake, lambda: chat_completion("system", "user"))
+    assert len(fake.requests) == llm_client.MAX_ATTEMPTS
+
+
+def test_client_errors_are_not_retried(monkeypatch):
+    fake = FakeHyperbolic(_status(400), _reply("unreachable"))
+
+    with pytest.raises(LLMError, match="returned 400"):
+        _run(monkeypatch, fake, lambda: chat_completion("system", "user"))
+    assert len(fake.requests) == 1
+
+
+@pytest.mark.parametrize("reply", [
+    lambda: web.Response(text="not json", content_type="application/json"),
+    lambda: web.json_response({"error": "no choices"}),
+    lambda: web.json_response({"choices": []}),
+    lambda: web.json_response({"choices": [{"message": {"content": None}}]}),
+    lambda: web.json_response(["unexpected"]),
+])
+def test_malformed_replies_raise_llm_error(monkeypatch, reply):
+    fake = FakeHyperbolic(reply)
+
+    with pytest.raises(LLMError):
+        _run(monkeypatch, fake, lambda: chat_completion("system", "user"))
+    assert len(fake.requests) == 1
+
+
+def test_connection_errors_are_retried(monkeypatch):
+    async def call():
+        # Nothing listens on the port once the server is gone
+        server = TestServer(web.Application())
+        await server.start_server()
+        url = str(server.make_url("/v1/chat/completions"))
+        await server.close()
+        monkeypatch.setattr(llm_client, "HYPERBOLIC_CHAT_URL", url)
+        return await chat_completion("system", "user")
+
+    attempts = []
+    monkeypatch.setattr(llm_client, "_backoff", lambda attempt, retry_after: attempts.append(attempt) or 0)
+    with pytest.raises(LLMError, match="failed after"):
+        _run(monkeypatch, FakeHyperbolic(_reply("unused")), call)
+    assert attempts == list(range(llm_client.MAX_ATTEMPTS - 1))
+
+
+def test_limits_concurrent_requests(monkeypatch):
+    fake = FakeHyperbolic(_reply("ok"), delay=0.05)
+
+    async def call():
+        return await asyncio.gather(*(chat_completion("system", f"user {i}") for i in range(20)))
+
+    assert _run(monkeypatch, fake, call) == ["ok"] * 20
+    assert fake.max_in_flight == llm_client.MAX_CONCURRENT_REQUESTS
+
+
+def test_backoff_honours_retry_after_up_to_the_cap():
+    assert _backoff(0, "2") == 2.0
+    assert _backoff(0, "600") == llm_client.BACKOFF_MAX_SECONDS
+    for attempt in range(6):
+        delay = _backoff(attempt, "soon")
+        assert 0 <= delay <= min(llm_client.BACKOFF_MAX_SECONDS, llm_client.BACKOFF_BASE_SECONDS * 2 ** attempt)
+
+
+def test_unknown_models_use_the_small_model_settings(monkeypatch):
+    fake = FakeHyperbolic(_reply("ok"))
+
+    _run(monkeypatch, fake, lambda: chat_completion("system", "user", model="other/model"))
+
+    assert fake.requests[0][1]["max_tokens"] == llm_client.MODEL_SETTINGS[SMALL_MODEL]["max_tokens"]
@@ -0,0 +1,180 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes import network
+from app.api.routes.network import _reachability_may_have_changed
+from app.db.graph_change_functions import get_graph_version, record_account_owner_change, record_graph_change
+from app.db.linkedin_organization_functions import add_user_to_organization
+from app.db.user_functions import get_current_user_async
+from app.models import GithubUser, User
+from app.utils.enums import GraphChangeAction, GraphNodeType
+
+
+ADDED, UPDATED, REMOVED = GraphChangeAction.ADDED, GraphChangeAction.UPDATED, GraphChangeAction.REMOVED
+LINKEDIN_USER, LINKEDIN_ORGANIZATION = GraphNodeType.LINKEDIN_USER, GraphNodeType.LINKEDIN_ORGANIZATION
+GITHUB_USER = GraphNodeType.GITHUB_USER
+
+
+def _reachable(**nodes):
+    reachable = {node_type: {} for node_type in GraphNodeType}
+    for node_type, hops in nodes.items():
+        reachable[GraphNodeType(node_type)] = hops
+    return reachable
+
+
+REACHABLE = _reachable(
+    linkedin_user={"me": 0, "bob": 2},
+    linkedin_organization={"acme": 1},
+    github_user={"me-gh": 0},
+)
+
+
+def _membership(username, linkedin_id):
+    return (LINKEDIN_USER, username, LINKEDIN_ORGANIZATION, linkedin_id)
+
+
+@pytest.mark.parametrize("link, actions, expected", [
+    # Crossable ends: the traversal can walk the new or removed membership
+    (_membership("me", "globex"), [ADDED, ADDED], True),
+    (_membership("nobody", "acme"), [ADDED, ADDED], True),
+    (_membership("me", "acme"), [REMOVED, REMOVED], True),
+    # bob sits at the depth boundary, so his new organization is not traversed
+    (_membership("bob", "globex"), [ADDED, ADDED], False),
+    (_membership("dave", "initech"), [ADDED, ADDED], False),
+    # Updates and links that were added then removed again move nobody
+    (_membership("me", "acme"), [UPDATED, UPDATED], False),
+    (_membership("me", "globex"), [ADDED, REMOVED], False),
+    # Identity links cost no hops, so either end being reached matters
+    ((LINKEDIN_USER, "bob", GITHUB_USER, "bob-gh"), [ADDED, ADDED], True),
+    ((LINKEDIN_USER, "dave", GITHUB_USER, "me-gh"), [REMOVED, REMOVED], True),
+    ((LINKEDIN_USER, "dave", GITHUB_USER, "dave-gh"), [ADDED, ADDED], False),
+])
+def test_reachability_for_link_changes(link, actions, expected):
+    assert _reachability_may_have_changed({}, {link: actions}, REACHABLE, depth=2) is expected
+
+
+@pytest.mark.parametrize("actions, expected", [
+    ([REMOVED, REMOVED], True),
+    ([UPDATED, REMOVED], True),
+    ([ADDED, REMOVED], False),
+    ([ADDED, ADDED], False),
+    ([UPDATED, UPDATED], False),
+])
+def test_reachability_for_node_changes(actions, expected):
+    node_actions = {(LINKEDIN_USER, "stranger"): actions}
+    assert _reachability_may_have_changed(node_actions, {}, REACHABLE, depth=2) is expected
+
+
+@pytest.fixture
+def client(db, graph):
+    """
+    me -> acme -> bob, with bob also at globex; dave at initech is outside the network.
+    """
+    graph.user(1, linkedin="me")
+    graph.linkedin_member("me", "acme")
+    graph.linkedin_member("bob", "acme")
+    graph.linkedin_member("bob", "globex")
+    graph.linkedin_member("dave", "initech")
+    db.commit()
+
+    app = FastAPI()
+    app.include_router(network.router, prefix="/api")
+    app.dependency_overrides[get_current_user_async] = lambda: User(id=1)
+    return TestClient(app)
+
+
+def _changes(client, since, **params):
+    response = client.get("/api/network/changes", params={"since": since, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_no_changes(db, client):
+    assert _changes(client, 0) == {
+        "version": 0,
+        "since": 0,
+        "reset": False,
+        "nodes": {"added": [], "updated": [], "removed": []},
+        "links": {"added": [], "updated": [], "removed": []},
+    }
+
+
+def test_profile_update_in_the_network_is_a_delta(db, client):
+    record_graph_change(UPDATED, LINKEDIN_USER, "bob", db)
+    record_graph_change(UPDATED, LINKEDIN_USER, "dave", db)
+    db.commit()
+
+    changes = _changes(client, 0)
+
+    assert changes["reset"] is False
+    assert changes["version"] == get_graph_version(db) == 2
+    assert [(node["id"], node["data"]["username"]) for node in changes["nodes"]["updated"]] == [("bob", "bob")]
+    assert changes["nodes"]["added"] == changes["nodes"]["removed"] == []
+
+
+def test_changes_at_or_before_since_are_skipped(db, client):
+    record_graph_change(UPDATED, LINKEDIN_USER, "bob", db)
+    db.commit()
+
+    changes = _changes(client, 1)
+
+    assert changes["version"] == 1
+    assert changes["nodes"]["updated"] == []
+
+
+def test_boundary_membership_sends_the_link_and_its_group(db, client):
+    add_user_to_organization("initech", "bob", "Engineer", None, None, db)
+
+    changes = _changes(client, 0)
+
+    assert changes["reset"] is False
+    assert changes["links"]["added"] == [{
+        "source_type": "linkedin_user", "source": "bob", "target_type": "linkedin_organization", "target": "initech",
+    }]
+    assert [(node["type"], node["id"]) for node in changes["nodes"]["added"]] == [("linkedin_organization", "initech")]
+
+
+def test_membership_near_the_root_resets(db, client):
+    add_user_to_organization("globex", "me", "Engineer", None, None, db)
+
+    assert _changes(client, 0)["reset"] is True
+    # With more depth the same membership is crossable from bob's side too
+    assert _changes(client, 0, depth=3)["reset"] is True
+
+
+def test_membership_outside_the_network_is_ignored(db, client):
+    add_user_to_organization("globex", "dave", "Engineer", None, None, db)
+
+    changes = _changes(client, 0)
+
+    assert changes["reset"] is False
+    assert changes["links"]["added"] == []
+    assert changes["nodes"]["added"] == []
+
+
+def test_identity_link_in_the_network_resets(db, client, graph):
+    graph.user(2)
+    db.add(GithubUser(username="bob-gh", name="bob-gh"))
+    db.commit()
+    record_account_owner_change(GITHUB_USER, "bob-gh", None, 1, db)
+    db.get(GithubUser, "bob-gh").user_id = 1
+    db.commit()
+
+    assert _changes(client, 0)["reset"] is True
+
+
+def test_removed_node_resets(db, client):
+    record_graph_change(REMOVED, LINKEDIN_USER, "someone", db)
+    db.commit()
+
+    assert _changes(client, 0)["reset"] is True
+
+
+def test_too_many_changes_resets(db, client, monkeypatch):
+    monkeypatch.setattr(network, "MAX_NETWORK_CHANGES", 2)
+    for _ in range(3):
+        record_graph_change(UPDATED, LINKEDIN_USER, "bob", db)
+    db.commit()
+
+    assert _changes(client, 0) == {"version": 3, "since": 0, "reset": True}
+    assert _changes(client, 1)["reset"] is False
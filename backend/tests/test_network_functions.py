@@ -0,0 +1,127 @@
+import asyncio
+import random
+from collections import deque
+import pytest
+from app.db.network_functions import get_reachable_network, get_reachable_network_async
+from app.db.session import AsyncSessionLocal
+from app.utils.enums import GraphNodeType
+
+
+LINKEDIN_USER, LINKEDIN_ORGANIZATION = GraphNodeType.LINKEDIN_USER, GraphNodeType.LINKEDIN_ORGANIZATION
+GITHUB_USER, GITHUB_REPOSITORY = GraphNodeType.GITHUB_USER, GraphNodeType.GITHUB_REPOSITORY
+
+
+def _flatten(reachable):
+    return {(node_type, node_id): hops for node_type, nodes in reachable.items() for node_id, hops in nodes.items()}
+
+
+def _reference_hops(seeds, linkedin_edges, github_edges, account_owners, depth):
+    """
+    BFS where memberships cost one hop and accounts of the same registered user cost none.
+    """
+    neighbours = {}
+    for edges, user_type, group_type in ((linkedin_edges, LINKEDIN_USER, LINKEDIN_ORGANIZATION), (github_edges, GITHUB_USER, GITHUB_REPOSITORY)):
+        for user, group in edges:
+            neighbours.setdefault((user_type, user), set()).add((group_type, group))
+            neighbours.setdefault((group_type, group), set()).add((user_type, user))
+    owner_accounts = {}
+    for account, user_id in account_owners.items():
+        owner_accounts.setdefault(user_id, []).append(account)
+
+    hops = {seed: 0 for seed in seeds}
+    queue = deque(seeds)
+    while queue:
+        node = queue.popleft()
+        free = [account for account in owner_accounts.get(account_owners.get(node), []) if account != node]
+        for neighbour, cost in [(account, 0) for account in free] + [(neighbour, 1) for neighbour in neighbours.get(node, ())]:
+            distance = hops[node] + cost
+            if distance <= depth and distance < hops.get(neighbour, depth + 1):
+                hops[neighbour] = distance
+                # Zero-cost moves go to the front so nodes are settled in hop order
+                queue.appendleft(neighbour) if cost == 0 else queue.append(neighbour)
+    return hops
+
+
+@pytest.fixture
+def chain(db, graph):
+    """
+    me -> acme -> bob -> globex -> carol -> initech -> dave, with bob's GitHub account on a
+    repository shared with erin.
+    """
+    graph.user(1, linkedin="me")
+    graph.user(2, linkedin="bob", github="bob-gh")
+    for user, organization in [("me", "acme"), ("bob", "acme"), ("bob", "globex"), ("carol", "globex"), ("carol", "initech"), ("dave", "initech")]:
+        graph.linkedin_member(user, organization)
+    graph.github_contributor("bob-gh", "org/repo")
+    graph.github_contributor("erin-gh", "org/repo")
+    db.commit()
+
+
+EXPECTED_CHAIN_HOPS = {
+    (LINKEDIN_USER, "me"): 0,
+    (LINKEDIN_ORGANIZATION, "acme"): 1,
+    (LINKEDIN_USER, "bob"): 2,
+    (GITHUB_USER, "bob-gh"): 2,
+    (LINKEDIN_ORGANIZATION, "globex"): 3,
+    (GITHUB_REPOSITORY, "org/repo"): 3,
+    (LINKEDIN_USER, "carol"): 4,
+    (GITHUB_USER, "erin-gh"): 4,
+    (LINKEDIN_ORGANIZATION, "initech"): 5,
+}
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_hop_counts_along_a_chain(db, chain, depth):
+    expected = {node: hops for node, hops in EXPECTED_CHAIN_HOPS.items() if hops <= depth}
+
+    assert _flatten(get_reachable_network(1, depth, db)) == expected
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_async_query_matches_sync(db, chain, depth):
+    async def reachable():
+        async with AsyncSessionLocal() as async_db:
+            return await get_reachable_network_async(1, depth, async_db)
+
+    assert asyncio.run(reachable()) == get_reachable_network(1, depth, db)
+
+
+def test_keeps_the_smallest_hop_count_over_cycles(db, graph):
+    graph.user(1, linkedin="me")
+    for user, organization in [("me", "acme"), ("bob", "acme"), ("bob", "globex"), ("me", "globex")]:
+        graph.linkedin_member(user, organization)
+    db.commit()
+
+    assert _flatten(get_reachable_network(1, 4, db)) == {
+        (LINKEDIN_USER, "me"): 0,
+        (LINKEDIN_ORGANIZATION, "acme"): 1,
+        (LINKEDIN_ORGANIZATION, "globex"): 1,
+        (LINKEDIN_USER, "bob"): 2,
+    }
+
+
+def test_unknown_user_reaches_nothing(db, chain):
+    assert _flatten(get_reachable_network(99, 4, db)) == {}
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_hop_counts_match_bfs_on_a_random_graph(db, graph, depth):
+    rng = random.Random(depth)
+    linkedin_edges = {(f"l{rng.randrange(30)}", f"o{rng.randrange(10)}") for _ in range(45)}
+    github_edges = {(f"g{rng.randrange(30)}", f"r{rng.randrange(10)}") for _ in range(45)}
+    for user, organization in linkedin_edges:
+        graph.linkedin_member(user, organization)
+    for user, repository in github_edges:
+        graph.github_contributor(user, repository)
+    account_owners = {}
+    indexes = rng.sample(range(30), 6)
+    for user_id, index in enumerate(indexes, start=1):
+        graph.user(user_id, linkedin=f"l{index}", github=f"g{index}")
+        account_owners[(LINKEDIN_USER, f"l{index}")] = account_owners[(GITHUB_USER, f"g{index}")] = user_id
+    db.commit()
+
+    seeds = [(LINKEDIN_USER, f"l{indexes[0]}"), (GITHUB_USER, f"g{indexes[0]}")]
+    expected = _reference_hops(seeds, linkedin_edges, github_edges, account_owners, depth)
+    assert len(expected) > len(seeds)
+
+    assert _flatten(get_reachable_network(1, depth, db)) == expected
@@ -0,0 +1,140 @@
+import random
+from collections import deque
+from app.graph.index import GraphIndex
+from app.graph.paths import IntroductionPathFinder
+from app.utils.enums import GraphNodeType
+
+
+def _graph_index(linkedin_edges=(), github_edges=()) -> GraphIndex:
+    graph_index = GraphIndex()
+    graph_index.linkedin.add_edges(linkedin_edges)
+    graph_index.github.add_edges(github_edges)
+    return graph_index
+
+
+def _describe(path_finder, path):
+    return [path_finder.describe(node) for node in path]
+
+
+def _shortest_length(graph_index, account_links, source, target):
+    """
+    Plain single-source BFS over the same graph, as the reference for path lengths.
+    """
+    neighbours = {}
+    for adjacency, user_type, group_type in (
+        (graph_index.linkedin, GraphNodeType.LINKEDIN_USER, GraphNodeType.LINKEDIN_ORGANIZATION),
+        (graph_index.github, GraphNodeType.GITHUB_USER, GraphNodeType.GITHUB_REPOSITORY),
+    ):
+        for user in adjacency.user_keys:
+            for group in adjacency.groups_of(user):
+                neighbours.setdefault((user_type, user), set()).add((group_type, group))
+                neighbours.setdefault((group_type, group), set()).add((user_type, user))
+    for linkedin_username, github_username in account_links:
+        linkedin, github = (GraphNodeType.LINKEDIN_USER, linkedin_username), (GraphNodeType.GITHUB_USER, github_username)
+        neighbours.setdefault(linkedin, set()).add(github)
+        neighbours.setdefault(github, set()).add(linkedin)
+
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbour in neighbours.get(node, ()):
+            if neighbour not in distances:
+                distances[neighbour] = distances[node] + 1
+                queue.append(neighbour)
+    return distances.get(target)
+
+
+def test_finds_shortest_path_through_shared_organizations():
+    graph_index = _graph_index([("alice", "acme"), ("bob", "acme"), ("bob", "globex"), ("carol", "globex"), ("alice", "initech")])
+    path_finder = IntroductionPathFinder(graph_index, [], max_fanout=100)
+    source = path_finder.node(GraphNodeType.LINKEDIN_USER, "alice")
+    target = path_finder.node(GraphNodeType.LINKEDIN_USER, "carol")
+
+    paths = path_finder.find([source], [target], max_depth=6, k=3)
+
+    assert [_describe(path_finder, path) for path in paths] == [[
+        (GraphNodeType.LINKEDIN_USER, "alice"),
+        (GraphNodeType.LINKEDIN_ORGANIZATION, "acme"),
+        (GraphNodeType.LINKEDIN_USER, "bob"),
+        (GraphNodeType.LINKEDIN_ORGANIZATION, "globex"),
+        (GraphNodeType.LINKEDIN_USER, "carol"),
+    ]]
+
+
+def test_crosses_platforms_through_linked_accounts():
+    graph_index = _graph_index(
+        linkedin_edges=[("alice", "acme"), ("bob", "acme")],
+        github_edges=[("bob-gh", "org/repo"), ("dave-gh", "org/repo")],
+    )
+    path_finder = IntroductionPathFinder(graph_index, [("bob", "bob-gh")], max_fanout=100)
+    source = path_finder.node(GraphNodeType.LINKEDIN_USER, "alice")
+    target = path_finder.node(GraphNodeType.GITHUB_USER, "dave-gh")
+
+    paths = path_finder.find([source], [target], max_depth=6, k=1)
+
+    assert [node_id for _, node_id in _describe(path_finder, paths[0])] == ["alice", "acme", "bob", "bob-gh", "org/repo", "dave-gh"]
+
+
+def test_returns_every_shortest_path_up_to_k():
+    graph_index = _graph_index([("alice", "acme"), ("alice", "globex"), ("carol", "acme"), ("carol", "globex")])
+    path_finder = IntroductionPathFinder(graph_index, [], max_fanout=100)
+    source = path_finder.node(GraphNodeType.LINKEDIN_USER, "alice")
+    target = path_finder.node(GraphNodeType.LINKEDIN_USER, "carol")
+
+    paths = path_finder.find([source], [target], max_depth=6, k=5)
+    assert sorted(_describe(path_finder, path)[1][1] for path in paths) == ["acme", "globex"]
+    assert len(path_finder.find([source], [target], max_depth=6, k=1)) == 1
+
+
+def test_stops_at_max_depth():
+    graph_index = _graph_index([("alice", "acme"), ("bob", "acme"), ("bob", "globex"), ("carol", "globex")])
+    path_finder = IntroductionPathFinder(graph_index, [], max_fanout=100)
+    source = path_finder.node(GraphNodeType.LINKEDIN_USER, "alice")
+    target = path_finder.node(GraphNodeType.LINKEDIN_USER, "carol")
+
+    assert path_finder.find([source], [target], max_depth=3, k=1) == []
+    assert len(path_finder.find([source], [target], max_depth=4, k=1)[0]) == 5
+
+
+def test_source_that_is_the_target():
+    graph_index = _graph_index([("alice", "acme")])
+    path_finder = IntroductionPathFinder(graph_index, [], max_fanout=100)
+    source = path_finder.node(GraphNodeType.LINKEDIN_USER, "alice")
+
+    assert path_finder.find([source], [source], max_depth=4, k=1) == [[source]]
+
+
+def test_unconnected_users_have_no_path():
+    graph_index = _graph_index([("alice", "acme"), ("carol", "globex")])
+    path_finder = IntroductionPathFinder(graph_index, [], max_fanout=100)
+    source = path_finder.node(GraphNodeType.LINKEDIN_USER, "alice")
+    target = path_finder.node(GraphNodeType.LINKEDIN_USER, "carol")
+
+    assert path_finder.find([source], [target], max_depth=10, k=1) == []
+
+
+def test_lengths_match_single_source_bfs_on_random_graphs():
+    rng = random.Random(7)
+    for _ in range(20):
+        linkedin_edges = [(f"l{rng.randrange(40)}", f"o{rng.randrange(15)}") for _ in range(60)]
+        github_edges = [(f"g{rng.randrange(40)}", f"r{rng.randrange(15)}") for _ in range(60)]
+        account_links = [(f"l{i}", f"g{i}") for i in rng.sample(range(40), 8)]
+        graph_index = _graph_index(linkedin_edges, github_edges)
+        path_finder = IntroductionPathFinder(graph_index, account_links, max_fanout=1000)
+
+        for _ in range(10):
+            source = (GraphNodeType.LINKEDIN_USER, rng.choice(graph_index.linkedin.user_keys))
+            target = (GraphNodeType.GITHUB_USER, rng.choice(graph_index.github.user_keys))
+            paths = path_finder.find([path_finder.node(*source)], [path_finder.node(*target)], max_depth=8, k=3)
+
+            expected = _shortest_length(graph_index, account_links, source, target)
+            if expected is None or expected > 8:
+                assert paths == []
+                continue
+            assert paths
+            for path in paths:
+                assert len(path) - 1 == expected
+                described = _describe(path_finder, path)
+                assert described[0] == source and described[-1] == target
+                assert len(set(path)) == len(path)
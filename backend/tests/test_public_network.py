@@ -0,0 +1,132 @@
+import json
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import app.db.public_network_functions as public_network_functions
+from app.api.routes import network
+from app.db.linkedin_organization_functions import add_user_to_organization
+from app.db.public_network_functions import (
+    PublicNetworkRefresher,
+    get_public_network_revision,
+    get_public_network_snapshot,
+    refresh_public_network,
+)
+from app.models.public_network import PublicNetworkDirtyGroup
+
+
+@pytest.fixture
+def groups(db, graph):
+    graph.linkedin_member("alice", "acme")
+    graph.linkedin_member("alice", "globex")
+    graph.linkedin_member("bob", "globex")
+    graph.github_contributor("carol", "acme/anvil")
+    graph.github_contributor("carol", "acme/rocket")
+    db.commit()
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(network.router, prefix="/api")
+    return TestClient(app)
+
+
+def _nodes(db):
+    return {node["id"]: node for node in get_public_network_snapshot(db)["nodes"]}
+
+
+def test_first_refresh_builds_every_group(db, groups):
+    assert refresh_public_network(db) == 1
+
+    snapshot = get_public_network_snapshot(db)
+    assert snapshot["counts"] == {"linkedin_organizations": 2, "github_repositories": 2, "links": 2}
+    assert _nodes(db)["globex"]["user_count"] == 2
+    assert {(link["source"], link["target"], link["type"], link["weight"]) for link in snapshot["links"]} == {
+        ("acme", "globex", "shared_user", 1),
+        ("acme/anvil", "acme/rocket", "shared_contributor", 1),
+    }
+
+
+def test_refresh_without_flagged_groups_keeps_the_revision(db, groups):
+    refresh_public_network(db)
+
+    assert refresh_public_network(db) == 1
+    assert get_public_network_revision(db) == 1
+
+
+def test_later_refreshes_apply_flagged_groups(db, groups):
+    refresh_public_network(db)
+    add_user_to_organization("acme", "bob", None, None, None, db)
+
+    assert refresh_public_network(db) == 2
+
+    assert _nodes(db)["acme"]["user_count"] == 2
+    assert [link["weight"] for link in get_public_network_snapshot(db)["links"] if link["type"] == "shared_user"] == [2]
+    assert db.query(PublicNetworkDirtyGroup).count() == 0
+
+
+def test_refreshes_batch_large_flag_sets(db, graph, monkeypatch):
+    monkeypatch.setattr(public_network_functions, "REFRESH_BATCH_SIZE", 3)
+    for i in range(10):
+        graph.linkedin_member("alice", f"org{i}")
+    db.commit()
+
+    refresh_public_network(db)
+
+    snapshot = get_public_network_snapshot(db)
+    assert snapshot["counts"]["linkedin_organizations"] == 10
+    # Every pair of organizations shares alice, once
+    assert snapshot["counts"]["links"] == 45
+
+
+def test_route_reads_without_refreshing(db, groups, client):
+    assert client.get("/api/network/public").status_code == 404
+    assert client.get("/api/network/public?stream=ndjson").status_code == 404
+
+    refresh_public_network(db)
+    add_user_to_organization("acme", "bob", None, None, None, db)
+    response = client.get("/api/network/public")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"public-network-1"'
+    assert next(node for node in response.json()["nodes"] if node["id"] == "acme")["user_count"] == 1
+
+
+def test_route_honours_the_etag(db, groups, client):
+    refresh_public_network(db)
+    etag = client.get("/api/network/public").headers["etag"]
+
+    assert client.get("/api/network/public", headers={"If-None-Match": etag}).status_code == 304
+
+    add_user_to_organization("acme", "bob", None, None, None, db)
+    refresh_public_network(db)
+    assert client.get("/api/network/public", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_route_streams_ndjson(db, groups, client):
+    refresh_public_network(db)
+
+    response = client.get("/api/network/public?stream=ndjson")
+
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["etag"] == '"public-network-1"'
+    assert [record["type"] for record in records] == ["node"] * 4 + ["link"] * 2
+    assert {record["data"]["id"] for record in records if record["type"] == "node"} == set(_nodes(db))
+
+
+def test_refresher_thread_picks_up_flagged_groups(db, groups):
+    refresher = PublicNetworkRefresher(poll_seconds=0.05)
+    refresher.start()
+    try:
+        deadline = time.monotonic() + 5
+        while get_public_network_revision(db) < 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        add_user_to_organization("acme", "bob", None, None, None, db)
+        while get_public_network_revision(db) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        refresher.stop()
+
+    assert get_public_network_revision(db) == 2
+    assert _nodes(db)["acme"]["user_count"] == 2
@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from app.utils.single_flight import SingleFlight
+
+
+class Work:
+    """
+    A coroutine factory that counts its runs and finishes when released.
+    """
+
+    def __init__(self, result="done"):
+        self.result = result
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.finished = False
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        self.finished = True
+        return self.result
+
+
+async def _settle():
+    # Let the scheduled callers and the work they started run up to their next wait
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_calls_share_one_run():
+    async def scenario():
+        flights, work = SingleFlight(), Work()
+        callers = [asyncio.create_task(flights.do("key", work)) for _ in range(5)]
+        await _settle()
+        work.release.set()
+        return await asyncio.gather(*callers), work.calls
+
+    assert asyncio.run(scenario()) == (["done"] * 5, 1)
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flights, first, second = SingleFlight(), Work("first"), Work("second")
+        callers = [asyncio.create_task(flights.do("a", first)), asyncio.create_task(flights.do("b", second))]
+        await _settle()
+        first.release.set()
+        second.release.set()
+        return await asyncio.gather(*callers)
+
+    assert asyncio.run(scenario()) == ["first", "second"]
+
+
+def test_finished_calls_are_not_kept():
+    async def scenario():
+        flights, work = SingleFlight(), Work()
+        work.release.set()
+        await flights.do("key", work)
+        await flights.do("key", work)
+        return work.calls, flights._calls
+
+    assert asyncio.run(scenario()) == (2, {})
+
+
+def test_errors_reach_every_caller_and_are_not_kept():
+    async def scenario():
+        flights, work = SingleFlight(), Work(RuntimeError("boom"))
+        callers = [asyncio.create_task(flights.do("key", work)) for _ in range(3)]
+        await _settle()
+        work.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        work.result = "recovered"
+        return results, await flights.do("key", work), work.calls
+
+    results, retried, calls = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["boom"] * 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert (retried, calls) == ("recovered", 2)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_work():
+    async def scenario():
+        flights, work = SingleFlight(), Work()
+        leaving = asyncio.create_task(flights.do("key", work))
+        staying = asyncio.create_task(flights.do("key", work))
+        await _settle()
+        leaving.cancel()
+        await _settle()
+        work.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying, work.calls
+
+    assert asyncio.run(scenario()) == ("done", 1)
+
+
+def test_work_outlives_all_its_callers_and_is_joined_meanwhile():
+    async def scenario():
+        flights, work = SingleFlight(), Work()
+        caller = asyncio.create_task(flights.do("key", work))
+        await _settle()
+        caller.cancel()
+        await _settle()
+        assert caller.cancelled() and not work.finished
+        # A later caller joins the still running work instead of starting it again
+        joining = asyncio.create_task(flights.do("key", work))
+        await _settle()
+        work.release.set()
+        result = await joining
+        await _settle()
+        return result, work.calls, work.finished, flights._calls
+
+    assert asyncio.run(scenario()) == ("done", 1, True, {})